@@ -0,0 +1,89 @@
+import datetime
+import hashlib
+import logging
+import threading
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+def answer_key(question, skill, difficulty):
+    """Hash the normalized (question, skill, difficulty) triple"""
+    parts = [' '.join(str(p).split()).lower() for p in (question, skill, difficulty)]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class AnswerStore:
+    """Mongo-backed store of generated model answers.
+
+    Entries expire through a TTL index on created_at, answers longer than
+    max_chars are not stored, and the collection is trimmed back to
+    max_entries (oldest first) every trim_every writes. Mongo errors are
+    logged and treated as a miss so answers are still served when the
+    store is unavailable.
+    """
+
+    def __init__(self, collection, ttl_seconds=30 * 24 * 3600, max_entries=50000, max_chars=20000, trim_every=100):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.trim_every = trim_every
+        self._lock = threading.Lock()
+        self._indexed = False
+        self._writes = 0
+        self.counters = {'hits': 0, 'misses': 0, 'errors': 0}
+
+    def get(self, question, skill, difficulty):
+        try:
+            doc = self.collection.find_one({'_id': answer_key(question, skill, difficulty)}, {'answer': 1})
+        except PyMongoError as e:
+            self._count('errors')
+            logger.error(f"Answer store lookup error: {str(e)}")
+            return None
+        self._count('hits' if doc else 'misses')
+        return doc['answer'] if doc else None
+
+    def put(self, question, skill, difficulty, answer):
+        if not answer or len(answer) > self.max_chars:
+            return
+        try:
+            self._ensure_indexes()
+            self.collection.replace_one(
+                {'_id': answer_key(question, skill, difficulty)},
+                {
+                    'question': question,
+                    'skill': skill,
+                    'difficulty': difficulty,
+                    'answer': answer,
+                    'created_at': datetime.datetime.utcnow()
+                },
+                upsert=True
+            )
+            with self._lock:
+                self._writes += 1
+                trim = self._writes % self.trim_every == 0
+            if trim:
+                self._trim()
+        except PyMongoError as e:
+            self._count('errors')
+            logger.error(f"Answer store write error: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+            self._indexed = True
+
+    def _trim(self):
+        excess = self.collection.estimated_document_count() - self.max_entries
+        if excess > 0:
+            oldest = self.collection.find({}, {'_id': 1}).sort('created_at', 1).limit(excess)
+            self.collection.delete_many({'_id': {'$in': [doc['_id'] for doc in oldest]}})
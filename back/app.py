@@ -1,46 +1,302 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Blueprint, current_app, request, jsonify, Response, stream_with_context, g
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 import bcrypt
+import click
+import contextlib
+import logging
 import os
+import io
+import time
 import datetime
 import re
 from datetime import timedelta
 import json
-import google.generativeai as genai
-from werkzeug.utils import secure_filename
-from gemini_utils import extract_skills_from_pdf, generate_questions_with_gemini
+import math
+import hashlib
+import threading
+from gemini_utils import extract_skills, generate_questions_with_gemini, generate_questions_in_chunks
 from flask_cors import CORS
 from bson import ObjectId
-import PyPDF2
-from collections import Counter
-
-app = Flask(__name__)
-CORS(app)  # Add this line after creating your Flask app
-# Configuration
-app.config['MONGO_URI'] = os.getenv('MONGO_URI', 'mongodb://localhost:27017/skillmatrix')
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key')
-app.config['GEMINI_API_KEY'] = os.getenv('GEMINI_API_KEY')
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['ALLOWED_EXTENSIONS'] = {'pdf'}
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
-
-# Initialize extensions
-mongo = PyMongo(app)
-jwt = JWTManager(app)
+from bson.errors import InvalidId
+from pdf_ingest import DEFAULT_SPOOL_MAX_MEMORY, SpooledRequest, extract_pdf_text
+from resume_cache import ResumeCache
+from resume_compactor import compact_job_description, compact_resume
+from request_cache import RequestCache
+from answer_store import AnswerStore
+from llm_client import init_client
+from llm_resilience import LLMUnavailableError
+from job_queue import JobQueue, QueueFullError
+from history_store import ensure_history_indexes, paginate, migrate_embedded_history
+from mongo_setup import QueryTimer, ensure_indexes, explain_slow_queries
+from pymongo.errors import DuplicateKeyError
+from password_hasher import PasswordHasher, HasherBusyError
+from auth import UserChangeList, admin_required, token_claims
+from question_bank import QuestionBank, build_question_bank
+from skill_stats import apply_skill_change, canonical_skill, normalize_user_skills, rebuild_skill_counts, skill_count, top_skills
+from collections import Counter, namedtuple
+from functools import wraps
+from types import SimpleNamespace
+from werkzeug.local import LocalProxy
+import metrics
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+jwt = JWTManager()
+api = Blueprint('api', __name__, cli_group=None)
+
+
+def service(name):
+    """The current app's service of that name, which init_services keeps in app.extensions['skillmatrix']"""
+    return LocalProxy(lambda: getattr(current_app.extensions['skillmatrix'], name))
+
+
+# Services built from the app config by create_app, looked up per app through current_app
+mongo = service('mongo')
+query_timer = service('query_timer')
+user_changes = service('user_changes')
+llm = service('llm')
+passwords = service('passwords')
+resume_cache = service('resume_cache')
+question_cache = service('question_cache')
+answer_store = service('answer_store')
+grading_executor = service('grading_executor')
+question_executor = service('question_executor')
+analysis_jobs = service('analysis_jobs')
+question_bank = service('question_bank')
+
+
+def in_app_context(app, function):
+    """Wrap function to run inside app's context, for work handed to a thread pool"""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with app.app_context():
+            return function(*args, **kwargs)
+    return wrapper
+
+def load_config(app):
+    """Defaults, overridable from the environment"""
+    app.config['MONGO_URI'] = os.getenv('MONGO_URI', 'mongodb://localhost:27017/skillmatrix')
+    app.config['MONGO_SLOW_QUERY_MS'] = float(os.getenv('MONGO_SLOW_QUERY_MS', 100))
+    app.config['MONGO_ENSURE_INDEXES'] = os.getenv('MONGO_ENSURE_INDEXES', 'true').lower() == 'true'  # on first request
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    app.config['GEMINI_API_KEY'] = os.getenv('GEMINI_API_KEY')
+    app.config['GEMINI_MODEL'] = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+    app.config['GEMINI_TRANSPORT'] = os.getenv('GEMINI_TRANSPORT')  # 'grpc' or 'rest'
+    app.config['LLM_BACKEND'] = os.getenv('LLM_BACKEND', 'gemini')  # 'fake' runs offline
+    app.config['LLM_TIMEOUT'] = float(os.getenv('LLM_TIMEOUT', 60))  # seconds
+    app.config['LLM_TEMPERATURE'] = os.getenv('LLM_TEMPERATURE')
+    app.config['LLM_MAX_OUTPUT_TOKENS'] = os.getenv('LLM_MAX_OUTPUT_TOKENS')
+    app.config['LLM_DEADLINES'] = os.getenv('LLM_DEADLINES')  # per call site seconds, e.g. 'grade=20,analyze=45'
+    app.config['LLM_RETRIES'] = int(os.getenv('LLM_RETRIES', 2))  # extra attempts after a transient error
+    app.config['LLM_RETRY_BACKOFF'] = float(os.getenv('LLM_RETRY_BACKOFF', 0.5))  # seconds, doubled per retry, jittered
+    app.config['LLM_HEDGE_PERCENTILE'] = float(os.getenv('LLM_HEDGE_PERCENTILE', 0))  # e.g. 95; 0 disables hedging
+    app.config['LLM_BREAKER_THRESHOLD'] = int(os.getenv('LLM_BREAKER_THRESHOLD', 5))  # consecutive failures
+    app.config['LLM_BREAKER_RESET'] = float(os.getenv('LLM_BREAKER_RESET', 30))  # seconds before a probe call
+    app.config['LLM_CALL_WORKERS'] = int(os.getenv('LLM_CALL_WORKERS', 64))
+    app.config['LLM_RPM'] = int(os.getenv('LLM_RPM', 0))  # the project's Gemini requests-per-minute quota; 0 = unlimited
+    app.config['LLM_TPM'] = int(os.getenv('LLM_TPM', 0))  # tokens-per-minute quota; 0 = unlimited
+    app.config['LLM_ADMISSION_MAX_WAIT'] = float(os.getenv('LLM_ADMISSION_MAX_WAIT', 10))  # seconds queued before failing
+    app.config['LLM_BULK_RESERVE'] = float(os.getenv('LLM_BULK_RESERVE', 0.2))  # share of quota bulk calls leave free
+    app.config['LLM_PRIORITIES'] = os.getenv('LLM_PRIORITIES')  # per call site class, e.g. 'generate=interactive'
+    app.config['FAKE_LLM_LATENCY'] = float(os.getenv('FAKE_LLM_LATENCY', 0))  # seconds
+    app.config['FAKE_LLM_MALFORMED_RATE'] = float(os.getenv('FAKE_LLM_MALFORMED_RATE', 0))  # fraction of truncated fake responses
+    app.config['ALLOWED_EXTENSIONS'] = {'pdf'}
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
+    app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', 0))  # 0 calibrates to BCRYPT_TARGET_MS
+    app.config['BCRYPT_TARGET_MS'] = float(os.getenv('BCRYPT_TARGET_MS', 250))
+    app.config['BCRYPT_WORKERS'] = int(os.getenv('BCRYPT_WORKERS', 0))  # 0 uses one per CPU
+    app.config['BCRYPT_MAX_PENDING'] = int(os.getenv('BCRYPT_MAX_PENDING', 64))
+    app.config['PDF_SPOOL_MAX_MEMORY'] = int(os.getenv('PDF_SPOOL_MAX_MEMORY', DEFAULT_SPOOL_MAX_MEMORY))  # spill uploads to disk past this
+    app.config['PDF_MAX_PAGES'] = int(os.getenv('PDF_MAX_PAGES', 20))
+    app.config['PDF_MAX_TEXT_CHARS'] = int(os.getenv('PDF_MAX_TEXT_CHARS', 100000))
+    app.config['RESUME_PROMPT_MAX_TOKENS'] = int(os.getenv('RESUME_PROMPT_MAX_TOKENS', 2500))  # 0 = no limit
+    app.config['JOB_DESCRIPTION_MAX_TOKENS'] = int(os.getenv('JOB_DESCRIPTION_MAX_TOKENS', 1000))  # 0 = no limit
+    app.config['ANALYSIS_DEFAULT_MODE'] = os.getenv('ANALYSIS_DEFAULT_MODE', 'llm')  # fast, llm or hybrid
+    app.config['RESUME_CACHE_SIZE'] = int(os.getenv('RESUME_CACHE_SIZE', 256))
+    app.config['RESUME_CACHE_MONGO'] = os.getenv('RESUME_CACHE_MONGO', 'false').lower() == 'true'
+    app.config['RESUME_CACHE_TTL'] = int(os.getenv('RESUME_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    app.config['QUESTION_CACHE_SIZE'] = int(os.getenv('QUESTION_CACHE_SIZE', 512))
+    app.config['QUESTION_CACHE_TTL'] = int(os.getenv('QUESTION_CACHE_TTL', 3600))  # seconds
+    app.config['MODEL_ANSWER_TTL'] = int(os.getenv('MODEL_ANSWER_TTL', 30 * 24 * 3600))  # seconds
+    app.config['MODEL_ANSWER_MAX_ENTRIES'] = int(os.getenv('MODEL_ANSWER_MAX_ENTRIES', 50000))
+    app.config['MODEL_ANSWER_MAX_CHARS'] = int(os.getenv('MODEL_ANSWER_MAX_CHARS', 20000))
+    app.config['GRADE_BATCH_MAX_ITEMS'] = int(os.getenv('GRADE_BATCH_MAX_ITEMS', 20))
+    app.config['GRADE_BATCH_CONCURRENCY'] = int(os.getenv('GRADE_BATCH_CONCURRENCY', 4))
+    app.config['QUESTION_CHUNK_SIZE'] = int(os.getenv('QUESTION_CHUNK_SIZE', 3))  # 0 disables per-skill fan-out
+    app.config['QUESTION_FANOUT_WORKERS'] = int(os.getenv('QUESTION_FANOUT_WORKERS', 4))
+    app.config['QUESTION_BANK_ENABLED'] = os.getenv('QUESTION_BANK_ENABLED', 'true').lower() == 'true'
+    app.config['QUESTION_BANK_PER_SKILL'] = int(os.getenv('QUESTION_BANK_PER_SKILL', 3))  # questions drawn per skill
+    app.config['QUESTION_BANK_SEEN_TTL'] = int(os.getenv('QUESTION_BANK_SEEN_TTL', 90 * 24 * 3600))  # seconds
+    app.config['QUESTION_BANK_TARGET'] = int(os.getenv('QUESTION_BANK_TARGET', 9))  # per combination when building
+    app.config['QUESTION_BANK_BUILD_WORKERS'] = int(os.getenv('QUESTION_BANK_BUILD_WORKERS', 4))
+    app.config['ANALYSIS_WORKERS'] = int(os.getenv('ANALYSIS_WORKERS', 2))
+    app.config['ANALYSIS_MAX_QUEUE_DEPTH'] = int(os.getenv('ANALYSIS_MAX_QUEUE_DEPTH', 50))
+    app.config['ANALYSIS_MAX_JOBS_PER_USER'] = int(os.getenv('ANALYSIS_MAX_JOBS_PER_USER', 2))
+    app.config['ANALYSIS_JOB_TTL'] = int(os.getenv('ANALYSIS_JOB_TTL', 24 * 3600))  # seconds
+    app.config['ANALYSIS_JOB_HEARTBEAT'] = int(os.getenv('ANALYSIS_JOB_HEARTBEAT', 30))  # seconds; 3 missed = orphaned
+    app.config['ASGI_WSGI_THREADS'] = int(os.getenv('ASGI_WSGI_THREADS', 16))  # threads for Flask routes under asgi.py
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # unset leaves /metrics open to the scraper's network
+
+def init_services(app):
+    """Build the app's services into app.extensions['skillmatrix']"""
+    services = app.extensions['skillmatrix'] = SimpleNamespace()
+    services.query_timer = QueryTimer(app.config['MONGO_SLOW_QUERY_MS'])
+    # Flask-PyMongo defers connecting to first use, so a preloaded app forks safely
+    services.mongo = PyMongo(app, event_listeners=[services.query_timer])
+    services.indexed = not app.config['MONGO_ENSURE_INDEXES']
+    services.index_lock = threading.Lock()
+    services.index_retry_at = 0
+    db = services.mongo.db
+    jwt.init_app(app)
+    services.user_changes = UserChangeList(db.user_changes, app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+    services.llm = init_client(app)
+    services.passwords = PasswordHasher(
+        app.config['BCRYPT_ROUNDS'] or None,
+        app.config['BCRYPT_TARGET_MS'],
+        app.config['BCRYPT_WORKERS'] or None,
+        app.config['BCRYPT_MAX_PENDING']
+    )
+    services.resume_cache = ResumeCache(
+        app.config['RESUME_CACHE_SIZE'],
+        db.resume_cache if app.config['RESUME_CACHE_MONGO'] else None,
+        app.config['RESUME_CACHE_TTL']
+    )
+    services.question_cache = RequestCache(app.config['QUESTION_CACHE_SIZE'], app.config['QUESTION_CACHE_TTL'])
+    services.answer_store = AnswerStore(
+        db.model_answers,
+        app.config['MODEL_ANSWER_TTL'],
+        app.config['MODEL_ANSWER_MAX_ENTRIES'],
+        app.config['MODEL_ANSWER_MAX_CHARS']
+    )
+    services.grading_executor = ThreadPoolExecutor(
+        max_workers=app.config['GRADE_BATCH_CONCURRENCY'],
+        thread_name_prefix='grading'
+    )
+    services.question_executor = ThreadPoolExecutor(
+        max_workers=app.config['QUESTION_FANOUT_WORKERS'],
+        thread_name_prefix='questions'
+    )
+    services.analysis_jobs = JobQueue(
+        db.analysis_jobs,
+        app.config['ANALYSIS_WORKERS'],
+        app.config['ANALYSIS_MAX_QUEUE_DEPTH'],
+        app.config['ANALYSIS_MAX_JOBS_PER_USER'],
+        app.config['ANALYSIS_JOB_TTL'],
+        app.config['ANALYSIS_JOB_HEARTBEAT']
+    )
+    services.question_bank = QuestionBank(
+        db.question_bank,
+        db.seen_questions,
+        app.config['QUESTION_BANK_PER_SKILL'],
+        app.config['QUESTION_BANK_SEEN_TTL']
+    )
+    return services
+
+def create_app(config=None):
+    """Build the Flask app; config overrides the environment-derived settings"""
+    app = Flask(__name__)
+    app.request_class = SpooledRequest
+    CORS(app)
+    load_config(app)
+    app.config.update(config or {})
+    init_services(app)
+    app.register_blueprint(api)
+    app.logger  # installs Flask's handler on the module logger, which shares its name
+    return app
+
+# Seconds between attempts at ensure_indexes after it fails, e.g. while Mongo is unreachable
+INDEX_RETRY_SECONDS = 30
+
+def ensure_app_indexes(app):
+    """Run ensure_indexes once for the app; the unique email index backs duplicate-signup protection.
+
+    Deferred from create_app to the first request (or the ASGI lifespan) so a
+    preloaded gunicorn master never connects to Mongo before forking. Every
+    worker runs it, which is harmless since it is idempotent. Only one request
+    at a time makes the attempt; the others carry on without waiting for it.
+    A failure is logged and retried after INDEX_RETRY_SECONDS, so an
+    unreachable Mongo doesn't stall every request on server selection.
+    """
+    services = app.extensions['skillmatrix']
+    if services.indexed or time.monotonic() < services.index_retry_at:
+        return
+    if not services.index_lock.acquire(blocking=False):
+        return
+    try:
+        if services.indexed:
+            return
+        ensure_indexes(services.mongo.db)
+        services.indexed = True
+    except Exception as e:
+        services.index_retry_at = time.monotonic() + INDEX_RETRY_SECONDS
+        logger.error(f"Could not ensure indexes, retrying in {INDEX_RETRY_SECONDS}s: {str(e)}")
+    finally:
+        services.index_lock.release()
+
+@api.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    ensure_app_indexes(current_app._get_current_object())
+
+@api.after_app_request
+def record_request_duration(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Label by the route pattern, not the raw path, so ids don't explode the series count
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe(
+            'http_request_duration_seconds',
+            time.perf_counter() - start,
+            route=route,
+            method=request.method,
+            status=str(response.status_code)
+        )
+    return response
+
+LLM_UNAVAILABLE_MESSAGE = 'The AI service is temporarily unavailable. Please try again shortly.'
 
 # Helper function
 def allowed_file(filename):
     return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+           filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+
+# The /generate, /grade-answer, /get-answer and /analyze-resume views are also served by asgi.py. Both
+# versions parse requests and shape replies with the helpers next to each view, which raise RequestError
+# for a bad request and return (body, status, headers) replies that each app turns into its own response.
+
+class RequestError(Exception):
+    """A request the client has to fix, answered with {'error': message}"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def reply(body, status=200, headers=None):
+    """The Flask response for a (body, status, headers) reply"""
+    return jsonify(body), status, headers or {}
+
+def unavailable_reply(error):
+    """503 for a model call the resilience layer gave up on, with a Retry-After hint when the circuit is open"""
+    headers = {'Retry-After': str(math.ceil(error.retry_after))} if error.retry_after else {}
+    return {'error': LLM_UNAVAILABLE_MESSAGE, 'degraded': True}, 503, headers
+
+def view_error_reply(error, view, message):
+    """The reply for an error escaping a view: 400 for a bad request, otherwise a logged 500"""
+    if isinstance(error, RequestError):
+        return {'error': str(error)}, error.status, {}
+    logger.error(f"Error in {view}: {str(error)}", exc_info=True)
+    return {'error': message, 'details': str(error)}, 500, {}
 
 # Routes
-@app.route('/')
+@api.route('/')
 def home():
     return "SkillMatrix Backend Service"
 
-@app.route('/signup', methods=['POST'])
+@api.route('/signup', methods=['POST'])
 def signup():
     data = request.get_json()
     if not all(k in data for k in ['name', 'email', 'password']):
@@ -49,19 +305,23 @@ def signup():
     if mongo.db.users.find_one({'email': data['email']}):
         return jsonify({'error': 'Email already registered'}), 400
 
-    hashed = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+    hashed = passwords.hash(data['password'])
     user = {
         'name': data['name'],
         'email': data['email'],
         'password': hashed,
         'skills': [],
-        'saved_questions': [],
+        'saved_question_count': 0,
         'role': 'user'  # Default role is user
     }
-    mongo.db.users.insert_one(user)
+    try:
+        mongo.db.users.insert_one(user)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup for the same email
+        return jsonify({'error': 'Email already registered'}), 400
     return jsonify({'message': 'User created successfully'}), 201
 
-@app.route('/create-admin', methods=['POST'])
+@api.route('/create-admin', methods=['POST'])
 def create_admin():
     data = request.get_json()
     if not all(k in data for k in ['name', 'email', 'password']):
@@ -70,31 +330,55 @@ def create_admin():
     if mongo.db.users.find_one({'email': data['email']}):
         return jsonify({'error': 'Email already registered'}), 400
 
-    hashed = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+    hashed = passwords.hash(data['password'])
     user = {
         'name': data['name'],
         'email': data['email'],
         'password': hashed,
         'skills': [],
-        'saved_questions': [],
+        'saved_question_count': 0,
         'role': 'admin'
     }
-    mongo.db.users.insert_one(user)
+    try:
+        mongo.db.users.insert_one(user)
+    except DuplicateKeyError:
+        return jsonify({'error': 'Email already registered'}), 400
     return jsonify({'message': 'Admin user created successfully'}), 201
 
-@app.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
-    user = mongo.db.users.find_one({'email': data.get('email')})
-    if not user or not bcrypt.checkpw(data['password'].encode('utf-8'), user['password']):
+    user = mongo.db.users.find_one({'email': data.get('email')}, {'password': 1, 'role': 1, 'name': 1, 'email': 1})
+    if not user or not passwords.check(data['password'], user['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
 
-    token = create_access_token(
-        identity=str(user['_id']),
-        expires_delta=timedelta(hours=24))
-    return jsonify({'access_token': token}), 200
+    # Upgrade hashes made with an older, cheaper cost without delaying the login
+    if passwords.needs_rehash(user['password']):
+        passwords.submit(
+            in_app_context(current_app._get_current_object(), rehash_password),
+            user['_id'], data['password'], user['password']
+        )
+
+    return jsonify({'access_token': issue_token(user)}), 200
+
+def issue_token(user):
+    # Role and profile ride along in the token so handlers needn't look the user up
+    return create_access_token(identity=str(user['_id']), additional_claims=token_claims(user))
+
+@jwt.token_in_blocklist_loader
+def token_outdated(jwt_header, jwt_payload):
+    return user_changes.is_stale(jwt_payload)
+
+def rehash_password(user_id, password, old_hash):
+    new_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(passwords.rounds))
+    # Only replace the hash we checked, in case the password changed meanwhile
+    mongo.db.users.update_one({'_id': user_id, 'password': old_hash}, {'$set': {'password': new_hash}})
 
-@app.route('/upload', methods=['POST'])
+@api.app_errorhandler(HasherBusyError)
+def hasher_busy(e):
+    return jsonify({'error': 'Server is busy, please try again shortly'}), 503
+
+@api.route('/upload', methods=['POST'])
 @jwt_required()
 def upload_resume():
     if 'file' not in request.files:
@@ -104,78 +388,155 @@ def upload_resume():
     if not file or not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type'}), 400
 
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
-    
     try:
-        skills = extract_skills_from_pdf(filepath)
+        skills = load_resume(file.stream)['skills']
         user_id = ObjectId(get_jwt_identity())
         
-        # Update user's skills
-        result = mongo.db.users.update_one(
+        # Replace the user's skills and read the old ones in the same step, so the count diff is exact
+        previous = mongo.db.users.find_one_and_update(
             {'_id': user_id},
-            {'$set': {'skills': skills}}  # Replace existing skills with new ones
+            {'$set': {'skills': skills}},
+            projection={'skills': 1}
         )
-        
-        if result.modified_count == 0:
+        if previous is None:
             return jsonify({'error': 'Failed to update skills'}), 400
+        try:
+            apply_skill_change(mongo.db, previous.get('skills'), skills)
+        except Exception as e:
+            # The user's skills are already saved; only the counts lag until `flask rebuild-skill-counts`
+            metrics.inc('skill_count_update_failures_total')
+            logger.error(f"Skill counts not updated for user {user_id}: {str(e)}")
             
         return jsonify({'skills': skills}), 200
     except Exception as e:
-        app.logger.error(f"Error processing resume: {str(e)}")
+        logger.error(f"Error processing resume: {str(e)}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            
 
-@app.route('/generate', methods=['POST'])
+@api.route('/generate', methods=['POST'])
 @jwt_required()
 def get_questions():
+    bank_questions, params = [], None
     try:
-        data = request.get_json()
-        skills = data.get('skills', [])
-        job_description = data.get('jobDescription', '')
-        experience_level = data.get('experienceLevel', 'mid')
-        question_types = data.get('questionTypes', {
+        params, fresh = parse_question_request(request.get_json(silent=True))
+        bank_questions, params = draw_bank_questions(get_jwt_identity(), params)
+        if bank_questions and not params.skills:
+            return reply({'questions': bank_questions})
+
+        cache_key = question_cache_key(*params)
+        result = question_cache.get_or_compute(cache_key, lambda: generate_question_set(*params), fresh=fresh)
+        response = questions_response(bank_questions, result)
+        if 'failedSkills' in response:
+            # Don't keep a partial set around; the next request retries the failed chunks
+            question_cache.invalidate(cache_key)
+        return reply(response)
+
+    except Exception as e:
+        return reply(*questions_error_reply(e, bank_questions, params))
+
+# The /generate inputs that shape a question set, in generate_question_set's argument order
+QuestionRequest = namedtuple(
+    'QuestionRequest', ['skills', 'job_description', 'experience_level', 'question_types', 'difficulty']
+)
+
+def parse_question_request(data):
+    """(QuestionRequest, fresh) from a /generate body"""
+    data = data or {}
+    params = QuestionRequest(
+        skills=data.get('skills', []),
+        job_description=data.get('jobDescription', ''),
+        experience_level=data.get('experienceLevel', 'mid'),
+        question_types=data.get('questionTypes', {
             'technical': True,
             'behavioral': True,
             'situational': True
-        })
-        difficulty = data.get('difficulty', 'medium')
-        
-        # Validate that either skills or job description is provided
-        if not skills and not job_description:
-            return jsonify({'error': 'Either skills or job description must be provided'}), 400
-
-        # Validate skills input if provided
-        if skills and (not isinstance(skills, list) or any(not isinstance(s, str) for s in skills)):
-            return jsonify({'error': 'Skills must be an array of strings'}), 400
-
+        }),
+        difficulty=data.get('difficulty', 'medium')
+    )
+
+    # Validate that either skills or job description is provided
+    if not params.skills and not params.job_description:
+        raise RequestError('Either skills or job description must be provided')
+
+    # Validate skills input if provided
+    skills = params.skills
+    if skills and (not isinstance(skills, list) or any(not isinstance(s, str) for s in skills)):
+        raise RequestError('Skills must be an array of strings')
+
+    return params, bool(data.get('fresh', False))
+
+def draw_bank_questions(user_id, params):
+    """Serve what the pre-generated bank covers; returns its questions and params narrowed to the skills left for Gemini"""
+    if not params.skills or not current_app.config['QUESTION_BANK_ENABLED']:
+        return [], params
+    questions, skills = question_bank.draw(
+        ObjectId(user_id), params.skills, params.difficulty, params.experience_level, params.question_types
+    )
+    return questions, params._replace(skills=skills)
+
+def questions_response(bank_questions, result):
+    """The /generate body for the bank's questions plus a generated question set"""
+    questions = result['questions']
+
+    # Validate the response structure
+    if not isinstance(questions, list):
+        raise ValueError("Invalid questions format")
+
+    response = {'questions': bank_questions + questions}
+    if result['failedSkills']:
+        response['failedSkills'] = result['failedSkills']
+    return response
+
+def questions_error_reply(error, bank_questions, params):
+    """The reply for a failed /generate; what the bank served still goes out when Gemini is unavailable"""
+    if isinstance(error, RequestError):
+        return {'error': str(error)}, error.status, {}
+    if isinstance(error, LLMUnavailableError):
+        logger.error(f"Question generation unavailable: {str(error)}")
+        if bank_questions:
+            # The bank's share is still useful; the rest can be requested again later
+            return {'questions': bank_questions, 'failedSkills': params.skills, 'degraded': True}, 200, {}
+        return unavailable_reply(error)
+    if isinstance(error, ValueError):
+        logger.error(f"Validation error: {str(error)}")
+        return {'error': str(error)}, 400, {}
+    logger.error(f"Question generation error: {str(error)}")
+    return {'error': "Failed to generate questions. Please try again."}, 500, {}
+
+def generate_question_set(skills, job_description, experience_level, question_types, difficulty):
+    """Generate questions, fanning long skill lists out to parallel per-chunk prompts"""
+    chunk_size = current_app.config['QUESTION_CHUNK_SIZE']
+    if skills and chunk_size and len(skills) > chunk_size:
+        questions, failed_skills = generate_questions_in_chunks(
+            skills,
+            question_executor,
+            chunk_size,
+            experience_level,
+            question_types,
+            difficulty
+        )
+    else:
         questions = generate_questions_with_gemini(
             skills,
-            app.config['GEMINI_API_KEY'],
             job_description,
             experience_level,
             question_types,
             difficulty
         )
-        
-        # Validate the response structure
-        if not isinstance(questions, list):
-            raise ValueError("Invalid questions format")
-            
-        return jsonify({'questions': questions}), 200
-        
-    except ValueError as e:
-        app.logger.error(f"Validation error: {str(e)}")
-        return jsonify({'error': str(e)}), 400
-    except Exception as e:
-        app.logger.error(f"Question generation error: {str(e)}")
-        return jsonify({'error': "Failed to generate questions. Please try again."}), 500
+        failed_skills = []
+    return {'questions': questions, 'failedSkills': failed_skills}
+
+def question_cache_key(skills, job_description, experience_level, question_types, difficulty):
+    """Hash the normalized /generate inputs so equivalent requests share a cache entry"""
+    normalized = {
+        'skills': sorted({s.strip().lower() for s in skills}),
+        'job_description': ' '.join(job_description.split()).lower(),
+        'experience_level': str(experience_level).strip().lower(),
+        'question_types': sorted(k for k, v in (question_types or {}).items() if v),
+        'difficulty': str(difficulty).strip().lower()
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode('utf-8')).hexdigest()
 
-@app.route('/dashboard', methods=['GET'])
+@api.route('/dashboard', methods=['GET'])
 @jwt_required()
 def dashboard():
     try:
@@ -188,7 +549,7 @@ def dashboard():
                 'name': 1,
                 'email': 1,
                 'skills': 1,
-                'saved_questions': 1,
+                'saved_question_count': 1,
                 'role': 1
             }
         )
@@ -199,81 +560,130 @@ def dashboard():
         # Convert ObjectId to string for JSON serialization
         user['_id'] = str(user['_id'])
         
-        # Ensure skills and saved_questions are initialized as empty arrays if not present
+        # Ensure skills and the saved question count are initialized if not present
         if 'skills' not in user:
             user['skills'] = []
-        if 'saved_questions' not in user:
-            user['saved_questions'] = []
+        if 'saved_question_count' not in user:
+            user['saved_question_count'] = 0
         if 'role' not in user:
             user['role'] = 'user'
         
         return jsonify(user), 200
         
     except Exception as e:
-        app.logger.error(f"Dashboard error: {str(e)}")
+        logger.error(f"Dashboard error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/grade-answer', methods=['POST'])
+@api.route('/grade-answer', methods=['POST'])
 @jwt_required()
 def grade_answer():
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-
-        question = data.get('question')
-        user_answer = data.get('userAnswer')
-        skill = data.get('skill')
-
-        if not all([question, user_answer, skill]):
-            return jsonify({'error': 'Missing required fields'}), 400
+        question, user_answer, skill = parse_grade_request(request.get_json(silent=True))
 
         # Grade with Gemini
-        grade, strengths, weaknesses, suggestions, model_answer = grade_with_gemini(
+        result = grade_with_gemini(
             question,
             user_answer,
-            skill,
-            app.config['GEMINI_API_KEY']
-        )
-
-        user_id = get_jwt_identity()
-        mongo.db.users.update_one(
-            {'_id': user_id},
-            {'$push': {
-                'answer_history': {
-                    'question': question,
-                    'skill': skill,
-                    'user_answer': user_answer,
-                    'grade': grade,
-                    'strengths': strengths,
-                    'weaknesses': weaknesses,
-                    'suggestions': suggestions,
-                    'model_answer': model_answer
-                    # 'timestamp': datetime.utcnow()
-                }
-            }}
+            skill
         )
-
-        return jsonify({
-            'success': True,
-            'grade': grade,
-            'strengths': strengths,
-            'weaknesses': weaknesses,
-            'suggestions': suggestions,
-            'correctAnswer': model_answer
-        }), 200
+        entry, response = graded_answer(get_jwt_identity(), question, user_answer, skill, result)
+        mongo.db.answer_history.insert_one(entry)
+        return reply(response)
 
     except Exception as e:
-        app.logger.error(f"Error in grade_answer: {str(e)}", exc_info=True)
-        return jsonify({'error': 'Failed to grade answer', 'details': str(e)}), 500
+        return reply(*view_error_reply(e, 'grade_answer', 'Failed to grade answer'))
+
+def parse_grade_request(data):
+    """(question, user_answer, skill) from a /grade-answer body"""
+    if not data:
+        raise RequestError('No data provided')
+
+    question = data.get('question')
+    user_answer = data.get('userAnswer')
+    skill = data.get('skill')
+
+    if not all([question, user_answer, skill]):
+        raise RequestError('Missing required fields')
+    return question, user_answer, skill
+
+def graded_answer(user_id, question, user_answer, skill, result):
+    """(answer_history entry, /grade-answer body) for a grade_with_gemini result"""
+    grade, strengths, weaknesses, suggestions, model_answer = result
+    entry = {
+        'user_id': ObjectId(user_id),
+        'question': question,
+        'skill': skill,
+        'user_answer': user_answer,
+        'grade': grade,
+        'strengths': strengths,
+        'weaknesses': weaknesses,
+        'suggestions': suggestions,
+        'model_answer': model_answer,
+        'timestamp': datetime.datetime.utcnow()
+    }
+    response = {
+        'success': True,
+        'grade': grade,
+        'strengths': strengths,
+        'weaknesses': weaknesses,
+        'suggestions': suggestions,
+        'correctAnswer': model_answer
+    }
+    if result is FALLBACK_GRADE:
+        # Keeps placeholder grades distinguishable from real ones in the history
+        entry['degraded'] = True
+        response['degraded'] = True
+    return entry, response
 
-    
-def grade_with_gemini(question, user_answer, skill, api_key):
+@api.route('/grade-answers', methods=['POST'])
+@jwt_required()
+def grade_answers():
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        data = request.get_json()
+        items = data.get('items') if data else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty array'}), 400
+        if len(items) > current_app.config['GRADE_BATCH_MAX_ITEMS']:
+            return jsonify({'error': f"At most {current_app.config['GRADE_BATCH_MAX_ITEMS']} items per batch"}), 400
+
+        def grade_item(item):
+            question, user_answer, skill = parse_grade_request(item if isinstance(item, dict) else None)
+            return grade_with_gemini(question, user_answer, skill, fallback=False)
+
+        # Grade concurrently on the shared pool; each item succeeds or fails on its own
+        grade_in_context = in_app_context(current_app._get_current_object(), grade_item)
+        futures = [grading_executor.submit(grade_in_context, item) for item in items]
+        user_id = get_jwt_identity()
+        results = []
+        history = []
+        for index, (item, future) in enumerate(zip(items, futures)):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Batch grading error for item {index}: {str(e)}")
+                failure = {'index': index, 'success': False, 'error': str(e)}
+                if isinstance(e, LLMUnavailableError):
+                    failure['degraded'] = True
+                results.append(failure)
+                continue
+
+            # Built as /grade-answer builds them, so batch and single grades look the same
+            entry, response = graded_answer(user_id, item['question'], item['userAnswer'], item['skill'], result)
+            results.append(dict(index=index, **response))
+            history.append(entry)
+
+        # One write for the whole batch
+        if history:
+            mongo.db.answer_history.insert_many(history)
+
+        return jsonify({'success': True, 'results': results}), 200
+
+    except Exception as e:
+        logger.error(f"Error in grade_answers: {str(e)}", exc_info=True)
+        return jsonify({'error': 'Failed to grade answers', 'details': str(e)}), 500
 
-        prompt = f"""
+def build_grade_prompt(question, user_answer, skill):
+    return f"""
         ROLE: Technical Interview Coach
         TASK: Evaluate this interview answer and provide detailed, structured feedback.
 
@@ -291,68 +701,89 @@ def grade_with_gemini(question, user_answer, skill, api_key):
         }}
         """
 
-        response = model.generate_content(prompt)
-        text = response.text
-
+def parse_grade(text):
+    """Return (grade, strengths, weaknesses, suggestions, model_answer) from a grading response"""
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        json_str = re.search(r"\{.*\}", text, re.DOTALL)
+        if not json_str:
+            metrics.inc('llm_parse_failures_total', site='grade')
+            raise ValueError("Invalid JSON from Gemini")
         try:
-            result = json.loads(text)
+            result = json.loads(json_str.group(0))
         except json.JSONDecodeError:
-            json_str = re.search(r"\{.*\}", text, re.DOTALL)
-            if json_str:
-                result = json.loads(json_str.group(0))
-            else:
-                raise ValueError("Invalid JSON from Gemini")
-
-        return (
-            result["grade"],
-            result["strengths"],
-            result["weaknesses"],
-            result["suggestions"],
-            result["modelAnswer"]
-        )
+            metrics.inc('llm_parse_failures_total', site='grade')
+            raise
+
+    return (
+        result["grade"],
+        result["strengths"],
+        result["weaknesses"],
+        result["suggestions"],
+        result["modelAnswer"]
+    )
+
+# Neutral grade returned when grading fails and a fallback is allowed; responses carrying it are marked degraded
+FALLBACK_GRADE = ("Fair", ["N/A"], ["N/A"], ["N/A"], "Refer to documentation.")
+
+def grade_with_gemini(question, user_answer, skill, fallback=True):
+    """Grade an answer; with fallback=False errors are raised instead of returning a neutral grade"""
+    try:
+        return parse_grade(llm.generate(build_grade_prompt(question, user_answer, skill), 'grade'))
 
     except Exception as e:
-        app.logger.error(f"Gemini grading error: {str(e)}")
-        return ("Fair", ["N/A"], ["N/A"], ["N/A"], "Refer to documentation.")
+        logger.error(f"Gemini grading error: {str(e)}")
+        if not fallback:
+            raise
+        return FALLBACK_GRADE
 
-@app.route('/get-answer', methods=['POST'])
+@api.route('/get-answer', methods=['POST'])
 @jwt_required()
 def get_answer():
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-
-        question = data.get('question')
-        skill = data.get('skill')
-        difficulty = data.get('difficulty', 'medium')
-
-        if not all([question, skill]):
-            return jsonify({'error': 'Missing required fields'}), 400
+        question, skill, difficulty = parse_answer_request(request.get_json(silent=True))
 
         # Get answer from Gemini
         answer = get_answer_from_gemini(
             question,
             skill,
-            difficulty,
-            app.config['GEMINI_API_KEY']
+            difficulty
         )
-
-        return jsonify({
-            'success': True,
-            'answer': answer
-        }), 200
+        return reply(answer_response(answer))
 
     except Exception as e:
-        app.logger.error(f"Error in get_answer: {str(e)}", exc_info=True)
-        return jsonify({'error': 'Failed to get answer', 'details': str(e)}), 500
-
-def get_answer_from_gemini(question, skill, difficulty, api_key):
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        return reply(*view_error_reply(e, 'get_answer', 'Failed to get answer'))
+
+def parse_answer_request(data):
+    """(question, skill, difficulty) from a /get-answer body"""
+    if not data:
+        raise RequestError('No data provided')
+
+    question = data.get('question')
+    skill = data.get('skill')
+    difficulty = data.get('difficulty', 'medium')
+
+    if not all([question, skill]):
+        raise RequestError('Missing required fields')
+    return question, skill, difficulty
+
+def clean_answer(text):
+    # Clean up any potential asterisks or special characters
+    return text.strip().replace('*', '')
+
+def answer_response(answer):
+    """The /get-answer body; FALLBACK_ANSWER is marked degraded"""
+    response = {
+        'success': True,
+        'answer': answer
+    }
+    if answer is FALLBACK_ANSWER:
+        response['degraded'] = True
+    return response
 
-        prompt = f"""
+def build_answer_prompt(question, skill, difficulty):
+    return f"""
         ROLE: Technical Interview Coach
         TASK: Provide a structured model answer for this interview question.
 
@@ -398,16 +829,67 @@ def get_answer_from_gemini(question, skill, difficulty, api_key):
         Return the answer in this clean, structured format.
         """
 
-        response = model.generate_content(prompt)
-        # Clean up any potential asterisks or special characters
-        cleaned_response = response.text.strip().replace('*', '')
+FALLBACK_ANSWER = "Unable to generate answer at this time."
+
+def get_answer_from_gemini(question, skill, difficulty):
+    cached = answer_store.get(question, skill, difficulty)
+    if cached:
+        return cached
+
+    try:
+        prompt = build_answer_prompt(question, skill, difficulty)
+        cleaned_response = clean_answer(llm.generate(prompt, 'answer'))
+        answer_store.put(question, skill, difficulty, cleaned_response)
         return cleaned_response
 
     except Exception as e:
-        app.logger.error(f"Gemini answer generation error: {str(e)}")
-        return "Unable to generate answer at this time."
+        logger.error(f"Gemini answer generation error: {str(e)}")
+        return FALLBACK_ANSWER
 
-@app.route('/update-profile', methods=['PUT'])
+@api.route('/get-answer/stream', methods=['POST'])
+@jwt_required()
+def stream_answer():
+    try:
+        question, skill, difficulty = parse_answer_request(request.get_json(silent=True))
+    except RequestError as e:
+        return reply({'error': str(e)}, e.status)
+
+    def sse(payload, event=None):
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+    def events():
+        cached = answer_store.get(question, skill, difficulty)
+        if cached:
+            yield sse({'text': cached})
+            yield sse({'cached': True}, 'done')
+            return
+
+        parts = []
+        try:
+            for chunk in llm.stream(build_answer_prompt(question, skill, difficulty), 'answer'):
+                # Same cleanup as /get-answer, applied per chunk
+                cleaned = chunk.replace('*', '')
+                if not parts:
+                    cleaned = cleaned.lstrip()
+                if cleaned:
+                    parts.append(cleaned)
+                    yield sse({'text': cleaned})
+        except Exception as e:
+            logger.error(f"Gemini answer streaming error: {str(e)}")
+            yield sse({'error': FALLBACK_ANSWER, 'degraded': True}, 'error')
+            return
+
+        answer_store.put(question, skill, difficulty, "".join(parts).strip())
+        yield sse({'cached': False}, 'done')
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@api.route('/update-profile', methods=['PUT'])
 @jwt_required()
 def update_profile():
     try:
@@ -424,15 +906,18 @@ def update_profile():
                 return jsonify({'error': 'Email already in use'}), 400
             update_data['email'] = data['email'].strip()
         if 'password' in data and data['password'].strip():
-            update_data['password'] = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+            update_data['password'] = passwords.hash(data['password'])
             
         if not update_data:
             return jsonify({'error': 'No fields to update'}), 400
             
-        result = mongo.db.users.update_one(
-            {'_id': user_id},
-            {'$set': update_data}
-        )
+        try:
+            result = mongo.db.users.update_one(
+                {'_id': user_id},
+                {'$set': update_data}
+            )
+        except DuplicateKeyError:
+            return jsonify({'error': 'Email already in use'}), 400
         
         if result.modified_count == 0:
             return jsonify({'error': 'No changes made'}), 400
@@ -443,17 +928,21 @@ def update_profile():
             {'password': 0}
         )
         updated_user['_id'] = str(updated_user['_id'])
+
+        # Older tokens carry stale profile claims (or a replaced password); swap them out
+        user_changes.mark_changed(user_id)
             
         return jsonify({
             'message': 'Profile updated successfully',
-            'user': updated_user
+            'user': updated_user,
+            'access_token': issue_token(updated_user)
         }), 200
         
     except Exception as e:
-        app.logger.error(f"Profile update error: {str(e)}")
+        logger.error(f"Profile update error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/save-question', methods=['POST'])
+@api.route('/save-question', methods=['POST'])
 @jwt_required()
 def save_question():
     try:
@@ -463,6 +952,7 @@ def save_question():
             
         user_id = ObjectId(get_jwt_identity())
         question_data = {
+            'user_id': user_id,
             'question': data['question'],
             'skill': data['skill'],
             'type': data['type'],
@@ -470,38 +960,130 @@ def save_question():
             'saved_at': datetime.datetime.utcnow()
         }
         
+        # Only a counter lives on the user document; the question has its own collection
         result = mongo.db.users.update_one(
             {'_id': user_id},
-            {'$push': {'saved_questions': question_data}}
+            {'$inc': {'saved_question_count': 1}}
         )
         
-        if result.modified_count == 0:
+        if result.matched_count == 0:
             return jsonify({'error': 'Failed to save question'}), 400
+
+        mongo.db.saved_questions.insert_one(question_data)
             
         return jsonify({'message': 'Question saved successfully'}), 200
         
     except Exception as e:
-        app.logger.error(f"Error saving question: {str(e)}")
+        logger.error(f"Error saving question: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/get-saved-questions', methods=['GET'])
+@api.route('/get-saved-questions', methods=['GET'])
 @jwt_required()
 def get_saved_questions():
     try:
-        user_id = get_jwt_identity()
-        user = mongo.db.users.find_one(
-            {'_id': user_id},
-            {'saved_questions': 1}
+        query = {'user_id': ObjectId(get_jwt_identity())}
+        if request.args.get('skill'):
+            query['skill'] = request.args['skill']
+
+        questions, next_cursor = paginate(
+            mongo.db.saved_questions,
+            query,
+            request.args.get('cursor'),
+            request.args.get('limit')
         )
+        return jsonify({'saved_questions': questions, 'next_cursor': next_cursor}), 200
         
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-            
-        return jsonify({'saved_questions': user.get('saved_questions', [])}), 200
-        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api.route('/answer-history', methods=['GET'])
+@jwt_required()
+def get_answer_history():
+    try:
+        query = {'user_id': ObjectId(get_jwt_identity())}
+        if request.args.get('skill'):
+            query['skill'] = request.args['skill']
+
+        history, next_cursor = paginate(
+            mongo.db.answer_history,
+            query,
+            request.args.get('cursor'),
+            request.args.get('limit')
+        )
+        return jsonify({'answer_history': history, 'next_cursor': next_cursor}), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error fetching answer history: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/admin/db-stats', methods=['GET'])
+@admin_required()
+def get_db_stats():
+    try:
+        response = {
+            'slow_query_ms': current_app.config['MONGO_SLOW_QUERY_MS'],
+            'operations': query_timer.stats()
+        }
+        if request.args.get('explain'):
+            response['slow_query_plans'] = explain_slow_queries(mongo.db, query_timer)
+        return jsonify(response), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching db stats: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Create the indexes the app relies on"""
+    ensure_indexes(mongo.db)
+    print("Indexes are in place")
+
+@api.cli.command('migrate-history')
+def migrate_history_command():
+    """Move embedded answer_history/saved_questions arrays into their own collections"""
+    ensure_history_indexes(mongo.db)
+    moved = migrate_embedded_history(mongo.db)
+    print(f"Migrated {moved['answer_history']} graded answers and "
+          f"{moved['saved_questions']} saved questions for {moved['users']} users")
+
+@api.cli.command('normalize-skills')
+def normalize_skills_command():
+    """Rewrite users' skills as canonical taxonomy names and recount skill_counts"""
+    changed = normalize_user_skills(mongo.db)
+    rebuild_skill_counts(mongo.db)
+    print(f"Normalized skills for {changed} users and rebuilt skill counts")
+
+@api.cli.command('build-question-bank')
+@click.option('--skills', default='', help='Comma-separated skills; defaults to the whole taxonomy')
+@click.option('--target', type=int, default=None, help='Questions per skill/difficulty/level/type combination')
+@click.option('--workers', type=int, default=None, help='Concurrent Gemini calls')
+def build_question_bank_command(skills, target, workers):
+    """Pre-generate interview questions into the question bank; safe to re-run"""
+    # The builder's threads have no app context, so they get the bank and client themselves
+    client = llm._get_current_object()
+    summary = build_question_bank(
+        question_bank._get_current_object(),
+        lambda skill, difficulty, level, question_type: generate_questions_with_gemini(
+            [skill], "", level, {question_type: True}, difficulty, client=client
+        ),
+        skills=[s for s in skills.split(',') if s.strip()],
+        target=target or current_app.config['QUESTION_BANK_TARGET'],
+        workers=workers or current_app.config['QUESTION_BANK_BUILD_WORKERS']
+    )
+    print(f"{summary['complete']}/{summary['combinations']} combinations complete, {summary['added']} questions added")
+    for combo in summary['incomplete']:
+        print(f"  incomplete: {combo}")
+
+@api.cli.command('rebuild-skill-counts')
+def rebuild_skill_counts_command():
+    """Recount skill_counts from the users collection"""
+    rebuild_skill_counts(mongo.db)
+    print("Skill counts rebuilt")
+
 def extract_json_from_text(text):
     """Extract and parse JSON from text response"""
     try:
@@ -518,188 +1100,452 @@ def extract_json_from_text(text):
                 raise Exception("Failed to parse JSON from response")
         raise Exception("No valid JSON found in response")
 
-def analyze_resume_with_gemini(resume_text, job_description, api_key):
+def build_analysis_prompt(resume_text, job_description, resume_max_tokens=None, job_max_tokens=None):
+    """The analysis prompt, with the resume and job description compacted to their token budgets"""
+    resume_text = compact_resume(resume_text, resume_max_tokens)
+    job_description = compact_job_description(job_description, job_max_tokens)
+    return f"""
+    ACT AS AN EXPERT RESUME ANALYST. Analyze this resume against the job description and provide 
+    a detailed technical analysis with actionable insights.
+
+    RESUME CONTENT:
+    {resume_text}
+
+    JOB DESCRIPTION:
+    {job_description}
+
+    ANALYSIS REQUIREMENTS:
+    1. Evaluate ATS compatibility (0-100 score) considering:
+       - Proper section headings (Experience, Education, Skills)
+       - Keyword optimization
+       - Readable formatting (no complex tables/graphics)
+       - Standard file structure
+
+    2. Calculate job match score (0-100) based on:
+       - Skill alignment (weight: 40%)
+       - Experience relevance (weight: 30%)
+       - Qualification match (weight: 20%)
+       - Cultural fit indicators (weight: 10%)
+
+    3. Provide specific, actionable suggestions for improvement
+
+    RESPONSE FORMAT (STRICT JSON ONLY):
+    {{
+        "atsScore": <int 0-100>,
+        "jobMatchScore": <int 0-100>,
+        "scoreBreakdown": {{
+            "skillsMatch": <int 0-100>,
+            "experienceMatch": <int 0-100>,
+            "educationMatch": <int 0-100>
+        }},
+        "matchingSkills": [<string>],
+        "missingSkills": [<string>],
+        "atsIssues": [<string>],
+        "suggestions": [
+            {{
+                "category": "formatting|content|skills",
+                "suggestion": <string>,
+                "priority": "high|medium|low"
+            }}
+        ]
+    }}
+
+    IMPORTANT:
+    - Be critical but constructive
+    - Focus on quantifiable improvements
+    - Avoid generic advice
+    - Return ONLY valid JSON (no commentary)
+    - Ensure all arrays are properly formatted
+    - Ensure all suggestions have category, suggestion, and priority fields
+    """
+
+def parse_analysis(text):
+    """Parse an analysis response and coerce it to the shape the frontend expects"""
+    try:
+        result = extract_json_from_text(text)
+    except Exception:
+        metrics.inc('llm_parse_failures_total', site='analyze')
+        raise
+
+    # Validate and ensure proper format
+    if not isinstance(result, dict):
+        raise ValueError("Invalid response format: expected dictionary")
+
+    # Ensure all required fields exist with proper types
+    required_fields = {
+        'atsScore': int,
+        'jobMatchScore': int,
+        'matchingSkills': list,
+        'missingSkills': list,
+        'atsIssues': list,
+        'suggestions': list
+    }
+
+    for field, field_type in required_fields.items():
+        if field not in result:
+            result[field] = [] if field_type == list else 0
+        elif not isinstance(result[field], field_type):
+            result[field] = [] if field_type == list else 0
+
+    # Validate suggestions format
+    if result['suggestions']:
+        valid_suggestions = []
+        for suggestion in result['suggestions']:
+            if isinstance(suggestion, dict) and all(k in suggestion for k in ['category', 'suggestion', 'priority']):
+                valid_suggestions.append({
+                    'category': str(suggestion['category']),
+                    'suggestion': str(suggestion['suggestion']),
+                    'priority': str(suggestion['priority'])
+                })
+        result['suggestions'] = valid_suggestions
+
+    return result
+
+def analyze_resume_with_gemini(resume_text, job_description):
     """Analyze resume using Gemini API"""
+    with gemini_api_errors():
+        prompt = resume_analysis_prompt(resume_text, job_description)
+        return parse_analysis(llm.generate(prompt, 'analyze'))
+
+def resume_analysis_prompt(resume_text, job_description):
+    return build_analysis_prompt(
+        resume_text,
+        job_description,
+        current_app.config['RESUME_PROMPT_MAX_TOKENS'],
+        current_app.config['JOB_DESCRIPTION_MAX_TOKENS']
+    )
+
+@contextlib.contextmanager
+def gemini_api_errors():
+    """Report a failed analysis call as a Gemini API error, unless the resilience layer gave up on it"""
+    try:
+        yield
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        raise Exception(f"Gemini API error: {str(e)}")
+
+@api.route('/analyze-resume', methods=['POST'])
+@jwt_required()
+def analyze_resume():
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
+        file = request.files.get('resume')
+        job_description, mode = parse_analysis_request(file.filename if file is not None else None, request.form)
+
+        # Extract text straight from the uploaded stream
+        resume = load_resume(file.stream)
+
+        if mode != 'llm':
+            return reply(local_analysis(
+                current_app._get_current_object(),
+                get_jwt_identity(),
+                resume,
+                job_description,
+                mode
+            ))
         
-        prompt = f"""
-        ACT AS AN EXPERT RESUME ANALYST. Analyze this resume against the job description and provide 
-        a detailed technical analysis with actionable insights.
+        # Analyze resume using Gemini
+        analysis = analyze_resume_with_gemini(
+            resume['text'], 
+            job_description
+        )
+        analysis['mode'] = mode
+        
+        return reply(analysis)
+                
+    except Exception as e:
+        return reply(*analysis_error_reply(e))
 
-        RESUME CONTENT:
-        {resume_text}
+def parse_analysis_request(filename, form):
+    """(job_description, mode) from an /analyze-resume upload; filename is None when no file was sent"""
+    if filename is None:
+        raise RequestError('No resume file uploaded')
 
-        JOB DESCRIPTION:
-        {job_description}
+    job_description = form.get('jobDescription', '')
+    mode = form.get('mode') or current_app.config['ANALYSIS_DEFAULT_MODE']
 
-        ANALYSIS REQUIREMENTS:
-        1. Evaluate ATS compatibility (0-100 score) considering:
-           - Proper section headings (Experience, Education, Skills)
-           - Keyword optimization
-           - Readable formatting (no complex tables/graphics)
-           - Standard file structure
+    if not filename or not allowed_file(filename):
+        raise RequestError('Invalid file type. Please upload a PDF or Word document')
 
-        2. Calculate job match score (0-100) based on:
-           - Skill alignment (weight: 40%)
-           - Experience relevance (weight: 30%)
-           - Qualification match (weight: 20%)
-           - Cultural fit indicators (weight: 10%)
+    if not job_description:
+        raise RequestError('Job description is required')
 
-        3. Provide specific, actionable suggestions for improvement
+    if mode not in ANALYSIS_MODES:
+        raise RequestError(f"mode must be one of: {', '.join(ANALYSIS_MODES)}")
+    return job_description, mode
 
-        RESPONSE FORMAT (STRICT JSON ONLY):
-        {{
-            "atsScore": <int 0-100>,
-            "jobMatchScore": <int 0-100>,
-            "scoreBreakdown": {{
-                "skillsMatch": <int 0-100>,
-                "experienceMatch": <int 0-100>,
-                "educationMatch": <int 0-100>
-            }},
-            "matchingSkills": [<string>],
-            "missingSkills": [<string>],
-            "atsIssues": [<string>],
-            "suggestions": [
-                {{
-                    "category": "formatting|content|skills",
-                    "suggestion": <string>,
-                    "priority": "high|medium|low"
-                }}
-            ]
-        }}
+def analysis_error_reply(error):
+    """The reply for a failed /analyze-resume"""
+    if isinstance(error, RequestError):
+        return {'error': str(error)}, error.status, {}
+    if isinstance(error, LLMUnavailableError):
+        logger.error(f"Resume analysis unavailable: {str(error)}")
+        return unavailable_reply(error)
+    logger.error(f"Resume analysis error: {str(error)}")
+    return {'error': str(error)}, 500, {}
 
-        IMPORTANT:
-        - Be critical but constructive
-        - Focus on quantifiable improvements
-        - Avoid generic advice
-        - Return ONLY valid JSON (no commentary)
-        - Ensure all arrays are properly formatted
-        - Ensure all suggestions have category, suggestion, and priority fields
-        """
-        
-        response = model.generate_content(prompt)
-        result = extract_json_from_text(response.text)
-        
-        # Validate and ensure proper format
-        if not isinstance(result, dict):
-            raise ValueError("Invalid response format: expected dictionary")
-            
-        # Ensure all required fields exist with proper types
-        required_fields = {
-            'atsScore': int,
-            'jobMatchScore': int,
-            'matchingSkills': list,
-            'missingSkills': list,
-            'atsIssues': list,
-            'suggestions': list
-        }
-        
-        for field, field_type in required_fields.items():
-            if field not in result:
-                result[field] = [] if field_type == list else 0
-            elif not isinstance(result[field], field_type):
-                result[field] = [] if field_type == list else 0
-                
-        # Validate suggestions format
-        if result['suggestions']:
-            valid_suggestions = []
-            for suggestion in result['suggestions']:
-                if isinstance(suggestion, dict) and all(k in suggestion for k in ['category', 'suggestion', 'priority']):
-                    valid_suggestions.append({
-                        'category': str(suggestion['category']),
-                        'suggestion': str(suggestion['suggestion']),
-                        'priority': str(suggestion['priority'])
-                    })
-            result['suggestions'] = valid_suggestions
-            
-        return result
-        
+@api.route('/analyze-resume/jobs', methods=['POST'])
+@jwt_required()
+def submit_resume_analysis():
+    try:
+        # Validated as /analyze-resume validates; a queued job always runs the full LLM analysis
+        file = request.files.get('resume')
+        job_description, _ = parse_analysis_request(file.filename if file is not None else None, request.form)
+
+        # The request stream is gone once we return, so hand the worker its own copy
+        job_id = analysis_jobs.submit(
+            get_jwt_identity(),
+            'analyze-resume',
+            run_resume_analysis,
+            current_app._get_current_object(),
+            file.read(),
+            job_description
+        )
+        return jsonify({'jobId': job_id, 'status': 'queued'}), 202
+
+    except RequestError as e:
+        return reply({'error': str(e)}, e.status)
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        raise Exception(f"Gemini API error: {str(e)}")
+        logger.error(f"Resume analysis submit error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
 
-@app.route('/analyze-resume', methods=['POST'])
+@api.route('/analyze-resume/jobs/<job_id>', methods=['GET'])
 @jwt_required()
-def analyze_resume():
+def get_resume_analysis(job_id):
     try:
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No resume file uploaded'}), 400
-            
-        file = request.files['resume']
-        job_description = request.form.get('jobDescription', '')
-        
-        if not file or not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Please upload a PDF or Word document'}), 400
-            
-        if not job_description:
-            return jsonify({'error': 'Job description is required'}), 400
+        job = analysis_jobs.get(job_id, get_jwt_identity())
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+
+        response = {'jobId': job_id, 'status': job['status']}
+        if job['status'] == 'done':
+            response['result'] = job['result']
+        elif job['status'] == 'failed':
+            response['error'] = job.get('error', 'Analysis failed')
+        return jsonify(response), 200
 
-        # Save the file temporarily
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        try:
-            # Extract text from resume
-            resume_text = extract_text_from_resume(filepath)
-            
-            # Analyze resume using Gemini
-            analysis = analyze_resume_with_gemini(
-                resume_text, 
-                job_description,
-                app.config['GEMINI_API_KEY']
-            )
-            
-            return jsonify(analysis), 200
-            
-        finally:
-            # Clean up the temporary file
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                
     except Exception as e:
-        app.logger.error(f"Resume analysis error: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+        logger.error(f"Resume analysis status error: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+ANALYSIS_MODES = ('fast', 'llm', 'hybrid')
 
-def extract_text_from_resume(filepath):
-    """Extract text from PDF resume"""
+def local_analysis(app, user_id, resume, job_description, mode):
+    """/analyze-resume without waiting on Gemini: local scores, plus for hybrid a queued job for LLM suggestions"""
+    # Imported on first use to keep numpy out of worker start-up
+    from resume_matcher import fast_analysis
+
+    analysis = fast_analysis(resume['text'], job_description, resume['skills'])
+    analysis['mode'] = mode
+    if mode == 'hybrid':
+        findings = {key: analysis[key] for key in ('jobMatchScore', 'matchingSkills', 'missingSkills', 'atsIssues')}
+        try:
+            with app.app_context():
+                analysis['suggestionsJobId'] = analysis_jobs.submit(
+                    user_id,
+                    'resume-suggestions',
+                    run_resume_suggestions,
+                    app,
+                    resume['text'],
+                    job_description,
+                    findings
+                )
+        except QueueFullError as e:
+            # The local suggestions stand in; the scores never depended on the job
+            logger.error(f"Resume suggestions not queued: {str(e)}")
+    return analysis
+
+def build_suggestions_prompt(resume_text, job_description, findings, resume_max_tokens=None, job_max_tokens=None):
+    return f"""
+    ACT AS AN EXPERT RESUME COACH. A resume has already been scored against a job description;
+    give specific, actionable suggestions to improve it for this job.
+
+    RESUME CONTENT:
+    {compact_resume(resume_text, resume_max_tokens)}
+
+    JOB DESCRIPTION:
+    {compact_job_description(job_description, job_max_tokens)}
+
+    FINDINGS SO FAR:
+    - Job match score: {findings['jobMatchScore']}/100
+    - Matching skills: {', '.join(findings['matchingSkills']) or 'none found'}
+    - Missing skills: {', '.join(findings['missingSkills']) or 'none found'}
+    - ATS issues: {'; '.join(findings['atsIssues']) or 'none found'}
+
+    RESPONSE FORMAT (STRICT JSON ONLY):
+    {{
+        "suggestions": [
+            {{
+                "category": "formatting|content|skills",
+                "suggestion": <string>,
+                "priority": "high|medium|low"
+            }}
+        ]
+    }}
+
+    IMPORTANT:
+    - Return 3 to 8 suggestions, most impactful first
+    - Avoid generic advice; refer to the resume's actual content
+    - Return ONLY valid JSON (no commentary)
+    """
+
+def run_resume_suggestions(app, resume_text, job_description, findings):
+    """Worker body for hybrid analyses: ask Gemini for suggestions only"""
+    with app.app_context():
+        prompt = build_suggestions_prompt(
+            resume_text,
+            job_description,
+            findings,
+            current_app.config['RESUME_PROMPT_MAX_TOKENS'],
+            current_app.config['JOB_DESCRIPTION_MAX_TOKENS']
+        )
+        return {'suggestions': parse_analysis(llm.generate(prompt, 'analyze'))['suggestions']}
+
+def run_resume_analysis(app, pdf_bytes, job_description):
+    """Worker body for queued analyses: extract the resume text and analyze it"""
+    with app.app_context():
+        resume_text = load_resume(io.BytesIO(pdf_bytes))['text']
+        return analyze_resume_with_gemini(resume_text, job_description)
+
+def load_resume(stream):
+    """Return the extracted text and skills for an uploaded PDF, using the shared cache"""
+    def extract(source):
+        text = extract_text_from_resume(source)
+        return {'text': text, 'skills': extract_skills(text)}
+
+    return resume_cache.get_or_extract(
+        stream,
+        extract,
+        current_app.config['PDF_MAX_PAGES'],
+        current_app.config['PDF_MAX_TEXT_CHARS']
+    )
+
+def extract_text_from_resume(source):
+    """Extract text from PDF resume given as a path or binary stream"""
     try:
-        with open(filepath, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            text = "".join(page.extract_text() for page in reader.pages)
-            return text
+        return extract_pdf_text(
+            source,
+            current_app.config['PDF_MAX_PAGES'],
+            current_app.config['PDF_MAX_TEXT_CHARS']
+        )
     except Exception as e:
         raise Exception(f"Failed to process resume: {str(e)}")
 
-@app.route('/admin/users', methods=['GET'])
-@jwt_required()
+ADMIN_USER_FIELDS = {'_id': 1, 'name': 1, 'email': 1, 'role': 1}
+ADMIN_USER_OPTIONAL_FIELDS = {'skills', 'saved_question_count'}
+
+@api.route('/admin/users', methods=['GET'])
+@admin_required()
 def get_all_users():
     try:
-        # Get the current user
+        # The role claim was already checked by admin_required
         user_id = get_jwt_identity()
-        current_user = mongo.db.users.find_one({'_id': ObjectId(user_id)})
-        
-        # Check if user is admin
-        if not current_user or current_user.get('role') != 'admin':
-            return jsonify({'error': 'Unauthorized access'}), 403
-            
-        # Get all users except the current admin
-        users = list(mongo.db.users.find(
-            {'_id': {'$ne': ObjectId(user_id)}},
-            {'password': 0}  # Exclude password field
-        ))
+
+        # Lean projection by default; extra fields are opt-in via ?fields=
+        projection = dict(ADMIN_USER_FIELDS)
+        for field in request.args.get('fields', '').split(','):
+            if field.strip() in ADMIN_USER_OPTIONAL_FIELDS:
+                projection[field.strip()] = 1
+
+        # Get all users except the current admin, in _id order
+        id_filter = {'$ne': ObjectId(user_id)}
+        query = {'_id': id_filter}
+        if request.args.get('cursor'):
+            id_filter['$gt'] = ObjectId(request.args['cursor'])
+        if request.args.get('role'):
+            query['role'] = request.args['role']
+        if request.args.get('skill'):
+            query['skills'] = canonical_skill(request.args['skill'])
+        if request.args.get('email_prefix'):
+            # Anchored, case-sensitive prefix so the email index can be used
+            query['email'] = {'$regex': '^' + re.escape(request.args['email_prefix'])}
+
+        users = mongo.db.users.find(query, projection).sort('_id', 1)
+
+        if request.args.get('format') == 'ndjson':
+            def rows():
+                for user in users.batch_size(500):
+                    user['_id'] = str(user['_id'])
+                    yield json.dumps(user, default=str) + "\n"
+
+            return Response(stream_with_context(rows()), mimetype='application/x-ndjson')
+
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        page = list(users.limit(limit + 1))
+        next_cursor = str(page[limit - 1]['_id']) if len(page) > limit else None
         
         # Convert ObjectId to string for JSON serialization
-        for user in users:
+        page = page[:limit]
+        for user in page:
             user['_id'] = str(user['_id'])
             
-        return jsonify({'users': users}), 200
+        return jsonify({'users': page, 'next_cursor': next_cursor}), 200
         
+    except (InvalidId, ValueError):
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+    except Exception as e:
+        logger.error(f"Error fetching users: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.route('/admin/skills', methods=['GET'])
+@admin_required()
+def get_skill_counts():
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+        return jsonify({'skills': top_skills(mongo.db, limit)}), 200
+
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
     except Exception as e:
-        app.logger.error(f"Error fetching users: {str(e)}")
+        logger.error(f"Error fetching skill counts: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@api.route('/admin/skills/<path:skill>', methods=['GET'])
+@admin_required()
+def get_skill(skill):
+    try:
+        # Aliases resolve to the canonical name, e.g. k8s -> Kubernetes
+        canonical = canonical_skill(skill)
+        return jsonify({'skill': canonical, 'count': skill_count(mongo.db, canonical)}), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching skill count: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.route('/admin/cache-stats', methods=['GET'])
+@admin_required()
+def get_cache_stats():
+    try:
+        return jsonify({
+            'resume': resume_cache.stats(),
+            'questions': question_cache.stats(),
+            'answers': answer_store.stats(),
+            'bank': question_bank.stats()
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching cache stats: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.route('/admin/llm-stats', methods=['GET'])
+@admin_required()
+def get_llm_stats():
+    try:
+        return jsonify(llm.stats()), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching LLM stats: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        return jsonify({'error': 'Unauthorized'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    app = create_app()
     app.run(debug=True, port=5000)
\ No newline at end of file
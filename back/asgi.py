@@ -0,0 +1,296 @@
+"""ASGI entrypoint that serves the LLM-bound endpoints as coroutines.
+
+/generate, /grade-answer, /get-answer and /analyze-resume run on the event
+loop with the async LLM client and the async Mongo driver, so a waiting model
+call holds no thread. Every other path is passed through to the Flask app on
+a thread pool, which keeps the token blocklist and caches shared in-process.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextlib
+import time
+from functools import wraps
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from pymongo import AsyncMongoClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import metrics
+from app import (
+    FALLBACK_ANSWER, FALLBACK_GRADE, RequestError, analysis_error_reply, answer_response, build_answer_prompt,
+    build_grade_prompt, clean_answer, create_app, draw_bank_questions, ensure_app_indexes, gemini_api_errors,
+    graded_answer, in_app_context, load_resume, local_analysis, logger, parse_analysis, parse_analysis_request,
+    parse_answer_request, parse_grade, parse_grade_request, parse_question_request, question_cache_key,
+    questions_error_reply, questions_response, resume_analysis_prompt, view_error_reply
+)
+from gemini_utils import generate_questions_async, generate_questions_in_chunks_async
+
+flask_app = create_app()
+# The Flask app's services, read directly since the coroutines run outside its app context
+services = flask_app.extensions['skillmatrix']
+
+# Question sets being generated, so concurrent misses for one key share a single task
+_question_calls = {}
+
+
+def authenticate(request):
+    """Check the bearer token exactly as @jwt_required() does in the Flask views.
+
+    Returns (identity, None), or (None, response) with the same error body and
+    status flask_jwt_extended would have produced.
+    """
+    with flask_app.test_request_context(request.url.path, method=request.method, headers=list(request.headers.items())):
+        try:
+            verify_jwt_in_request()
+            return get_jwt_identity(), None
+        except Exception as e:
+            error = flask_app.make_response(flask_app.handle_user_exception(e))
+            return None, Response(error.get_data(), status_code=error.status_code, media_type=error.mimetype)
+
+
+def jwt_required_async(view):
+    @wraps(view)
+    async def wrapper(request):
+        identity, error = authenticate(request)
+        if error is not None:
+            return error
+        request.state.user_id = identity
+        return await view(request)
+    return wrapper
+
+
+def too_large(request):
+    """Whether the declared body exceeds MAX_CONTENT_LENGTH; a malformed Content-Length is a RequestError"""
+    length = request.headers.get('content-length')
+    if length is None:
+        return False
+    if not length.isdigit():
+        raise RequestError('Invalid Content-Length header')
+    return int(length) > flask_app.config['MAX_CONTENT_LENGTH']
+
+
+async def read_json(request):
+    """request.get_json() equivalent: None when the body is missing or not JSON"""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def reply(body, status=200, headers=None):
+    """The Starlette response for a (body, status, headers) reply"""
+    return JSONResponse(body, status, headers=headers)
+
+
+async def grade_with_gemini_async(question, user_answer, skill):
+    """grade_with_gemini for coroutines"""
+    try:
+        return parse_grade(await services.llm.generate_async(build_grade_prompt(question, user_answer, skill), 'grade'))
+    except Exception as e:
+        logger.error(f"Gemini grading error: {str(e)}")
+        return FALLBACK_GRADE
+
+
+async def get_answer_from_gemini_async(question, skill, difficulty):
+    """get_answer_from_gemini for coroutines"""
+    # The answer store is a quick keyed lookup on the sync driver; only the model call is awaited
+    cached = await asyncio.to_thread(services.answer_store.get, question, skill, difficulty)
+    if cached:
+        return cached
+
+    try:
+        text = await services.llm.generate_async(build_answer_prompt(question, skill, difficulty), 'answer')
+        answer = clean_answer(text)
+        await asyncio.to_thread(services.answer_store.put, question, skill, difficulty, answer)
+        return answer
+    except Exception as e:
+        logger.error(f"Gemini answer generation error: {str(e)}")
+        return FALLBACK_ANSWER
+
+
+async def generate_question_set_async(skills, job_description, experience_level, question_types, difficulty):
+    chunk_size = flask_app.config['QUESTION_CHUNK_SIZE']
+    if skills and chunk_size and len(skills) > chunk_size:
+        questions, failed_skills = await generate_questions_in_chunks_async(
+            skills,
+            chunk_size,
+            experience_level,
+            question_types,
+            difficulty,
+            services.llm
+        )
+    else:
+        questions = await generate_questions_async(
+            skills, job_description, experience_level, question_types, difficulty, services.llm
+        )
+        failed_skills = []
+    return {'questions': questions, 'failedSkills': failed_skills}
+
+
+async def cached_question_set(key, fresh, compute):
+    """question_cache.get_or_compute for coroutines"""
+    task = _question_calls.get(key)
+    if task is None:
+        if not fresh:
+            cached = services.question_cache.get(key)
+            if cached is not None:
+                return cached
+
+        async def run():
+            result = await compute()
+            services.question_cache.put(key, result)
+            return result
+
+        task = _question_calls[key] = asyncio.ensure_future(run())
+        task.add_done_callback(lambda _: _question_calls.pop(key, None))
+    # A client disconnecting must not cancel the call other requests are waiting on
+    return await asyncio.shield(task)
+
+
+@jwt_required_async
+async def get_questions(request):
+    bank_questions, params = [], None
+    try:
+        params, fresh = parse_question_request(await read_json(request))
+        bank_questions, params = await asyncio.to_thread(
+            in_app_context(flask_app, draw_bank_questions), request.state.user_id, params
+        )
+        if bank_questions and not params.skills:
+            return reply({'questions': bank_questions})
+
+        cache_key = question_cache_key(*params)
+        result = await cached_question_set(cache_key, fresh, lambda: generate_question_set_async(*params))
+        response = questions_response(bank_questions, result)
+        if 'failedSkills' in response:
+            services.question_cache.invalidate(cache_key)
+        return reply(response)
+
+    except Exception as e:
+        return reply(*questions_error_reply(e, bank_questions, params))
+
+
+@jwt_required_async
+async def grade_answer(request):
+    try:
+        question, user_answer, skill = parse_grade_request(await read_json(request))
+        result = await grade_with_gemini_async(question, user_answer, skill)
+        entry, response = graded_answer(request.state.user_id, question, user_answer, skill, result)
+        await request.app.state.db.answer_history.insert_one(entry)
+        return reply(response)
+
+    except Exception as e:
+        return reply(*view_error_reply(e, 'grade_answer', 'Failed to grade answer'))
+
+
+@jwt_required_async
+async def get_answer(request):
+    try:
+        question, skill, difficulty = parse_answer_request(await read_json(request))
+        answer = await get_answer_from_gemini_async(question, skill, difficulty)
+        return reply(answer_response(answer))
+
+    except Exception as e:
+        return reply(*view_error_reply(e, 'get_answer', 'Failed to get answer'))
+
+
+@jwt_required_async
+async def analyze_resume(request):
+    try:
+        if too_large(request):
+            return reply({'error': 'File too large'}, 413)
+
+        form = await request.form()
+        file = form.get('resume')
+        with flask_app.app_context():
+            job_description, mode = parse_analysis_request(getattr(file, 'filename', None), form)
+
+        # PDF parsing is CPU-bound, so it runs off the event loop
+        resume = await asyncio.to_thread(in_app_context(flask_app, load_resume), file.file)
+
+        if mode != 'llm':
+            # Local scoring is CPU work and hybrid mode queues a job, so neither runs on the loop
+            analysis = await asyncio.to_thread(
+                local_analysis, flask_app, request.state.user_id, resume, job_description, mode
+            )
+            return reply(analysis)
+
+        with gemini_api_errors():
+            with flask_app.app_context():
+                prompt = resume_analysis_prompt(resume['text'], job_description)
+            analysis = parse_analysis(await services.llm.generate_async(prompt, 'analyze'))
+        analysis['mode'] = mode
+
+        return reply(analysis)
+
+    except Exception as e:
+        return reply(*analysis_error_reply(e))
+
+
+class RequestTimer:
+    """Records http_request_duration_seconds for the async routes, as the Flask hooks do for the rest"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = {'code': 500}
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.observe(
+                'http_request_duration_seconds',
+                time.perf_counter() - start,
+                route=scope['path'],
+                method=scope['method'],
+                status=str(status['code'])
+            )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    client = AsyncMongoClient(flask_app.config['MONGO_URI'], event_listeners=[services.query_timer])
+    app.state.db = client.get_default_database()
+    await asyncio.to_thread(ensure_app_indexes, flask_app)
+    try:
+        yield
+    finally:
+        await client.close()
+
+
+async_app = Starlette(
+    routes=[
+        Route('/generate', get_questions, methods=['POST']),
+        Route('/grade-answer', grade_answer, methods=['POST']),
+        Route('/get-answer', get_answer, methods=['POST']),
+        Route('/analyze-resume', analyze_resume, methods=['POST']),
+    ],
+    middleware=[Middleware(RequestTimer), Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+ASYNC_PATHS = {route.path for route in async_app.routes}
+
+wsgi_app = WSGIMiddleware(flask_app, workers=flask_app.config['ASGI_WSGI_THREADS'])
+
+
+async def app(scope, receive, send):
+    """Route the async paths (and lifespan events) to Starlette and everything else to Flask"""
+    if scope['type'] == 'lifespan' or scope.get('path') in ASYNC_PATHS:
+        await async_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
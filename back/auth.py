@@ -0,0 +1,82 @@
+import calendar
+import datetime
+import logging
+import threading
+import time
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class UserChangeList:
+    """Record of users whose tokens must be re-issued, kept in Mongo so every worker sees it.
+
+    Tokens issued before a user's recorded change time are rejected, so a
+    password, role or profile change takes effect on all workers at once
+    instead of when the token expires. Records older than the token lifetime
+    are dropped by a TTL index, as every token they could reject has expired
+    anyway. Each process also remembers the changes it made itself, which is
+    what it falls back to while Mongo can't be reached.
+    """
+
+    def __init__(self, collection, token_lifetime_seconds):
+        self.collection = collection
+        self.token_lifetime_seconds = token_lifetime_seconds
+        self._changed_at = {}
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    def mark_changed(self, user_id):
+        now = int(time.time())
+        with self._lock:
+            self._changed_at[str(user_id)] = now
+            cutoff = now - self.token_lifetime_seconds
+            for key in [k for k, v in self._changed_at.items() if v < cutoff]:
+                del self._changed_at[key]
+        try:
+            self._ensure_indexes()
+            self.collection.update_one(
+                {'_id': str(user_id)},
+                {'$set': {'changed_at': datetime.datetime.utcfromtimestamp(now)}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            # The change itself is saved; only other workers keep accepting the old tokens
+            logger.error(f"Could not record token change for user {user_id}: {str(e)}")
+
+    def is_stale(self, jwt_payload):
+        user_id = str(jwt_payload.get('sub'))
+        try:
+            record = self.collection.find_one({'_id': user_id})
+            changed_at = calendar.timegm(record['changed_at'].utctimetuple()) if record else None
+        except PyMongoError as e:
+            logger.error(f"Could not check token changes, using this worker's record: {str(e)}")
+            with self._lock:
+                changed_at = self._changed_at.get(user_id)
+        return changed_at is not None and jwt_payload.get('iat', 0) < changed_at
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index('changed_at', expireAfterSeconds=int(self.token_lifetime_seconds))
+            self._indexed = True
+
+
+def token_claims(user):
+    """Role and minimal profile carried in the access token"""
+    return {'role': user.get('role', 'user'), 'name': user.get('name', ''), 'email': user.get('email', '')}
+
+
+def admin_required():
+    """Like jwt_required(), but also requires the token's role claim to be admin"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if get_jwt().get('role') != 'admin':
+                return jsonify({'error': 'Unauthorized access'}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
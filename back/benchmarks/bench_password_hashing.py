@@ -0,0 +1,44 @@
+"""Benchmark password checks through the bcrypt pool.
+
+Reports logins per second overall and per core for a bcrypt cost, with
+--clients threads submitting checks concurrently the way request workers do.
+
+    python benchmarks/bench_password_hashing.py --rounds 12 --clients 16 --logins 200
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_hasher import PasswordHasher  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=0, help='bcrypt cost; 0 calibrates to --target-ms')
+    parser.add_argument('--target-ms', type=float, default=250)
+    parser.add_argument('--workers', type=int, default=0, help='hashing pool size; 0 uses one per CPU')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=100)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    hasher = PasswordHasher(args.rounds or None, args.target_ms, args.workers or None, max_pending=args.clients)
+    stored = hasher.hash('correct horse battery staple')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as clients:
+        results = list(clients.map(lambda _: hasher.check('correct horse battery staple', stored), range(args.logins)))
+    elapsed = time.perf_counter() - start
+
+    assert all(results)
+    rate = args.logins / elapsed
+    print(f"bcrypt cost {hasher.rounds}, {cores} cores, {args.clients} concurrent clients")
+    print(f"{args.logins} logins in {elapsed:.2f}s: {rate:.1f} logins/s, {rate / cores:.1f} logins/s/core")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Micro-benchmark for the compiled skill matcher.
+
+Compares the single-pass taxonomy matcher with the old per-pattern loop on
+large synthetic resumes and a taxonomy padded out to --entries skills.
+
+    python benchmarks/bench_skill_matcher.py --entries 2000 --resume-kb 256
+"""
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_matcher import SkillMatcher, load_taxonomy  # noqa: E402
+
+
+def synthetic_taxonomy(size, rng):
+    taxonomy = load_taxonomy()
+    while len(taxonomy) < size:
+        name = ''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(4, 12)))
+        alias = name[:3].upper() + str(rng.randint(0, 99))
+        taxonomy.append((name, [alias]))
+    return taxonomy
+
+
+def synthetic_resume(taxonomy, size_kb, rng):
+    words = ['developed', 'led', 'team', 'services', 'using', 'built', 'the', 'and', 'with', 'scalable']
+    terms = [name for name, _ in taxonomy] + [a for _, aliases in taxonomy for a in aliases]
+    parts, length = [], 0
+    while length < size_kb * 1024:
+        token = rng.choice(terms) if rng.random() < 0.05 else rng.choice(words)
+        parts.append(token)
+        length += len(token) + 1
+    return ' '.join(parts)
+
+
+def legacy_extract(patterns, text):
+    return list({re.search(p, text, re.I).group(0) for p in patterns if re.search(p, text, re.I)})
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--resume-kb', type=int, default=64)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    taxonomy = synthetic_taxonomy(args.entries, rng)
+    text = synthetic_resume(taxonomy, args.resume_kb, rng)
+
+    start = time.perf_counter()
+    matcher = SkillMatcher(taxonomy)
+    compile_s = time.perf_counter() - start
+
+    patterns = [r'(?<!\w)' + re.escape(t) + r'(?!\w)' for name, aliases in taxonomy for t in [name] + aliases]
+    match_s, skills = timed(lambda: matcher.match(text), args.repeat)
+    legacy_s, _ = timed(lambda: legacy_extract(patterns, text), 1)
+
+    mb = len(text) / (1024 * 1024)
+    print(f"taxonomy entries: {len(taxonomy)} ({len(patterns)} terms), resume: {len(text) // 1024} KB")
+    print(f"compile:          {compile_s * 1000:.1f} ms")
+    print(f"single pass:      {match_s * 1000:.1f} ms  ({mb / match_s:.1f} MB/s, {len(skills)} skills)")
+    print(f"per-pattern loop: {legacy_s * 1000:.1f} ms  ({mb / legacy_s:.2f} MB/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""Offline load test for the main API endpoints.
+
+Runs the Flask app in-process against an in-memory Mongo (mongomock, or a real
+server with --mongo-uri) and the fake LLM backend, with a generated corpus of
+resume PDFs. Each endpoint is driven at every --concurrency level and the
+throughput and p50/p95/p99 latencies are printed and written to --output as
+JSON; --compare prints the change against an earlier results file. A run in
+which an endpoint answers more than --max-error-rate of its requests with a
+non-2xx status stops with an error, since its numbers would time the error path.
+
+    python benchmarks/load_test.py --concurrency 1,4,16 --requests 100 --llm-latency 0.2
+    python benchmarks/load_test.py --output after.json --compare before.json
+"""
+import argparse
+import datetime
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACK_DIR)
+
+ENDPOINTS = ('login', 'upload', 'generate', 'grade-answer', 'analyze-resume', 'admin-users')
+PAGE_COUNTS = (1, 3, 10)
+PASSWORD = 'benchmark-password'
+FILLER = ("Delivered features across the stack, reviewed code, mentored engineers "
+          "and worked with product on requirements and rollout plans.")
+
+
+def make_pdf(pages):
+    """Build a minimal single-font PDF with one page per list entry of text lines"""
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>']
+    kids = ' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))
+    objects.append(f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode())
+    font_id = 3 + 2 * len(pages)
+    for i, lines in enumerate(pages):
+        objects.append((
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> >>'
+        ).encode())
+        shown = ' '.join('(' + line.replace('\\', '').replace('(', '').replace(')', '') + ") '" for line in lines)
+        body = f'BT /F1 9 Tf 36 760 Td 11 TL {shown} ET'.encode('latin-1', 'replace')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(body) + body + b'\nendstream')
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return out
+
+
+def make_corpus(count, skill_names, rng):
+    """Resumes of 1, 3 and 10 pages, each mentioning a different handful of skills"""
+    corpus = []
+    for i in range(count):
+        page_count = PAGE_COUNTS[i % len(PAGE_COUNTS)]
+        skills = rng.sample(skill_names, min(len(skill_names), rng.randint(3, 8)))
+        pages = []
+        for page in range(page_count):
+            lines = [f'Candidate {i} - page {page + 1}', 'Experience']
+            for line in range(55):
+                skill = skills[(page + line) % len(skills)]
+                lines.append(f'{FILLER[:60]} Used {skill} in production ({i}.{page}.{line}).')
+            pages.append(lines)
+        corpus.append(make_pdf(pages))
+    return corpus
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def patch_mongomock_bulk(mongomock):
+    """Let mongomock's bulk builder take the sort option newer pymongo passes for UpdateOne and ReplaceOne.
+
+    mongomock 4.3 predates it, so every bulk_write of those operations fails
+    with an unexpected keyword argument. The app never sets a sort on them,
+    so it is dropped.
+    """
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ('add_update', 'add_replace'):
+        original = getattr(builder, name)
+        if 'sort' in inspect.signature(original).parameters:
+            continue
+
+        def without_sort(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+        setattr(builder, name, without_sort)
+
+
+def configure_environment(args):
+    """Point the app at the fake LLM and the chosen Mongo before it is imported"""
+    os.environ['LLM_BACKEND'] = 'fake'
+    os.environ['FAKE_LLM_LATENCY'] = str(args.llm_latency)
+    os.environ['FAKE_LLM_MALFORMED_RATE'] = str(args.malformed_rate)
+    os.environ['LLM_RPM'] = str(args.llm_rpm)
+    os.environ['LLM_TPM'] = str(args.llm_tpm)
+    os.environ['BCRYPT_ROUNDS'] = str(args.bcrypt_rounds)
+    if args.cold:
+        os.environ['RESUME_CACHE_SIZE'] = '0'
+        os.environ['QUESTION_CACHE_SIZE'] = '0'
+
+    if args.mongo_uri:
+        os.environ['MONGO_URI'] = args.mongo_uri
+        return
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("mongomock is not installed; pip install mongomock or pass --mongo-uri")
+    import flask_pymongo
+    patch_mongomock_bulk(mongomock)
+    store = mongomock.MongoClient()
+    os.environ['MONGO_URI'] = 'mongodb://localhost:27017/skillmatrix_bench'
+    # mongomock takes no driver options such as event_listeners
+    flask_pymongo.MongoClient = lambda *a, **kw: store
+
+
+class LoadTest:
+    def __init__(self, app, db, args):
+        self.app = app
+        self.db = db
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self._local = threading.local()
+
+    def client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client
+
+    def setup(self):
+        from skill_matcher import default_matcher
+        self.skills = list(default_matcher.names)
+        self.corpus = make_corpus(self.args.pdfs, self.skills, self.rng)
+
+        self.db.users.delete_many({'email': {'$regex': '^bench-'}})
+        client = self.client()
+        self.users = []
+        for i in range(self.args.users):
+            email = f'bench-user-{i}@example.com'
+            client.post('/signup', json={'name': f'Bench User {i}', 'email': email, 'password': PASSWORD})
+            self.users.append((email, self._token(email)))
+        client.post('/create-admin', json={'name': 'Bench Admin', 'email': 'bench-admin@example.com', 'password': PASSWORD})
+        self.admin_token = self._token('bench-admin@example.com')
+
+        # Pad the users collection so the admin listing pages through real volume
+        seeded = [
+            {'name': f'Seeded {i}', 'email': f'bench-seed-{i}@example.com', 'password': b'x', 'role': 'user',
+             'skills': self.rng.sample(self.skills, 3), 'saved_question_count': 0}
+            for i in range(self.args.seed_users)
+        ]
+        if seeded:
+            self.db.users.insert_many(seeded)
+
+    def _token(self, email):
+        response = self.client().post('/login', json={'email': email, 'password': PASSWORD})
+        return response.get_json()['access_token']
+
+    def _headers(self, i, admin=False):
+        token = self.admin_token if admin else self.users[i % len(self.users)][1]
+        return {'Authorization': f'Bearer {token}'}
+
+    def request(self, endpoint, i):
+        client = self.client()
+        if endpoint == 'login':
+            return client.post('/login', json={'email': self.users[i % len(self.users)][0], 'password': PASSWORD})
+        if endpoint == 'upload':
+            pdf = self.corpus[i % len(self.corpus)]
+            return client.post('/upload', headers=self._headers(i), content_type='multipart/form-data',
+                               data={'file': (io.BytesIO(pdf), f'resume-{i}.pdf')})
+        if endpoint == 'generate':
+            skills = [self.skills[(i + k) % len(self.skills)] for k in range(1 + i % 5)]
+            return client.post('/generate', headers=self._headers(i), json={'skills': skills, 'difficulty': 'medium'})
+        if endpoint == 'grade-answer':
+            skill = self.skills[i % len(self.skills)]
+            return client.post('/grade-answer', headers=self._headers(i), json={
+                'question': f'How would you use {skill} in request {i}?',
+                'userAnswer': f'I would apply {skill} carefully. ' * (1 + i % 20),
+                'skill': skill
+            })
+        if endpoint == 'analyze-resume':
+            pdf = self.corpus[i % len(self.corpus)]
+            return client.post('/analyze-resume', headers=self._headers(i), content_type='multipart/form-data',
+                               data={'resume': (io.BytesIO(pdf), f'resume-{i}.pdf'),
+                                     'jobDescription': f'Backend engineer using {self.skills[i % len(self.skills)]}'})
+        if endpoint == 'admin-users':
+            return client.get('/admin/users?limit=50&fields=skills', headers=self._headers(i, admin=True))
+        raise ValueError(f'Unknown endpoint {endpoint}')
+
+    def run(self, endpoint, concurrency):
+        first_error = []
+
+        def timed(i):
+            start = time.perf_counter()
+            response = self.request(endpoint, i)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 300 and not first_error:
+                first_error.append(f"{response.status_code} {response.get_data(as_text=True)[:300]}")
+            return elapsed, response.status_code
+
+        for i in range(min(self.args.warmup, self.args.requests)):
+            self.request(endpoint, i)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, range(self.args.requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(duration * 1000 for duration, _ in samples)
+        statuses = {}
+        for _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return {
+            'endpoint': endpoint,
+            'concurrency': concurrency,
+            'requests': len(samples),
+            'errors': sum(count for status, count in statuses.items() if int(status) >= 400),
+            'non_2xx': sum(count for status, count in statuses.items() if not status.startswith('2')),
+            'statuses': statuses,
+            'first_error': first_error[0] if first_error else None,
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'max_ms': round(latencies[-1], 2),
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['endpoint'], r['concurrency']): r for r in json.load(f)['results']}
+    print(f"\nChange against {baseline_path}:")
+    for result in results:
+        before = baseline.get((result['endpoint'], result['concurrency']))
+        if before is None:
+            continue
+        changes = []
+        for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            if before[key]:
+                changes.append(f"{key} {100.0 * (result[key] - before[key]) / before[key]:+.1f}%")
+        print(f"  {result['endpoint']:<15} c={result['concurrency']:<4} " + '  '.join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='comma-separated subset of ' + ', '.join(ENDPOINTS))
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated client thread counts')
+    parser.add_argument('--requests', type=int, default=50, help='requests per endpoint and concurrency level')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--seed-users', type=int, default=2000, help='extra users inserted for the admin listing')
+    parser.add_argument('--pdfs', type=int, default=24, help='resumes in the generated corpus')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='fake LLM latency in seconds')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='fraction of truncated fake LLM responses')
+    parser.add_argument('--llm-rpm', type=int, default=0, help='LLM requests-per-minute budget (0 = unlimited)')
+    parser.add_argument('--llm-tpm', type=int, default=0, help='LLM tokens-per-minute budget (0 = unlimited)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--max-error-rate', type=float, default=0.02,
+                        help='fraction of non-2xx responses per endpoint above which the run fails')
+    parser.add_argument('--cold', action='store_true', help='disable the in-process resume and question caches')
+    parser.add_argument('--mongo-uri', help='use this Mongo instead of mongomock; the users it creates are prefixed bench-')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='load_test_results.json')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    args = parser.parse_args()
+
+    endpoints = [e for e in args.endpoints.split(',') if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(',') if c]
+
+    configure_environment(args)
+    from app import create_app  # noqa: E402  (reads the environment set above)
+    app = create_app()
+    app.logger.disabled = True
+
+    test = LoadTest(app, app.extensions['skillmatrix'].mongo.db, args)
+    test.setup()
+
+    results = []
+    print(f"{'endpoint':<15} {'conc':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for endpoint in endpoints:
+        for concurrency in levels:
+            result = test.run(endpoint, concurrency)
+            results.append(result)
+            print(f"{endpoint:<15} {concurrency:>4} {result['throughput_rps']:>8} {result['p50_ms']:>9} "
+                  f"{result['p95_ms']:>9} {result['p99_ms']:>9} {result['errors']:>7}")
+            if result['non_2xx'] > args.max_error_rate * result['requests']:
+                sys.exit(
+                    f"\n{endpoint} at concurrency {concurrency} answered {result['non_2xx']} of "
+                    f"{result['requests']} requests with a non-2xx status {result['statuses']}, above "
+                    f"--max-error-rate {args.max_error_rate}; its timings would measure the error path.\n"
+                    f"First error: {result['first_error']}"
+                )
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.utcnow().isoformat() + 'Z',
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'mongo': 'uri' if args.mongo_uri else 'mongomock',
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Break down worker start-up time.
+
+Imports the app in a fresh interpreter with -X importtime, then reports the
+time spent importing each package (its modules' own time, so the rows add
+up) and in create_app(). Libraries
+loaded on first use (the Gemini SDK, PyPDF2, numpy) are timed separately so the
+cost a cold request pays is visible too.
+
+    python benchmarks/startup_report.py --top 15
+    python benchmarks/startup_report.py --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED = ('google.generativeai', 'PyPDF2', 'numpy')
+MARKER = '--- started ---'
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(%r, file=sys.stderr, flush=True)
+deferred = {}
+for name in sys.argv[1:]:
+    t = time.perf_counter()
+    try:
+        __import__(name)
+        deferred[name] = time.perf_counter() - t
+    except ImportError:
+        deferred[name] = None
+print(json.dumps({'import_s': imported - start, 'create_app_s': created - imported, 'deferred_s': deferred}))
+''' % MARKER
+
+
+def parse_importtime(stderr):
+    """Sum each module's own import time (excluding its dependencies) by top-level package, in seconds"""
+    packages = defaultdict(float)
+    for line in stderr.split(MARKER)[0].splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(own) / 1e6
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=20, help='packages to list')
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    env = dict(os.environ, LLM_BACKEND=os.getenv('LLM_BACKEND', 'fake'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, *DEFERRED],
+        cwd=BACK_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    packages = parse_importtime(result.stderr)
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+    total = timings['import_s'] + timings['create_app_s']
+    print(f"Start-up: {total * 1000:.0f} ms "
+          f"(imports {timings['import_s'] * 1000:.0f} ms, create_app {timings['create_app_s'] * 1000:.0f} ms)\n")
+    print(f"{'package':<28} {'ms':>8}")
+    for name, seconds in ranked[:args.top]:
+        print(f"{name:<28} {seconds * 1000:>8.1f}")
+    print("\nLoaded on first use:")
+    for name, seconds in timings['deferred_s'].items():
+        print(f"{name:<28} {'not installed' if seconds is None else f'{seconds * 1000:>8.1f}'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'total_ms': round(total * 1000, 1),
+                'import_ms': round(timings['import_s'] * 1000, 1),
+                'create_app_ms': round(timings['create_app_s'] * 1000, 1),
+                'packages_ms': {name: round(seconds * 1000, 1) for name, seconds in ranked},
+                'deferred_ms': {
+                    name: None if seconds is None else round(seconds * 1000, 1)
+                    for name, seconds in timings['deferred_s'].items()
+                },
+            }, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
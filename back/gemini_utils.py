@@ -1,32 +1,15 @@
-import PyPDF2
+import asyncio
 import re
 import json
-import google.generativeai as genai
 import os
-
-def extract_skills_from_pdf(filepath):
-    """Extract skills from PDF resume"""
-    try:
-        with open(filepath, 'rb') as f:
-            reader = PyPDF2.PdfReader(f)
-            text = "".join(page.extract_text() for page in reader.pages)
-            return extract_skills(text)
-    except Exception as e:
-        raise Exception(f"Failed to process PDF: {str(e)}")
+from skill_matcher import default_matcher
+from llm_client import get_client
+from llm_resilience import LLMUnavailableError
+import metrics
 
 def extract_skills(text):
-    """Identify skills in text using pattern matching"""
-    patterns = [
-        r'\bPython\b', r'\bJavaScript\b', r'\bJava\b', r'\bC\+\+\b', r'\bC#\b',
-        r'\bReact\b', r'\bAngular\b', r'\bVue\b', r'\bNode\.js\b',
-        r'\bDjango\b', r'\bFlask\b', r'\bSpring\b',
-        r'\bSQL\b', r'\bMongoDB\b', r'\bPostgreSQL\b',
-        r'\bAWS\b', r'\bAzure\b', r'\bDocker\b', r'\bKubernetes\b',
-        r'\bMachine Learning\b', r'\bDeep Learning\b', r'\bTensorFlow\b', r'\bPyTorch\b',
-        r'\bData Structures\b', r'\bAlgorithms\b',
-        r'\bGit\b', r'\bCI/CD\b', r'\bREST API\b', r'\bGraphQL\b'
-    ]
-    return list({re.search(p, text, re.I).group(0) for p in patterns if re.search(p, text, re.I)})
+    """Identify taxonomy skills in text, returned as canonical names"""
+    return default_matcher.match(text)
 
 
 def extract_json_from_text(text):
@@ -50,92 +33,168 @@ def extract_json_from_text(text):
                 
         raise ValueError(f"Could not extract valid JSON from response: {text[:200]}...")
 
-def generate_questions_with_gemini(skills, api_key, job_description="", experience_level="mid", question_types=None, difficulty="medium"):
-    """Generate questions with robust JSON handling"""
+def build_question_prompt(skills, job_description="", experience_level="mid", question_types=None, difficulty="medium"):
+    # Convert question types to a more readable format
+    question_types_str = []
+    if question_types:
+        if question_types.get('technical'):
+            question_types_str.append('technical')
+        if question_types.get('behavioral'):
+            question_types_str.append('behavioral')
+        if question_types.get('situational'):
+            question_types_str.append('situational')
+
+    # Determine if we should use skills or job description as the primary source
+    use_job_description = bool(job_description) and not skills
+
+    prompt = f"""
+    Generate interview questions based on the following parameters:
+
+    {'Job Description: ' + job_description if use_job_description else 'Skills: ' + ', '.join(skills)}
+    Experience Level: {experience_level}
+    Difficulty Level: {difficulty}
+    Question Types: {', '.join(question_types_str) if question_types_str else 'all types'}
+
+    Generate 3-5 questions {'based on the job description' if use_job_description else 'for each skill'}, considering:
+    1. The experience level of the candidate
+    2. The specific question types requested
+    3. The difficulty level specified
+    {'4. The context and requirements from the job description' if use_job_description else ''}
+
+    Return ONLY a valid JSON array where each object has:
+    - 'skill' (string - {'extracted from job description' if use_job_description else 'matching the provided skills'})
+    - 'question' (string)
+    - 'difficulty' (string matching one of: 'easy', 'medium', 'hard')
+    - 'type' (string matching one of: 'technical', 'behavioral', 'situational')
+
+    Example format:
+    [
+      {{
+        "skill": "Python",
+        "question": "Explain the difference between lists and tuples in Python.",
+        "difficulty": "easy",
+        "type": "technical"
+      }},
+      {{
+        "skill": "React",
+        "question": "Describe a challenging project you worked on and how you handled it.",
+        "difficulty": "medium",
+        "type": "behavioral"
+      }}
+    ]
+
+    Important:
+    - Return ONLY the JSON array
+    - Do not include any markdown syntax
+    - Do not include any additional text or explanations
+    - Ensure all brackets and quotes are properly closed
+    - Questions should be relevant to {'the job description' if use_job_description else 'the specified skills'}
+    - Difficulty should match the specified difficulty level
+    - Experience level should be considered in question complexity
+    """
+    return prompt
+
+def parse_questions(text):
+    """Validate a generation response as a list of question objects"""
+    if not text:
+        raise ValueError("Empty response from Gemini API")
+
+    # Try to parse the response
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        # Convert question types to a more readable format
-        question_types_str = []
-        if question_types:
-            if question_types.get('technical'):
-                question_types_str.append('technical')
-            if question_types.get('behavioral'):
-                question_types_str.append('behavioral')
-            if question_types.get('situational'):
-                question_types_str.append('situational')
-        
-        # Determine if we should use skills or job description as the primary source
-        use_job_description = bool(job_description) and not skills
-        
-        prompt = f"""
-        Generate interview questions based on the following parameters:
-        
-        {'Job Description: ' + job_description if use_job_description else 'Skills: ' + ', '.join(skills)}
-        Experience Level: {experience_level}
-        Difficulty Level: {difficulty}
-        Question Types: {', '.join(question_types_str) if question_types_str else 'all types'}
-        
-        Generate 3-5 questions {'based on the job description' if use_job_description else 'for each skill'}, considering:
-        1. The experience level of the candidate
-        2. The specific question types requested
-        3. The difficulty level specified
-        {'4. The context and requirements from the job description' if use_job_description else ''}
-        
-        Return ONLY a valid JSON array where each object has:
-        - 'skill' (string - {'extracted from job description' if use_job_description else 'matching the provided skills'})
-        - 'question' (string)
-        - 'difficulty' (string matching one of: 'easy', 'medium', 'hard')
-        - 'type' (string matching one of: 'technical', 'behavioral', 'situational')
-        
-        Example format:
-        [
-          {{
-            "skill": "Python",
-            "question": "Explain the difference between lists and tuples in Python.",
-            "difficulty": "easy",
-            "type": "technical"
-          }},
-          {{
-            "skill": "React",
-            "question": "Describe a challenging project you worked on and how you handled it.",
-            "difficulty": "medium",
-            "type": "behavioral"
-          }}
-        ]
-        
-        Important:
-        - Return ONLY the JSON array
-        - Do not include any markdown syntax
-        - Do not include any additional text or explanations
-        - Ensure all brackets and quotes are properly closed
-        - Questions should be relevant to {'the job description' if use_job_description else 'the specified skills'}
-        - Difficulty should match the specified difficulty level
-        - Experience level should be considered in question complexity
-        """
-        
-        response = model.generate_content(prompt)
-        
-        if not response.text:
-            raise ValueError("Empty response from Gemini API")
-            
-        # Try to parse the response
-        try:
-            questions = extract_json_from_text(response.text)
-            
-            # Validate the structure
-            if not isinstance(questions, list):
-                raise ValueError("Response is not a JSON array")
-                
-            for q in questions:
-                if not all(k in q for k in ['skill', 'question', 'difficulty', 'type']):
-                    raise ValueError("Missing required fields in question object")
-                    
-            return questions
-            
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON response: {response.text[:200]}...") from e
-            
+        questions = extract_json_from_text(text)
+
+        # Validate the structure
+        if not isinstance(questions, list):
+            raise ValueError("Response is not a JSON array")
+
+        for q in questions:
+            if not all(k in q for k in ['skill', 'question', 'difficulty', 'type']):
+                raise ValueError("Missing required fields in question object")
+
+        return questions
+
+    except json.JSONDecodeError as e:
+        metrics.inc('llm_parse_failures_total', site='generate')
+        raise ValueError(f"Invalid JSON response: {text[:200]}...") from e
+    except ValueError:
+        metrics.inc('llm_parse_failures_total', site='generate')
+        raise
+
+def generate_questions_with_gemini(skills, job_description="", experience_level="mid", question_types=None, difficulty="medium", client=None):
+    """Generate questions with robust JSON handling; client defaults to the current app's"""
+    try:
+        prompt = build_question_prompt(skills, job_description, experience_level, question_types, difficulty)
+        return parse_questions((client or get_client()).generate(prompt, 'generate'))
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        raise Exception(f"Gemini API error: {str(e)}")
+
+async def generate_questions_async(skills, job_description="", experience_level="mid", question_types=None, difficulty="medium", client=None):
+    """generate_questions_with_gemini for the async app; the event loop is free while the model runs"""
+    try:
+        prompt = build_question_prompt(skills, job_description, experience_level, question_types, difficulty)
+        return parse_questions(await (client or get_client()).generate_async(prompt, 'generate'))
+    except LLMUnavailableError:
+        raise
     except Exception as e:
-        raise Exception(f"Gemini API error: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Gemini API error: {str(e)}")
+
+def generate_questions_in_chunks(skills, executor, chunk_size=3, experience_level="mid", question_types=None, difficulty="medium", client=None):
+    """Generate questions for small skill chunks in parallel and merge them.
+
+    Each chunk is validated on its own, so a malformed response only loses
+    that chunk. Returns (questions, failed_skills) and raises only when
+    every chunk fails.
+    """
+    chunks = [skills[i:i + chunk_size] for i in range(0, len(skills), chunk_size)]
+    # Resolved here because the pool's threads have no app context
+    client = client or get_client()
+    futures = [
+        executor.submit(generate_questions_with_gemini, chunk, "", experience_level, question_types, difficulty, client)
+        for chunk in chunks
+    ]
+
+    questions = []
+    failed_skills = []
+    errors = []
+    for chunk, future in zip(chunks, futures):
+        try:
+            questions.extend(future.result())
+        except Exception as e:
+            failed_skills.extend(chunk)
+            errors.append(e)
+
+    if not questions:
+        # An unreachable model is reported as such rather than as a generation failure
+        unavailable = [e for e in errors if isinstance(e, LLMUnavailableError)]
+        if unavailable:
+            raise unavailable[0]
+        raise Exception(f"Question generation failed for every skill chunk: {str(errors[0])}")
+    return questions, failed_skills
+
+async def generate_questions_in_chunks_async(skills, chunk_size=3, experience_level="mid", question_types=None, difficulty="medium", client=None):
+    """generate_questions_in_chunks with the chunks awaited concurrently instead of on a thread pool"""
+    chunks = [skills[i:i + chunk_size] for i in range(0, len(skills), chunk_size)]
+    results = await asyncio.gather(
+        *(generate_questions_async(chunk, "", experience_level, question_types, difficulty, client) for chunk in chunks),
+        return_exceptions=True
+    )
+
+    questions = []
+    failed_skills = []
+    errors = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            failed_skills.extend(chunk)
+            errors.append(result)
+        else:
+            questions.extend(result)
+
+    if not questions:
+        # An unreachable model is reported as such rather than as a generation failure
+        unavailable = [e for e in errors if isinstance(e, LLMUnavailableError)]
+        if unavailable:
+            raise unavailable[0]
+        raise Exception(f"Question generation failed for every skill chunk: {str(errors[0])}")
+    return questions, failed_skills
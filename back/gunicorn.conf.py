@@ -0,0 +1,25 @@
+"""Gunicorn settings for wsgi:app; every value can be overridden from the environment.
+
+The app is built once in the master (preload_app) and forked, so workers share
+its memory and skip the import and bcrypt calibration work on start-up. Nothing
+opens a socket or starts a thread before the fork: Mongo connects on first use
+and the thread pools spawn threads on first submit. For the same reason the
+Mongo indexes (which the app requires, see wsgi.py) are created by each worker
+on its first request rather than in the master.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Requests mostly wait on Gemini and Mongo, so each worker serves several at once on threads
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Recycle workers now and then so slow leaks in native libraries can't accumulate
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
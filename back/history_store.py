@@ -0,0 +1,111 @@
+import calendar
+import datetime
+import hashlib
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def ensure_history_indexes(db):
+    """Indexes for per-user history reads, newest first, optionally filtered by skill"""
+    for collection in (db.answer_history, db.saved_questions):
+        collection.create_index([('user_id', ASCENDING), ('_id', DESCENDING)])
+        collection.create_index([('user_id', ASCENDING), ('skill', ASCENDING), ('_id', DESCENDING)])
+
+
+# When each kind of legacy entry was written, where it recorded that; graded answers never did
+LEGACY_TIME_FIELDS = {'answer_history': 'timestamp', 'saved_questions': 'saved_at'}
+
+
+def serialize(doc):
+    doc['_id'] = str(doc['_id'])
+    doc.pop('user_id', None)
+    # Written by an earlier version of the migration
+    doc.pop('legacy_index', None)
+    return doc
+
+
+def paginate(collection, query, cursor=None, limit=None):
+    """Return one newest-first page of documents and the cursor for the next page.
+
+    The cursor is the last _id of the page; ObjectIds grow with insertion time
+    so the next page is simply everything older than it.
+    """
+    limit = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    query = dict(query)
+    if cursor:
+        try:
+            query['_id'] = {'$lt': ObjectId(cursor)}
+        except InvalidId:
+            raise ValueError("Invalid cursor")
+
+    docs = list(collection.find(query).sort('_id', DESCENDING).limit(limit + 1))
+    next_cursor = str(docs[limit - 1]['_id']) if len(docs) > limit else None
+    return [serialize(doc) for doc in docs[:limit]], next_cursor
+
+
+def calendar_seconds(when):
+    """Seconds since the epoch for a naive-UTC (as stored by Mongo) or aware datetime"""
+    return calendar.timegm(when.utctimetuple())
+
+
+def legacy_object_id(user_id, field, index, when):
+    """A deterministic _id for a migrated array entry, ordered by when it was written, then its array position.
+
+    Laid out like a generated ObjectId: the timestamp, five bytes standing
+    for the user's array, and the array index as the counter.
+    """
+    seconds = calendar_seconds(when)
+    array = hashlib.sha256(f"{user_id}:{field}".encode('utf-8')).digest()[:5]
+    return ObjectId(seconds.to_bytes(4, 'big') + array + index.to_bytes(3, 'big'))
+
+
+def migrate_embedded_history(db, batch_size=500):
+    """Move users' embedded answer_history/saved_questions arrays into their own collections.
+
+    Each entry gets an _id from legacy_object_id, so the newest-first _id
+    pagination keeps the arrays' order and sorts them before anything written
+    since. Entries without a timestamp take the previous entry's, or the
+    user's sign-up time. Upserting on that _id makes re-running after an
+    interruption safe. The arrays are unset only after their entries have
+    been written.
+    """
+    moved = {'users': 0, 'answer_history': 0, 'saved_questions': 0}
+    users = db.users.find(
+        {'$or': [{'answer_history': {'$exists': True}}, {'saved_questions': {'$exists': True}}]},
+        {'answer_history': 1, 'saved_questions': 1}
+    ).batch_size(batch_size)
+
+    for user in users:
+        for field in ('answer_history', 'saved_questions'):
+            ops = []
+            written = user['_id'].generation_time
+            for index, entry in enumerate(user.get(field) or []):
+                if not isinstance(entry, dict):
+                    continue
+                stamp = entry.get(LEGACY_TIME_FIELDS[field])
+                # Array order wins over a timestamp that goes backwards
+                if isinstance(stamp, datetime.datetime) and calendar_seconds(stamp) > calendar_seconds(written):
+                    written = stamp
+                fields = {key: value for key, value in entry.items() if key != '_id'}
+                ops.append(UpdateOne(
+                    {'_id': legacy_object_id(user['_id'], field, index, written)},
+                    {'$setOnInsert': dict(fields, user_id=user['_id'])},
+                    upsert=True
+                ))
+            if ops:
+                db[field].bulk_write(ops, ordered=False)
+                moved[field] += len(ops)
+
+        saved_count = db.saved_questions.count_documents({'user_id': user['_id']})
+        db.users.update_one(
+            {'_id': user['_id']},
+            {'$unset': {'answer_history': '', 'saved_questions': ''},
+             '$set': {'saved_question_count': saved_count}}
+        )
+        moved['users'] += 1
+    return moved
@@ -0,0 +1,148 @@
+import datetime
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from bson.errors import InvalidId
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATES = ['queued', 'running']
+
+# Heartbeats a job can miss before it is taken for orphaned by a crashed or restarted node
+STALE_HEARTBEATS = 3
+
+
+class QueueFullError(Exception):
+    """Raised when a job cannot be accepted because a queue limit was reached"""
+
+
+class JobQueue:
+    """Runs slow work on a local thread pool and keeps job state in Mongo.
+
+    Because state lives in the collection, any node can answer a status poll
+    for a job submitted to another node. Finished jobs expire through a TTL
+    index on created_at. While a node holds a job it refreshes the job's
+    updated_at every heartbeat_seconds; a queued or running job that stops
+    getting heartbeats was lost with its node, and no longer counts against
+    its user's limit.
+    """
+
+    def __init__(self, collection, workers=2, max_queue_depth=50, max_per_user=2, ttl_seconds=24 * 3600,
+                 heartbeat_seconds=30):
+        self.collection = collection
+        self.max_queue_depth = max_queue_depth
+        self.max_per_user = max_per_user
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jobs')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = set()
+        self._heartbeat = None
+        self._indexed = False
+
+    def submit(self, user_id, kind, fn, *args):
+        """Queue fn(*args) as a job owned by user_id and return its id"""
+        self._ensure_indexes()
+        active = self.collection.count_documents({
+            'user_id': user_id,
+            'status': {'$in': ACTIVE_STATES},
+            'updated_at': {'$gte': self._stale_before()}
+        })
+        if active >= self.max_per_user:
+            raise QueueFullError(f"You already have {active} jobs in progress")
+
+        with self._lock:
+            if self._pending >= self.max_queue_depth:
+                raise QueueFullError("The analysis queue is full, please try again shortly")
+            self._pending += 1
+            self._start_heartbeat()
+
+        now = datetime.datetime.utcnow()
+        job_id = None
+        try:
+            job_id = self.collection.insert_one({
+                'user_id': user_id,
+                'kind': kind,
+                'status': 'queued',
+                'created_at': now,
+                'updated_at': now
+            }).inserted_id
+            with self._lock:
+                self._active.add(job_id)
+            self._executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(job_id)
+            raise
+        return str(job_id)
+
+    def get(self, job_id, user_id):
+        """The job document, with an orphaned job reported (and recorded) as failed"""
+        try:
+            job = self.collection.find_one({'_id': ObjectId(job_id), 'user_id': user_id})
+        except InvalidId:
+            return None
+        if job and job['status'] in ACTIVE_STATES and job['updated_at'] < self._stale_before():
+            error = 'The job was interrupted, please submit it again'
+            # Conditional on the heartbeat still being missing, in case the owning node only stalled
+            self.collection.update_one(
+                {'_id': job['_id'], 'status': job['status'], 'updated_at': job['updated_at']},
+                {'$set': {'status': 'failed', 'error': error, 'updated_at': datetime.datetime.utcnow()}}
+            )
+            job.update(status='failed', error=error)
+        return job
+
+    def stats(self):
+        with self._lock:
+            return {'pending': self._pending, 'max_queue_depth': self.max_queue_depth}
+
+    def _stale_before(self):
+        return datetime.datetime.utcnow() - datetime.timedelta(seconds=STALE_HEARTBEATS * self.heartbeat_seconds)
+
+    def _start_heartbeat(self):
+        # Started on first submit rather than in __init__, so a preloaded app forks without threads
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._beat, name='jobs-heartbeat', daemon=True)
+            self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            with self._lock:
+                job_ids = list(self._active)
+            if not job_ids:
+                continue
+            try:
+                self.collection.update_many(
+                    {'_id': {'$in': job_ids}, 'status': {'$in': ACTIVE_STATES}},
+                    {'$set': {'updated_at': datetime.datetime.utcnow()}}
+                )
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {str(e)}")
+
+    def _run(self, job_id, fn, args):
+        try:
+            self._update(job_id, {'status': 'running'})
+            result = fn(*args)
+            self._update(job_id, {'status': 'done', 'result': result})
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self._update(job_id, {'status': 'failed', 'error': str(e)})
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._active.discard(job_id)
+
+    def _update(self, job_id, fields):
+        fields['updated_at'] = datetime.datetime.utcnow()
+        self.collection.update_one({'_id': job_id}, {'$set': fields})
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index([('user_id', 1), ('status', 1)])
+            self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+            self._indexed = True
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+from flask import current_app
+import metrics
+from llm_resilience import build_resilience, is_transient
+from llm_scheduler import build_scheduler
+
+DEFAULT_MODEL = 'gemini-2.0-flash'
+
+
+class GeminiBackend:
+    """Gemini SDK backend. The SDK is configured once and one model object is shared by all threads."""
+
+    def __init__(self, api_key, model_name=DEFAULT_MODEL, generation_config=None, timeout=None, transport=None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key, transport=transport)
+        self.model = genai.GenerativeModel(model_name, generation_config=generation_config)
+        self.request_options = {'timeout': timeout} if timeout else None
+
+    def generate(self, prompt, site):
+        response = self.model.generate_content(prompt, request_options=self.request_options)
+        return response.text
+
+    async def generate_async(self, prompt, site):
+        # The SDK's async calls run on grpc.aio, so they need the default grpc transport
+        response = await self.model.generate_content_async(prompt, request_options=self.request_options)
+        return response.text
+
+    def stream(self, prompt, site):
+        response = self.model.generate_content(prompt, stream=True, request_options=self.request_options)
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeBackend:
+    """Deterministic offline backend that answers in the shape each call site expects.
+
+    malformed_rate is the fraction of responses cut off halfway, spread evenly
+    over calls, to exercise the callers' parse-failure paths.
+    """
+
+    def __init__(self, latency=0.0, malformed_rate=0.0):
+        self.latency = latency
+        self.malformed_rate = malformed_rate
+        self._calls = itertools.count()
+
+    def generate(self, prompt, site):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._output(prompt, site)
+
+    async def generate_async(self, prompt, site):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._output(prompt, site)
+
+    def _output(self, prompt, site):
+        text = self._respond(prompt, site)
+        n = next(self._calls)
+        if int((n + 1) * self.malformed_rate) > int(n * self.malformed_rate):
+            return text[:len(text) // 2]
+        return text
+
+    def _respond(self, prompt, site):
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+        if site == 'grade':
+            return json.dumps({
+                'grade': ['Poor', 'Fair', 'Good', 'Excellent'][seed % 4],
+                'strengths': ['Covers the core concept'],
+                'weaknesses': ['Could use a concrete example'],
+                'suggestions': ['Mention trade-offs'],
+                'modelAnswer': 'A concise reference answer.'
+            })
+        if site == 'answer':
+            return ("Introduction:\nA short overview of the topic.\n\n"
+                    "Key Points:\n• First key point\n• Second key point\n\n"
+                    "Conclusion:\nA brief summary.")
+        if site == 'analyze':
+            return json.dumps({
+                'atsScore': 50 + seed % 50,
+                'jobMatchScore': 40 + seed % 60,
+                'scoreBreakdown': {'skillsMatch': 60, 'experienceMatch': 55, 'educationMatch': 70},
+                'matchingSkills': [],
+                'missingSkills': [],
+                'atsIssues': [],
+                'suggestions': [{'category': 'content', 'suggestion': 'Quantify your impact.', 'priority': 'medium'}]
+            })
+        if site == 'generate':
+            match = re.search(r'Skills: (.*)', prompt)
+            skills = [s.strip() for s in match.group(1).split(',')] if match else ['General']
+            difficulty = re.search(r'Difficulty Level: (\w+)', prompt)
+            difficulty = difficulty.group(1) if difficulty else 'medium'
+            types = re.search(r'Question Types: (\w+)', prompt)
+            question_type = types.group(1) if types and types.group(1) != 'all' else 'technical'
+            return json.dumps([
+                {
+                    'skill': skill,
+                    'question': f'Question {seed % 1000}-{i + 1} ({difficulty}, {question_type}) about {skill}?',
+                    'difficulty': difficulty,
+                    'type': question_type
+                }
+                for skill in skills for i in range(3)
+            ])
+        return 'OK'
+
+    def stream(self, prompt, site, chunk_size=40):
+        text = self.generate(prompt, site)
+        for start in range(0, len(text), chunk_size):
+            yield text[start:start + chunk_size]
+
+
+class LLMClient:
+    """Process-wide LLM entry point; the backend is built once, on first use.
+
+    Calls go through a ResilientCaller, so they raise LLMUnavailableError
+    rather than hang when the model is slow or down. Every attempt it makes,
+    retries and hedges included, first waits its turn in an AdmissionScheduler
+    that keeps the calls within the API quota.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.resilience = build_resilience(config)
+        self.scheduler = build_scheduler(config)
+        # A hedge would only queue behind calls already waiting for quota
+        self.resilience.hedge_gate = self.scheduler.idle
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = build_backend(self.config)
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        with self._lock:
+            self._backend = backend
+
+    def generate(self, prompt, site='default'):
+        """Return the model's text for prompt; site names the calling feature"""
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.resilience.deadline(site)
+        text = None
+        try:
+            text = self.resilience.call(site, lambda: self._call(prompt, site, deadline))
+            return text
+        finally:
+            self._record(site, prompt, text, start)
+
+    async def generate_async(self, prompt, site='default'):
+        """generate() for coroutines; no thread is held while the model runs or waits for quota"""
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.resilience.deadline(site)
+        text = None
+        try:
+            text = await self.resilience.call_async(site, lambda: self._call_async(prompt, site, deadline))
+            return text
+        finally:
+            self._record(site, prompt, text, start)
+
+    def stream(self, prompt, site='default'):
+        """Yield the model's text for prompt in chunks as it is generated.
+
+        Half-sent streams can't be retried or hedged, so only the circuit
+        breaker applies; the backend's own timeout bounds the call.
+        """
+        charged = self._admit(site, prompt)
+        breaker = self.resilience.guard(site)
+        start = time.perf_counter()
+        parts = []
+        text = None
+        try:
+            for chunk in self.backend.stream(prompt, site):
+                parts.append(chunk)
+                yield chunk
+            text = "".join(parts)
+            breaker.record_success()
+        except GeneratorExit:
+            # The client went away; chunks arriving means the model was fine
+            if parts:
+                breaker.record_success()
+            raise
+        except Exception as e:
+            if is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            self._check_quota(e)
+            raise
+        finally:
+            self.scheduler.settle(charged, prompt, text)
+            self._record(site, prompt, text, start)
+
+    def stats(self):
+        return {'sites': self.resilience.stats(), 'admission': self.scheduler.stats()}
+
+    def _admit(self, site, prompt):
+        # An open circuit fails the call at once, so it shouldn't queue for quota first
+        if self.resilience.breaker(site).is_open():
+            return 0
+        return self.scheduler.acquire(site, prompt)
+
+    def _call(self, prompt, site, deadline):
+        """One attempt: wait for quota, at most until the call's deadline, then ask the backend"""
+        charged = self.scheduler.acquire(site, prompt, deadline - time.monotonic())
+        text = None
+        try:
+            text = self.backend.generate(prompt, site)
+            return text
+        except Exception as e:
+            self._check_quota(e)
+            raise
+        finally:
+            self.scheduler.settle(charged, prompt, text)
+
+    async def _call_async(self, prompt, site, deadline):
+        charged = await self.scheduler.acquire_async(site, prompt, deadline - time.monotonic())
+        text = None
+        try:
+            text = await self.backend.generate_async(prompt, site)
+            return text
+        except Exception as e:
+            self._check_quota(e)
+            raise
+        finally:
+            self.scheduler.settle(charged, prompt, text)
+
+    def _check_quota(self, error):
+        """A 429 means our budgets are set above the real quota; pause admissions until they refill.
+
+        The retry of the failed call waits for quota like any other attempt.
+        """
+        if getattr(error, 'code', None) == 429:
+            self.scheduler.throttle()
+
+    def _record(self, site, prompt, text, start):
+        outcome = 'ok' if text is not None else 'error'
+        metrics.observe('llm_call_duration_seconds', time.perf_counter() - start, site=site, outcome=outcome)
+        metrics.observe('llm_prompt_chars', len(prompt), site=site)
+        if text is not None:
+            metrics.observe('llm_response_chars', len(text), site=site)
+
+
+def build_backend(config):
+    if config.get('LLM_BACKEND', 'gemini') == 'fake':
+        return FakeBackend(
+            latency=float(config.get('FAKE_LLM_LATENCY', 0)),
+            malformed_rate=float(config.get('FAKE_LLM_MALFORMED_RATE', 0))
+        )
+
+    generation_config = {}
+    if config.get('LLM_TEMPERATURE') is not None:
+        generation_config['temperature'] = float(config['LLM_TEMPERATURE'])
+    if config.get('LLM_MAX_OUTPUT_TOKENS'):
+        generation_config['max_output_tokens'] = int(config['LLM_MAX_OUTPUT_TOKENS'])
+    return GeminiBackend(
+        config.get('GEMINI_API_KEY'),
+        config.get('GEMINI_MODEL', DEFAULT_MODEL),
+        generation_config or None,
+        config.get('LLM_TIMEOUT'),
+        config.get('GEMINI_TRANSPORT')
+    )
+
+
+def init_client(app):
+    """Create the app's client from its config and keep it in app.extensions"""
+    client = app.extensions['llm'] = LLMClient(app.config)
+    return client
+
+
+def get_client():
+    """The current app's client"""
+    return current_app.extensions['llm']
@@ -0,0 +1,355 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+# Per call site deadlines in seconds, covering every attempt and backoff
+DEFAULT_DEADLINES = {'grade': 20.0, 'answer': 30.0, 'analyze': 45.0, 'generate': 45.0, 'default': 30.0}
+
+# HTTP statuses the Gemini SDK surfaces (as error.code) that are worth retrying
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """The model could not answer within the call site's deadline, or its circuit is open"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_transient(error):
+    """Timeouts, dropped connections and 408/429/5xx responses; anything else is the request's fault"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    try:
+        return int(getattr(error, 'code', None)) in TRANSIENT_STATUSES
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_deadlines(value):
+    """'grade=20,analyze=45' -> DEFAULT_DEADLINES with those sites overridden"""
+    deadlines = dict(DEFAULT_DEADLINES)
+    for part in (value or '').split(','):
+        if '=' in part:
+            site, seconds = part.split('=', 1)
+            deadlines[site.strip()] = float(seconds)
+    return deadlines
+
+
+class CircuitBreaker:
+    """Fails fast after failure_threshold consecutive transient failures.
+
+    Once reset_seconds pass, one probe call at a time (at most one per
+    reset_seconds) is let through to decide whether the circuit closes.
+    """
+
+    def __init__(self, failure_threshold=5, reset_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def is_open(self):
+        """Whether calls are being failed fast right now; unlike allow(), never starts a probe"""
+        with self._lock:
+            return self._state != 'closed' and time.monotonic() - self._opened_at < self.reset_seconds
+
+    def retry_after(self):
+        with self._lock:
+            return max(self._opened_at + self.reset_seconds - time.monotonic(), 0.0)
+
+    def allow(self):
+        with self._lock:
+            if self._state == 'closed':
+                return True
+            # A probe that never reports back doesn't keep the circuit shut for good
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = 'half_open'
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = 'closed'
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == 'half_open' or self._failures >= self.failure_threshold:
+                self._state = 'open'
+                self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """Recent successful call latencies for one site"""
+
+    def __init__(self, size=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        """The p-th percentile in seconds, or None until min_samples calls have been seen"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+class ResilientCaller:
+    """Deadlines, jittered retries, optional hedging and a circuit breaker per call site.
+
+    Each attempt gets whatever is left of the site's deadline. Transient
+    errors are retried with full-jitter exponential backoff; other errors are
+    raised at once. With hedge_percentile set, an attempt still running past
+    that percentile of the site's recent latency gets a duplicate request and
+    the first answer wins, unless hedge_gate() says the upstream has no room
+    for extra requests. A call that runs out of attempts or time raises
+    LLMUnavailableError, as does any call while the site's circuit is open.
+    """
+
+    def __init__(self, deadlines=None, retries=2, backoff_base=0.5, hedge_percentile=0,
+                 failure_threshold=5, reset_seconds=30.0, max_workers=64):
+        self.deadlines = deadlines or dict(DEFAULT_DEADLINES)
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.hedge_percentile = hedge_percentile
+        self._breakers = defaultdict(lambda: CircuitBreaker(failure_threshold, reset_seconds))
+        self._latencies = defaultdict(LatencyWindow)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._max_workers = max_workers
+        self.hedge_gate = None
+
+    def deadline(self, site):
+        return self.deadlines.get(site, self.deadlines['default'])
+
+    def breaker(self, site):
+        with self._lock:
+            return self._breakers[site]
+
+    def call(self, site, call):
+        """Return call() under the site's policy; call makes one blocking model request"""
+        breaker = self._admit(site)
+        deadline = time.monotonic() + self.deadline(site)
+        error = None
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                text = self._attempt(site, call, remaining)
+                breaker.record_success()
+                return text
+            except LLMUnavailableError:
+                # Turned away before reaching the model, e.g. no quota; says nothing about its health
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    # The model answered, so the upstream is healthy even though this request failed
+                    breaker.record_success()
+                    raise
+                error = e
+            delay = self._backoff(attempt, deadline)
+            if delay is None:
+                break
+            metrics.inc('llm_retries_total', site=site)
+            time.sleep(delay)
+        raise self._give_up(site, breaker, error)
+
+    async def call_async(self, site, call):
+        """call() for coroutines; call returns an awaitable for one model request"""
+        breaker = self._admit(site)
+        deadline = time.monotonic() + self.deadline(site)
+        error = None
+        for attempt in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                text = await self._attempt_async(site, call, remaining)
+                breaker.record_success()
+                return text
+            except LLMUnavailableError:
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    breaker.record_success()
+                    raise
+                error = e
+            delay = self._backoff(attempt, deadline)
+            if delay is None:
+                break
+            metrics.inc('llm_retries_total', site=site)
+            await asyncio.sleep(delay)
+        raise self._give_up(site, breaker, error)
+
+    def guard(self, site):
+        """Breaker check for calls that cannot be retried or hedged, such as streams.
+
+        Returns the breaker; the caller reports the outcome with
+        record_success() or record_failure().
+        """
+        return self._admit(site)
+
+    def stats(self):
+        with self._lock:
+            sites = set(self._breakers) | set(self._latencies)
+            breakers = dict(self._breakers)
+            latencies = dict(self._latencies)
+        stats = {}
+        for site in sorted(sites):
+            p95 = latencies[site].percentile(95) if site in latencies else None
+            stats[site] = {
+                'circuit': breakers[site].state if site in breakers else 'closed',
+                'deadline_s': self.deadline(site),
+                'p95_ms': round(p95 * 1000) if p95 is not None else None
+            }
+        return stats
+
+    def _admit(self, site):
+        breaker = self.breaker(site)
+        if not breaker.allow():
+            metrics.inc('llm_circuit_rejections_total', site=site)
+            raise LLMUnavailableError(f"LLM circuit for '{site}' is open", breaker.retry_after())
+        return breaker
+
+    def _give_up(self, site, breaker, error):
+        breaker.record_failure()
+        reason = str(error) if error else f"no time left in the {self.deadline(site):.0f}s deadline"
+        return LLMUnavailableError(f"LLM call for '{site}' failed: {reason}", breaker.retry_after() or None)
+
+    def _backoff(self, attempt, deadline):
+        """Full-jitter delay before the next attempt, or None when there is no attempt or time left"""
+        if attempt >= self.retries:
+            return None
+        delay = random.uniform(0, self.backoff_base * 2 ** attempt)
+        return delay if time.monotonic() + delay < deadline else None
+
+    def _hedge_delay(self, site):
+        if not self.hedge_percentile:
+            return None
+        window = self._latency_window(site)
+        return window.percentile(self.hedge_percentile)
+
+    def _may_hedge(self):
+        return self.hedge_gate is None or self.hedge_gate()
+
+    def _latency_window(self, site):
+        with self._lock:
+            return self._latencies[site]
+
+    def _pool(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='llm')
+        return self._executor
+
+    def _attempt(self, site, call, timeout):
+        """One attempt on the pool, so the deadline holds even if the backend ignores its own timeout"""
+        def timed():
+            start = time.monotonic()
+            text = call()
+            return text, time.monotonic() - start
+
+        start = time.monotonic()
+        end = start + timeout
+        hedge_delay = self._hedge_delay(site)
+        hedge_at = start + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+        pending = {self._pool().submit(timed)}
+        error = None
+        while pending:
+            wake = min(end, hedge_at) if hedge_at else end
+            done, pending = wait(pending, timeout=max(wake - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    text, elapsed = future.result()
+                    self._latency_window(site).add(elapsed)
+                    return text
+                error = future.exception()
+            if time.monotonic() >= end:
+                break
+            if hedge_at and pending and time.monotonic() >= hedge_at:
+                if self._may_hedge():
+                    metrics.inc('llm_hedged_requests_total', site=site)
+                    pending.add(self._pool().submit(timed))
+                hedge_at = None
+        if pending:
+            # Calls already running cannot be interrupted; they finish on the pool and are discarded
+            for future in pending:
+                future.cancel()
+            metrics.inc('llm_timeouts_total', site=site)
+            raise TimeoutError(f"no response within {timeout:.1f}s")
+        raise error
+
+    async def _attempt_async(self, site, call, timeout):
+        async def timed():
+            start = time.monotonic()
+            text = await call()
+            return text, time.monotonic() - start
+
+        start = time.monotonic()
+        end = start + timeout
+        hedge_delay = self._hedge_delay(site)
+        hedge_at = start + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+        pending = {asyncio.ensure_future(timed())}
+        error = None
+        try:
+            while pending:
+                wake = min(end, hedge_at) if hedge_at else end
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(wake - time.monotonic(), 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        text, elapsed = task.result()
+                        self._latency_window(site).add(elapsed)
+                        return text
+                    error = task.exception()
+                if time.monotonic() >= end:
+                    break
+                if hedge_at and pending and time.monotonic() >= hedge_at:
+                    if self._may_hedge():
+                        metrics.inc('llm_hedged_requests_total', site=site)
+                        pending.add(asyncio.ensure_future(timed()))
+                    hedge_at = None
+        finally:
+            for task in pending:
+                task.cancel()
+        if pending:
+            metrics.inc('llm_timeouts_total', site=site)
+            raise TimeoutError(f"no response within {timeout:.1f}s")
+        raise error
+
+
+def build_resilience(config):
+    return ResilientCaller(
+        parse_deadlines(config.get('LLM_DEADLINES')),
+        int(config.get('LLM_RETRIES', 2)),
+        float(config.get('LLM_RETRY_BACKOFF', 0.5)),
+        float(config.get('LLM_HEDGE_PERCENTILE', 0)),
+        int(config.get('LLM_BREAKER_THRESHOLD', 5)),
+        float(config.get('LLM_BREAKER_RESET', 30)),
+        int(config.get('LLM_CALL_WORKERS', 64))
+    )
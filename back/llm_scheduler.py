@@ -0,0 +1,269 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+import metrics
+from llm_resilience import LLMUnavailableError
+
+# Lower rank is admitted first
+PRIORITIES = ('interactive', 'bulk')
+DEFAULT_SITE_PRIORITIES = {'grade': 'interactive', 'answer': 'interactive', 'generate': 'bulk', 'analyze': 'bulk'}
+
+# Rough English-text tokenization, good enough to budget against a per-minute quota
+CHARS_PER_TOKEN = 4
+DEFAULT_OUTPUT_TOKENS = 1024
+
+# How often async waiters, which can't be notified through the condition, re-check the buckets
+ASYNC_POLL_SECONDS = 0.05
+
+
+class AdmissionRejectedError(LLMUnavailableError):
+    """No quota freed up for the call within the maximum wait"""
+
+
+def parse_priorities(value):
+    """'grade=interactive,analyze=bulk' -> DEFAULT_SITE_PRIORITIES with those sites overridden"""
+    priorities = dict(DEFAULT_SITE_PRIORITIES)
+    for part in (value or '').split(','):
+        if '=' in part:
+            site, priority = (p.strip() for p in part.split('=', 1))
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unknown LLM priority class '{priority}' for site '{site}'")
+            priorities[site] = priority
+    return priorities
+
+
+class TokenBucket:
+    """Refills per_minute units a minute, holding at most one minute's worth; 0 means unlimited.
+
+    Not thread-safe on its own; the scheduler holds its lock around every use.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def fits(self, amount, reserve=0.0):
+        """Whether amount can be taken while keeping reserve (a fraction of capacity) in the bucket"""
+        if not self.capacity:
+            return True
+        return self.level - min(amount, self.capacity) >= reserve * self.capacity
+
+    def seconds_until(self, amount, reserve=0.0):
+        if not self.capacity:
+            return 0.0
+        missing = min(amount, self.capacity) + reserve * self.capacity - self.level
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + amount)
+
+    def drain(self):
+        if self.capacity:
+            self.level = min(self.level, 0.0)
+
+
+class AdmissionScheduler:
+    """Holds LLM calls until they fit the requests- and tokens-per-minute budgets.
+
+    Waiting calls are admitted strictly by priority class, then in arrival
+    order. Bulk calls also leave bulk_reserve of each bucket untouched, so an
+    interactive call arriving during a bulk burst still finds quota. A call
+    that can't be admitted within max_wait raises AdmissionRejectedError.
+    Token use is estimated from the prompt up front and corrected with
+    settle() once the response is in.
+    """
+
+    def __init__(self, rpm=0, tpm=0, max_wait=10.0, bulk_reserve=0.2, site_priorities=None,
+                 output_tokens=DEFAULT_OUTPUT_TOKENS):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_wait = max_wait
+        self.bulk_reserve = bulk_reserve
+        self.site_priorities = site_priorities or dict(DEFAULT_SITE_PRIORITIES)
+        self.output_tokens = output_tokens
+        self._cond = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self.counters = {'admitted': 0, 'rejected': 0, 'throttled': 0}
+        self._waits = {p: [0, 0.0] for p in PRIORITIES}
+
+    @property
+    def enabled(self):
+        return bool(self.requests.capacity or self.tokens.capacity)
+
+    def priority(self, site):
+        return self.site_priorities.get(site, 'bulk')
+
+    def estimate(self, prompt):
+        return len(prompt) // CHARS_PER_TOKEN + self.output_tokens
+
+    def acquire(self, site, prompt, max_wait=None):
+        """Block until the call fits the budgets; returns the tokens it was charged.
+
+        max_wait shortens the scheduler's own maximum wait, e.g. to what is
+        left of the caller's deadline.
+        """
+        cost = self.estimate(prompt)
+        if not self.enabled:
+            return cost
+        priority = self.priority(site)
+        start = time.monotonic()
+        max_wait = self._max_wait(max_wait)
+        with self._cond:
+            entry = self._enter(priority, cost)
+            try:
+                while True:
+                    wait = self._try_admit(entry)
+                    if wait is None:
+                        self._admitted(priority, start)
+                        return cost
+                    remaining = start + max_wait - time.monotonic()
+                    if remaining <= 0:
+                        raise self._rejected(priority, wait, max_wait)
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                self._leave(entry)
+
+    async def acquire_async(self, site, prompt, max_wait=None):
+        """acquire() for coroutines; waits by polling so the event loop is never blocked"""
+        cost = self.estimate(prompt)
+        if not self.enabled:
+            return cost
+        priority = self.priority(site)
+        start = time.monotonic()
+        max_wait = self._max_wait(max_wait)
+        with self._cond:
+            entry = self._enter(priority, cost)
+        try:
+            while True:
+                with self._cond:
+                    wait = self._try_admit(entry)
+                    if wait is None:
+                        self._admitted(priority, start)
+                        return cost
+                    remaining = start + max_wait - time.monotonic()
+                    if remaining <= 0:
+                        raise self._rejected(priority, wait, max_wait)
+                await asyncio.sleep(min(wait, remaining, ASYNC_POLL_SECONDS))
+        finally:
+            with self._cond:
+                self._leave(entry)
+
+    def settle(self, charged, prompt, text):
+        """Refund the difference between the estimate and what the call actually used"""
+        if text is None or not self.tokens.capacity:
+            return
+        used = (len(prompt) + len(text)) // CHARS_PER_TOKEN
+        with self._cond:
+            if used < charged:
+                self.tokens.give_back(charged - used)
+                self._cond.notify_all()
+            else:
+                self.tokens.take(used - charged)
+
+    def throttle(self):
+        """The API said we are over quota: stop admitting until the buckets refill"""
+        with self._cond:
+            self.requests.drain()
+            self.tokens.drain()
+            self.counters['throttled'] += 1
+
+    def idle(self):
+        """Whether no call is waiting for quota"""
+        with self._cond:
+            return not self._queue
+
+    def queue_depth(self):
+        with self._cond:
+            depth = {p: 0 for p in PRIORITIES}
+            for rank, _, _, _ in self._queue:
+                depth[PRIORITIES[rank]] += 1
+            return depth
+
+    def stats(self):
+        depth = self.queue_depth()
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            stats = dict(self.counters)
+            stats['queued'] = depth
+            stats['avg_wait_ms'] = {
+                p: round(total / count * 1000, 1) if count else 0.0 for p, (count, total) in self._waits.items()
+            }
+            stats['rpm_available'] = round(self.requests.level) if self.requests.capacity else None
+            stats['tpm_available'] = round(self.tokens.level) if self.tokens.capacity else None
+        return stats
+
+    def _max_wait(self, max_wait):
+        return self.max_wait if max_wait is None else max(min(self.max_wait, max_wait), 0.0)
+
+    def _enter(self, priority, cost):
+        entry = [PRIORITIES.index(priority), next(self._sequence), cost, priority]
+        heapq.heappush(self._queue, entry)
+        return entry
+
+    def _leave(self, entry):
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+        # Whoever is at the head now may be admissible
+        self._cond.notify_all()
+
+    def _try_admit(self, entry):
+        """Charge and dequeue entry if it is next and fits; otherwise return seconds to wait"""
+        if self._queue[0] is not entry:
+            return self.max_wait
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        reserve = self.bulk_reserve if entry[3] == 'bulk' else 0.0
+        if self.requests.fits(1, reserve) and self.tokens.fits(entry[2], reserve):
+            self.requests.take(1)
+            self.tokens.take(entry[2])
+            heapq.heappop(self._queue)
+            return None
+        return max(self.requests.seconds_until(1, reserve), self.tokens.seconds_until(entry[2], reserve), 0.001)
+
+    def _admitted(self, priority, start):
+        waited = time.monotonic() - start
+        self.counters['admitted'] += 1
+        self._waits[priority][0] += 1
+        self._waits[priority][1] += waited
+        metrics.observe('llm_admission_wait_seconds', waited, priority=priority)
+
+    def _rejected(self, priority, wait, max_wait):
+        self.counters['rejected'] += 1
+        metrics.inc('llm_admission_rejections_total', priority=priority)
+        return AdmissionRejectedError(f"LLM quota exhausted; {priority} call waited {max_wait:.1f}s", wait)
+
+
+def build_scheduler(config):
+    scheduler = AdmissionScheduler(
+        int(config.get('LLM_RPM', 0)),
+        int(config.get('LLM_TPM', 0)),
+        float(config.get('LLM_ADMISSION_MAX_WAIT', 10)),
+        float(config.get('LLM_BULK_RESERVE', 0.2)),
+        parse_priorities(config.get('LLM_PRIORITIES')),
+        int(config.get('LLM_MAX_OUTPUT_TOKENS') or DEFAULT_OUTPUT_TOKENS)
+    )
+    metrics.collect(
+        'llm_admission_queue_depth',
+        lambda: [({'priority': p}, n) for p, n in scheduler.queue_depth().items()]
+    )
+    return scheduler
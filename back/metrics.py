@@ -0,0 +1,140 @@
+import itertools
+import threading
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+STRIPES = 16
+
+
+class _Stripe:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+
+class Registry:
+    """Counters, histograms and gauges rendered in the Prometheus text format.
+
+    Series are spread over a fixed set of striped shards and each thread is
+    pinned to one stripe on first use, so concurrent observations rarely
+    contend for the same lock. A scrape merges the stripes. Gauges hold no
+    series of their own; their collector is called at scrape time.
+    """
+
+    def __init__(self, stripes=STRIPES):
+        self._meta = {}
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._next_stripe = itertools.count()
+        self._local = threading.local()
+        self._collectors = {}
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._meta[name] = ('histogram', help_text, tuple(buckets))
+
+    def counter(self, name, help_text):
+        self._meta[name] = ('counter', help_text, None)
+
+    def gauge(self, name, help_text):
+        self._meta[name] = ('gauge', help_text, None)
+
+    def collect(self, name, collector):
+        """Use collector() -> [(labels dict, value), ...] for the gauge name; replaces any earlier one"""
+        self._collectors[name] = collector
+
+    def observe(self, name, value, **labels):
+        buckets = self._meta[name][2]
+        stripe = self._stripe()
+        key = (name, tuple(sorted(labels.items())))
+        with stripe.lock:
+            series = stripe.series.get(key)
+            if series is None:
+                # One slot per bucket, one for +Inf, then the sum
+                series = stripe.series[key] = [0] * (len(buckets) + 1) + [0.0]
+            series[bisect_left(buckets, value)] += 1
+            series[-1] += value
+
+    def inc(self, name, amount=1, **labels):
+        stripe = self._stripe()
+        key = (name, tuple(sorted(labels.items())))
+        with stripe.lock:
+            stripe.series[key] = stripe.series.get(key, 0) + amount
+
+    def render(self):
+        merged = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                items = [(k, list(v) if isinstance(v, list) else v) for k, v in stripe.series.items()]
+            for key, value in items:
+                if key not in merged:
+                    merged[key] = value
+                elif isinstance(value, list):
+                    merged[key] = [a + b for a, b in zip(merged[key], value)]
+                else:
+                    merged[key] += value
+
+        lines = []
+        for name, (kind, help_text, buckets) in sorted(self._meta.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'gauge':
+                collector = self._collectors.get(name)
+                for labels, value in (collector() if collector else []):
+                    lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {value}")
+                continue
+            for (series_name, labels), value in sorted(merged.items()):
+                if series_name != name:
+                    continue
+                if kind == 'counter':
+                    lines.append(f"{name}{_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), value[:-1]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {value[-1]}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def _stripe(self):
+        index = getattr(self._local, 'stripe', None)
+        if index is None:
+            index = self._local.stripe = next(self._next_stripe) % len(self._stripes)
+        return self._stripes[index]
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{k}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for k, v in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+registry = Registry()
+registry.histogram('http_request_duration_seconds', 'Request latency by route, method and status')
+registry.histogram('llm_call_duration_seconds', 'LLM call latency by call site and outcome')
+registry.histogram('llm_prompt_chars', 'LLM prompt size in characters by call site', SIZE_BUCKETS)
+registry.histogram('llm_response_chars', 'LLM response size in characters by call site', SIZE_BUCKETS)
+registry.counter('llm_parse_failures_total', 'LLM responses that could not be parsed, by call site')
+registry.counter('llm_retries_total', 'LLM calls retried after a transient error, by call site')
+registry.counter('llm_hedged_requests_total', 'Duplicate LLM requests sent for slow attempts, by call site')
+registry.counter('llm_timeouts_total', 'LLM attempts abandoned at the call site deadline, by call site')
+registry.counter('llm_circuit_rejections_total', 'LLM calls failed fast by an open circuit breaker, by call site')
+registry.histogram('llm_admission_wait_seconds', 'Time LLM calls waited for quota, by priority class')
+registry.counter('llm_admission_rejections_total', 'LLM calls turned away after the maximum quota wait, by priority class')
+registry.gauge('llm_admission_queue_depth', 'LLM calls waiting for quota, by priority class')
+registry.counter('skill_count_update_failures_total', 'Skill changes saved to a user but not to skill_counts')
+registry.histogram('resume_prompt_chars', 'Resume text size before and after prompt compaction', SIZE_BUCKETS)
+registry.histogram('pdf_extract_duration_seconds', 'PyPDF2 text extraction time')
+registry.histogram('pdf_pages', 'Pages read per extracted PDF', PAGE_BUCKETS)
+registry.histogram('mongo_command_duration_seconds', 'Mongo command latency by collection and command')
+
+observe = registry.observe
+inc = registry.inc
+collect = registry.collect
+render = registry.render
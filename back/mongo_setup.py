@@ -0,0 +1,178 @@
+import logging
+import threading
+from pymongo import ASCENDING, monitoring
+from pymongo.errors import OperationFailure
+from history_store import ensure_history_indexes
+from skill_stats import ensure_skill_indexes
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps its query filter
+FILTER_KEYS = {
+    'find': 'filter',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+}
+
+
+def ensure_indexes(db):
+    """Create the indexes the app's query shapes rely on; safe to run on every start"""
+    try:
+        db.users.create_index([('email', ASCENDING)], unique=True, name='email_unique')
+    except OperationFailure as e:
+        # Existing duplicate emails block the unique index; they have to be cleaned up by hand
+        logger.error(f"Could not create unique email index: {str(e)}")
+    db.users.create_index([('role', ASCENDING), ('_id', ASCENDING)])
+    db.users.create_index([('skills', ASCENDING), ('_id', ASCENDING)])
+    ensure_history_indexes(db)
+    ensure_skill_indexes(db)
+
+
+def filter_shape(value):
+    """Replace literal values in a filter with their type names so shapes can be grouped"""
+    if isinstance(value, dict):
+        return {k: filter_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [filter_shape(v) for v in value[:1]]
+    return type(value).__name__
+
+
+def command_filter(command_name, command):
+    if command_name in FILTER_KEYS:
+        return command.get(FILTER_KEYS[command_name]) or {}
+    if command_name in ('update', 'delete'):
+        ops = command.get('updates' if command_name == 'update' else 'deletes') or [{}]
+        return ops[0].get('q') or {}
+    if command_name == 'aggregate':
+        for stage in command.get('pipeline', []):
+            if '$match' in stage:
+                return stage['$match']
+    return {}
+
+
+# The fields explain needs from each command it can explain; inserts and other commands have no query plan
+EXPLAIN_FIELDS = {
+    'find': ('filter', 'sort', 'projection', 'hint', 'limit', 'skip'),
+    'count': ('query', 'hint', 'limit', 'skip'),
+    'distinct': ('key', 'query'),
+    'aggregate': ('pipeline', 'hint'),
+    'findAndModify': ('query', 'sort', 'update', 'remove', 'upsert'),
+    'update': ('updates',),
+    'delete': ('deletes',),
+}
+
+
+def explainable_command(command_name, command):
+    """The command as explain can run it again, or None if it has no query plan.
+
+    Write commands keep only their first statement, which the filter shape
+    was also taken from.
+    """
+    fields = EXPLAIN_FIELDS.get(command_name)
+    if fields is None:
+        return None
+    explainable = {command_name: command[command_name]}
+    for field in fields:
+        if field in command:
+            explainable[field] = command[field][:1] if field in ('updates', 'deletes') else command[field]
+    if command_name == 'aggregate':
+        explainable['cursor'] = {}
+    return explainable
+
+
+def winning_plan(explain):
+    """The winning plan from explain output; aggregates nest it in their first stage unless fully pushed down"""
+    planner = explain.get('queryPlanner')
+    if planner is None:
+        stages = explain.get('stages') or [{}]
+        planner = stages[0].get('$cursor', {}).get('queryPlanner', {})
+    winning = planner.get('winningPlan', {})
+    return winning.get('queryPlan', winning)  # slot-based engine nests the classic plan
+
+
+class QueryTimer(monitoring.CommandListener):
+    """Times every Mongo command and logs the ones slower than threshold_ms.
+
+    Per (collection, command) totals are kept for reporting, along with one
+    sample command per slow filter shape so explain_slow_queries can inspect
+    its plan.
+    """
+
+    def __init__(self, threshold_ms=100):
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+        self._started = {}
+        self.operations = {}
+        self.slow_samples = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            return
+        with self._lock:
+            self._started[event.request_id] = (
+                collection,
+                event.command_name,
+                command_filter(event.command_name, event.command),
+                explainable_command(event.command_name, event.command)
+            )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            started = self._started.pop(event.request_id, None)
+        if started is None:
+            return
+        collection, command_name, query, explainable = started
+        duration_ms = event.duration_micros / 1000.0
+        key = f"{collection}.{command_name}"
+        metrics.observe('mongo_command_duration_seconds', duration_ms / 1000.0, collection=collection, command=command_name)
+
+        with self._lock:
+            op = self.operations.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow': 0})
+            op['count'] += 1
+            op['total_ms'] += duration_ms
+            op['max_ms'] = max(op['max_ms'], duration_ms)
+            if duration_ms >= self.threshold_ms:
+                op['slow'] += 1
+                shape = repr(filter_shape(query))
+                self.slow_samples[(collection, command_name, shape)] = explainable
+
+        if duration_ms >= self.threshold_ms:
+            logger.warning(f"Slow Mongo {key} took {duration_ms:.1f}ms filter={filter_shape(query)}")
+
+    def samples(self):
+        with self._lock:
+            return dict(self.slow_samples)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: dict(op, avg_ms=round(op['total_ms'] / op['count'], 3))
+                for key, op in self.operations.items()
+            }
+
+
+def explain_slow_queries(db, timer):
+    """Explain one sample of every slow command and filter shape and summarize the winning plan.
+
+    Commands explain can't run, such as inserts, have no plan to show and are skipped.
+    """
+    report = []
+    for (collection, command_name, shape), explainable in timer.samples().items():
+        if explainable is None:
+            continue
+        winning = winning_plan(db.command('explain', explainable, verbosity='queryPlanner'))
+        stages = []
+        while winning:
+            stages.append(winning.get('stage', '?') + (f"({winning['indexName']})" if 'indexName' in winning else ''))
+            winning = winning.get('inputStage')
+        report.append({'collection': collection, 'command': command_name, 'filter': shape, 'plan': ' <- '.join(stages)})
+    return report
@@ -0,0 +1,72 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+CALIBRATION_ROUNDS = 8
+
+
+class HasherBusyError(Exception):
+    """Raised when too many hashing jobs are already waiting"""
+
+
+def calibrate_rounds(target_ms, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """Pick the bcrypt cost whose hash time is closest to target_ms on this machine.
+
+    One cheap hash is timed and extrapolated, since each extra round doubles the work.
+    """
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(CALIBRATION_ROUNDS))
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.01)
+    rounds = CALIBRATION_ROUNDS + round(math.log2(target_ms / elapsed_ms))
+    return min(max(rounds, min_rounds), max_rounds)
+
+
+def hash_rounds(hashed):
+    """Read the cost factor out of a stored bcrypt hash"""
+    if isinstance(hashed, str):
+        hashed = hashed.encode('utf-8')
+    return int(hashed.split(b'$')[2])
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated bounded pool so request threads only wait on the result.
+
+    bcrypt releases the GIL while hashing, so the pool uses every core. At most
+    max_pending jobs may wait at once; beyond that callers get HasherBusyError
+    instead of piling up behind a login storm.
+    """
+
+    def __init__(self, rounds=None, target_ms=250, workers=None, max_pending=64):
+        self.rounds = rounds or calibrate_rounds(target_ms)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1,
+            thread_name_prefix='bcrypt'
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def hash(self, password):
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+
+    def check(self, password, hashed):
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash uses a lower cost than the current one"""
+        return hash_rounds(hashed) < self.rounds
+
+    def submit(self, fn, *args):
+        """Run fn on the hashing pool without waiting, e.g. for a background rehash"""
+        return self._executor.submit(fn, *args)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError("Too many password operations in progress")
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
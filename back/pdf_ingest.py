@@ -0,0 +1,41 @@
+import tempfile
+import time
+from flask import Request, current_app
+import metrics
+
+# Uploads up to this many bytes stay in memory; PDF_SPOOL_MAX_MEMORY overrides it
+DEFAULT_SPOOL_MAX_MEMORY = 2 * 1024 * 1024
+
+
+class SpooledRequest(Request):
+    """Request whose uploaded files stay in memory up to PDF_SPOOL_MAX_MEMORY bytes"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        max_memory = current_app.config.get('PDF_SPOOL_MAX_MEMORY', DEFAULT_SPOOL_MAX_MEMORY)
+        return tempfile.SpooledTemporaryFile(max_size=max_memory, mode='rb+')
+
+
+def extract_pdf_text(source, max_pages=None, max_chars=None):
+    """Extract text from a PDF path or binary stream, stopping at the page or text cap"""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    # Imported on first use to keep it out of worker start-up
+    import PyPDF2
+
+    start = time.perf_counter()
+    reader = PyPDF2.PdfReader(source, strict=False)
+    parts = []
+    length = 0
+    for index, page in enumerate(reader.pages):
+        if max_pages and index >= max_pages:
+            break
+        text = page.extract_text() or ''
+        parts.append(text)
+        length += len(text)
+        if max_chars and length >= max_chars:
+            break
+    metrics.observe('pdf_extract_duration_seconds', time.perf_counter() - start)
+    metrics.observe('pdf_pages', len(parts))
+    # Form feeds keep page boundaries visible to resume_compactor's header/footer detection
+    text = "\f".join(parts)
+    return text[:max_chars] if max_chars else text
@@ -0,0 +1,203 @@
+import datetime
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+from skill_matcher import default_matcher
+from skill_stats import canonical_skill
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+QUESTION_TYPES = ('technical', 'behavioral', 'situational')
+EXPERIENCE_LEVELS = ('entry', 'mid', 'senior')
+
+
+def question_hash(text):
+    return hashlib.sha256(' '.join(str(text).split()).lower().encode('utf-8')).hexdigest()
+
+
+def requested_types(question_types):
+    """The enabled types from a /generate questionTypes dict; none enabled means all"""
+    return [t for t in QUESTION_TYPES if (question_types or {}).get(t)] or list(QUESTION_TYPES)
+
+
+def validate_questions(questions, skill, difficulty, experience_level, question_type):
+    """Keep the well-formed questions for one combination, stamped with its keys"""
+    valid = []
+    for q in questions:
+        text = ' '.join(str(q.get('question', '')).split())
+        if not 15 <= len(text) <= 1000:
+            continue
+        if canonical_skill(q.get('skill', '')) != skill or q.get('type') != question_type:
+            continue
+        valid.append({
+            'skill': skill,
+            'difficulty': difficulty,
+            'experience_level': experience_level,
+            'type': question_type,
+            'question': text,
+            'question_hash': question_hash(text)
+        })
+    return valid
+
+
+class QuestionBank:
+    """Pre-generated questions per (skill, difficulty, experience level, type).
+
+    draw() samples unseen questions for a user and records them as seen, so
+    repeated /generate calls walk through the bank instead of repeating it.
+    Seen records expire after seen_ttl_seconds, after which questions recycle.
+    """
+
+    def __init__(self, collection, seen_collection, per_skill=3, seen_ttl_seconds=90 * 24 * 3600):
+        self.collection = collection
+        self.seen = seen_collection
+        self.per_skill = per_skill
+        self.seen_ttl_seconds = seen_ttl_seconds
+        self._lock = threading.Lock()
+        self._indexed = False
+        self.counters = {'served': 0, 'uncovered': 0, 'errors': 0}
+
+    def draw(self, user_id, skills, difficulty, experience_level, question_types):
+        """Return (questions, uncovered_skills) for a user.
+
+        A skill is uncovered when the bank has fewer than per_skill unseen
+        questions for it; the caller generates those live. The bank is only
+        a shortcut, so when Mongo fails every skill is reported uncovered.
+        """
+        try:
+            return self._draw(user_id, skills, difficulty, experience_level, question_types)
+        except PyMongoError as e:
+            logger.error(f"Question bank draw failed, generating live: {str(e)}")
+            with self._lock:
+                self.counters['errors'] += 1
+                self.counters['uncovered'] += len(skills)
+            return [], list(skills)
+
+    def _draw(self, user_id, skills, difficulty, experience_level, question_types):
+        self._ensure_indexes()
+        types = requested_types(question_types)
+        canonical_skills = [canonical_skill(skill) for skill in skills]
+        seen_ids = self.seen.distinct('question_id', {'user_id': user_id, 'skill': {'$in': canonical_skills}})
+
+        questions = []
+        drawn = []
+        uncovered = []
+        for skill, canonical in zip(skills, canonical_skills):
+            docs = list(self.collection.aggregate([
+                {'$match': {
+                    'skill': canonical,
+                    'difficulty': difficulty,
+                    'experience_level': experience_level,
+                    'type': {'$in': types},
+                    '_id': {'$nin': seen_ids}
+                }},
+                {'$sample': {'size': self.per_skill}}
+            ]))
+            if len(docs) < self.per_skill:
+                uncovered.append(skill)
+                continue
+            drawn.extend(docs)
+            questions.extend(
+                {'skill': doc['skill'], 'question': doc['question'], 'difficulty': doc['difficulty'], 'type': doc['type']}
+                for doc in docs
+            )
+
+        if drawn:
+            self._mark_seen(user_id, drawn)
+        with self._lock:
+            self.counters['served'] += len(skills) - len(uncovered)
+            self.counters['uncovered'] += len(uncovered)
+        return questions, uncovered
+
+    def add(self, questions):
+        """Insert validated questions, skipping ones already banked; returns how many were new"""
+        if not questions:
+            return 0
+        self._ensure_indexes()
+        now = datetime.datetime.utcnow()
+        try:
+            result = self.collection.insert_many([dict(q, created_at=now) for q in questions], ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            return e.details.get('nInserted', 0)
+
+    def count(self, skill, difficulty, experience_level, question_type):
+        return self.collection.count_documents({
+            'skill': skill,
+            'difficulty': difficulty,
+            'experience_level': experience_level,
+            'type': question_type
+        })
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _mark_seen(self, user_id, docs):
+        now = datetime.datetime.utcnow()
+        try:
+            self.seen.insert_many(
+                [{'user_id': user_id, 'skill': doc['skill'], 'question_id': doc['_id'], 'seen_at': now} for doc in docs],
+                ordered=False
+            )
+        except (BulkWriteError, DuplicateKeyError):
+            # A concurrent request drew the same question; it is recorded either way
+            pass
+
+    def _ensure_indexes(self):
+        if not self._indexed:
+            self.collection.create_index([('skill', 1), ('difficulty', 1), ('experience_level', 1), ('type', 1)])
+            self.collection.create_index([('skill', 1), ('question_hash', 1)], unique=True)
+            self.seen.create_index([('user_id', 1), ('question_id', 1)], unique=True)
+            self.seen.create_index([('user_id', 1), ('skill', 1), ('question_id', 1)])
+            self.seen.create_index('seen_at', expireAfterSeconds=self.seen_ttl_seconds)
+            self._indexed = True
+
+
+def build_question_bank(bank, generate, skills=None, target=9, workers=4, rounds=3):
+    """Fill the bank up to target questions for every combination.
+
+    generate(skill, difficulty, experience_level, question_type) returns raw
+    question dicts; at most workers calls run at once. Each combination gets
+    up to rounds attempts, and a failed attempt (generation or Mongo) is
+    logged and retried in the next round; combinations still short after
+    that are reported incomplete rather than aborting the build.
+    Combinations already at target are skipped, so an interrupted build can
+    simply be run again. Returns a summary dict.
+    """
+    skills = [canonical_skill(s) for s in skills] if skills else list(default_matcher.names)
+    combos = [
+        (skill, difficulty, level, question_type)
+        for skill in skills
+        for difficulty in DIFFICULTIES
+        for level in EXPERIENCE_LEVELS
+        for question_type in QUESTION_TYPES
+    ]
+
+    def fill(combo):
+        added = 0
+        for _ in range(rounds):
+            try:
+                if bank.count(*combo) >= target:
+                    return added, True
+                added += bank.add(validate_questions(generate(*combo), *combo))
+            except Exception as e:
+                logger.error(f"Question bank generation failed for {combo}: {str(e)}")
+        try:
+            return added, bank.count(*combo) >= target
+        except Exception as e:
+            logger.error(f"Question bank count failed for {combo}: {str(e)}")
+            return added, False
+
+    summary = {'combinations': len(combos), 'added': 0, 'complete': 0, 'incomplete': []}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='question-bank') as pool:
+        for combo, (added, complete) in zip(combos, pool.map(fill, combos)):
+            summary['added'] += added
+            if complete:
+                summary['complete'] += 1
+            else:
+                summary['incomplete'].append('/'.join(combo))
+    return summary
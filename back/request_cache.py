@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    """A computation in flight that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCache:
+    """Size- and TTL-bounded cache that collapses concurrent misses for a key into one call"""
+
+    def __init__(self, max_entries=512, ttl_seconds=3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    def get_or_compute(self, key, compute, fresh=False):
+        """Return the cached value for key, or run compute() once across all concurrent callers.
+
+        fresh skips the cached value but still joins a call already in flight
+        and stores the new result.
+        """
+        with self._lock:
+            if not fresh:
+                value = self._lookup(key)
+                if value is not None:
+                    return value
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counters['misses'] += 1
+            else:
+                self.counters['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            self._store(key, call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def get(self, key):
+        """Return the cached value for key, or None; never waits on a call in flight"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is None:
+                self.counters['misses'] += 1
+            return value
+
+    def put(self, key, value):
+        self._store(key, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self._entries)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        return None
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
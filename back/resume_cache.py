@@ -0,0 +1,99 @@
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+
+CHUNK_SIZE = 64 * 1024
+
+
+def content_key(stream, *parts):
+    """Hash a binary stream's bytes (plus any extra key parts) and rewind it"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return ':'.join([digest.hexdigest()] + [str(p) for p in parts])
+
+
+class ResumeCache:
+    """Extracted resume text and skills, keyed by a hash of the PDF bytes.
+
+    Entries live in a bounded in-process LRU and, when a collection is given,
+    in Mongo with a TTL index so other workers and later sessions can reuse them.
+    """
+
+    def __init__(self, max_entries=256, collection=None, ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexed = False
+        self.counters = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0}
+
+    def get_or_extract(self, stream, extract, *key_parts):
+        """Return {'text', 'skills'} for the PDF in stream, calling extract(stream) on a miss"""
+        key = content_key(stream, *key_parts)
+        entry = self._get_memory(key)
+        if entry is not None:
+            self._count('memory_hits')
+            return entry
+
+        entry = self._get_mongo(key)
+        if entry is not None:
+            self._count('mongo_hits')
+            self._put_memory(key, entry)
+            return entry
+
+        self._count('misses')
+        entry = extract(stream)
+        self._put_memory(key, entry)
+        self._put_mongo(key, entry)
+        return entry
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['mongo_hits'] + stats['misses']
+        stats['hit_ratio'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_mongo(self, key):
+        if self.collection is None:
+            return None
+        doc = self.collection.find_one({'_id': key}, {'text': 1, 'skills': 1})
+        if not doc:
+            return None
+        return {'text': doc['text'], 'skills': doc['skills']}
+
+    def _put_mongo(self, key, entry):
+        if self.collection is None:
+            return
+        if not self._indexed:
+            self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+            self._indexed = True
+        self.collection.replace_one(
+            {'_id': key},
+            {'text': entry['text'], 'skills': entry['skills'], 'created_at': datetime.datetime.utcnow()},
+            upsert=True
+        )
@@ -0,0 +1,177 @@
+import logging
+import re
+import unicodedata
+from collections import Counter
+
+import metrics
+from llm_scheduler import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Heading wording per section; a heading is a line made of one of these, or one of these, a colon and content.
+# Words that also label lines inside other sections ("Technologies:", "Languages:") are left out on purpose.
+SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies', 'tools and technologies',
+               'skills and tools'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment',
+                   'employment history', 'work history', 'internships', 'internship', 'experience and internships'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects'),
+    'education': ('education', 'academic background', 'academics', 'qualifications', 'education and training'),
+    'certifications': ('certifications', 'certificates', 'licenses and certifications'),
+    'other': ('achievements', 'awards', 'publications', 'interests', 'hobbies', 'volunteering',
+              'activities', 'extracurricular activities', 'references', 'declaration'),
+}
+
+# Kept first when the budget runs short; 'header' is whatever precedes the first heading (name, contact details)
+SECTION_PRIORITY = ('skills', 'experience', 'summary', 'projects', 'education', 'certifications', 'header', 'other')
+
+HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+HEADING_RE = re.compile(
+    r'^(' + '|'.join(sorted((re.escape(h) for h in HEADING_LOOKUP), key=len, reverse=True)) + r')\s*(?::\s*(.*))?$',
+    re.IGNORECASE
+)
+# "Page 3", "Page 3 of 10", "3 of 10", "3/10": a page label wherever it appears
+PAGE_LABEL_RE = re.compile(r'^[-–\s]*(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+)[-–\s]*$', re.IGNORECASE)
+# A bare small number ("3", "- 3 -"), only taken for a page number at a page edge; years and the like are kept
+BARE_PAGE_NUMBER_RE = re.compile(r'^[-–\s]*\d{1,3}[-–\s]*$')
+# The page-number part of a running header or footer such as "Jane Roe - Page 2 of 3"
+PAGE_TOKEN_RE = re.compile(r'\bpage\s*\d+(\s*(of|/)\s*\d+)?\b|\b\d+\s*(of|/)\s*\d+\b', re.IGNORECASE)
+# Below this share of the text surviving, stripping is assumed to have misfired and is undone
+MIN_KEPT_FRACTION = 0.5
+BULLET_RE = re.compile(r'^[•●▪◦■□➢►‣∙·*]\s*')
+HYPHEN_BREAK_RE = re.compile(r'(\w)-\n([a-z])')
+TRUNCATED = '[...]'
+
+
+def normalize_text(text):
+    """Unicode-normalize, rejoin hyphenated line breaks and squeeze whitespace, keeping line and page breaks"""
+    text = unicodedata.normalize('NFKC', text or '').replace('\r\n', '\n').replace('\r', '\n')
+    pages = []
+    for page in text.split('\f'):
+        lines = (BULLET_RE.sub('- ', ' '.join(line.split())) for line in page.split('\n'))
+        pages.append(HYPHEN_BREAK_RE.sub(r'\1\2', '\n'.join(line for line in lines if line)))
+    return '\f'.join(pages)
+
+
+def _furniture_key(line):
+    return PAGE_TOKEN_RE.sub('#', line.lower())
+
+
+def _edge_indexes(lines, edge_lines):
+    return set(range(min(edge_lines, len(lines)))) | set(range(max(len(lines) - edge_lines, 0), len(lines)))
+
+
+def strip_page_furniture(text, edge_lines=3):
+    """Drop page numbers, and lines repeated at the top or bottom of most pages (running headers and footers).
+
+    Pages are separated by form feeds, as extract_pdf_text writes them. Only
+    lines in the top or bottom edge_lines of a page are candidates, and
+    section headings never are. If stripping would remove most of the text,
+    the text is returned unstripped.
+    """
+    pages = [[line for line in page.split('\n') if line] for page in text.split('\f')]
+    edges = [_edge_indexes(lines, edge_lines) for lines in pages]
+    repeated = set()
+    if len(pages) > 1:
+        counts = Counter()
+        for lines, edge in zip(pages, edges):
+            counts.update({_furniture_key(lines[i]) for i in edge if not HEADING_RE.match(lines[i])})
+        repeated = {key for key, count in counts.items() if count >= max(2, len(pages) // 2 + 1)}
+
+    kept = []
+    for lines, edge in zip(pages, edges):
+        for i, line in enumerate(lines):
+            if PAGE_LABEL_RE.match(line):
+                continue
+            if i in edge and not HEADING_RE.match(line) and (
+                    BARE_PAGE_NUMBER_RE.match(line) or _furniture_key(line) in repeated):
+                continue
+            kept.append(line)
+
+    stripped = '\n'.join(kept)
+    unstripped = '\n'.join(line for lines in pages for line in lines)
+    if len(stripped) < MIN_KEPT_FRACTION * len(unstripped):
+        logger.warning(f"Page furniture stripping kept only {len(stripped)} of {len(unstripped)} chars; skipping it")
+        return unstripped
+    return stripped
+
+
+def split_sections(text):
+    """[(section, heading line or None, body lines)] in document order"""
+    sections = [['header', None, []]]
+    for line in text.split('\n'):
+        match = HEADING_RE.match(line)
+        if match:
+            heading = match.group(1)
+            sections.append([HEADING_LOOKUP[heading.lower()], line if not match.group(2) else f"{heading}:", []])
+            if match.group(2):
+                sections[-1][2].append(match.group(2))
+        else:
+            sections[-1][2].append(line)
+    return [tuple(s) for s in sections if s[1] is not None or s[2]]
+
+
+def _fit_lines(lines, budget_chars):
+    """The leading lines that fit in budget_chars, the last one cut at a word if that leaves something useful"""
+    kept = []
+    used = 0
+    for line in lines:
+        room = budget_chars - used - 1
+        if len(line) > room:
+            if room >= 40:
+                kept.append(line[:room].rsplit(' ', 1)[0])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return kept
+
+
+def compact_resume(text, max_tokens=None):
+    """Resume text cleaned of PDF noise and, given max_tokens, cut down to fit it.
+
+    Sections are filled in SECTION_PRIORITY order and shortened or emptied
+    from the lowest priority up; every heading is kept, in document order,
+    so the model still sees the resume's structure.
+    """
+    raw_chars = len(text or '')
+    sections = split_sections(strip_page_furniture(normalize_text(text)))
+
+    budget = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+    bodies = [lines for _, _, lines in sections]
+    truncated = []
+    if budget is not None:
+        # Headings and truncation markers are paid for up front
+        remaining = budget - sum(len(heading) + len(TRUNCATED) + 2 for _, heading, _ in sections if heading)
+        order = sorted(range(len(sections)), key=lambda i: SECTION_PRIORITY.index(sections[i][0]))
+        for index in order:
+            lines = sections[index][2]
+            kept = _fit_lines(lines, max(remaining, 0))
+            remaining -= sum(len(line) + 1 for line in kept)
+            if kept != lines:
+                bodies[index] = kept + [TRUNCATED]
+                truncated.append(sections[index][0])
+
+    parts = []
+    for (_, heading, _), lines in zip(sections, bodies):
+        if heading:
+            parts.append(heading)
+        parts.extend(lines)
+    compacted = '\n'.join(parts)
+
+    metrics.observe('resume_prompt_chars', raw_chars, stage='raw')
+    metrics.observe('resume_prompt_chars', len(compacted), stage='compacted')
+    logger.info(
+        f"Resume compacted from {raw_chars} to {len(compacted)} chars; "
+        f"sections={[s for s, _, _ in sections]} truncated={truncated}"
+    )
+    return compacted
+
+
+def compact_job_description(text, max_tokens=None):
+    """Job description with whitespace squeezed and, given max_tokens, cut at a line boundary"""
+    lines = [line for line in normalize_text(text).replace('\f', '\n').split('\n') if line]
+    if max_tokens:
+        kept = _fit_lines(lines, max_tokens * CHARS_PER_TOKEN)
+        lines = kept + [TRUNCATED] if kept != lines else kept
+    return '\n'.join(lines)
@@ -0,0 +1,181 @@
+import re
+
+import numpy as np
+
+from gemini_utils import extract_skills
+from resume_compactor import normalize_text, split_sections, strip_page_furniture
+
+# Weights follow the LLM prompt's job match breakdown, with keyword similarity standing in for "cultural fit"
+MATCH_WEIGHTS = {'skillsMatch': 0.4, 'experienceMatch': 0.3, 'educationMatch': 0.2, 'keywords': 0.1}
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does for from had has have
+having he her his how i if in into is it its itself just more most must my no nor not of on once only or other our
+ours out over own same she should so some such than that the their them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your yours etc
+able ability strong excellent good great work working experience years year role team candidate candidates job
+responsibilities requirements required preferred plus knowledge understanding skills skill using use including
+""".split())
+
+TOKEN_RE = re.compile(r'[a-z][a-z0-9+#]*(?:\.[a-z0-9]+)*')
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+PHONE_RE = re.compile(r'(?:\+?\d[\s().-]*){10,}')
+QUANTIFIED_RE = re.compile(r'\d+(?:\.\d+)?\s*(?:%|x\b|\+|k\b|m\b|million|users|customers|requests)', re.IGNORECASE)
+
+# Highest degree named in a text, by level
+DEGREE_PATTERNS = (
+    (3, re.compile(r'\b(ph\.?\s?d|doctorate|doctoral)\b', re.IGNORECASE)),
+    (2, re.compile(r"\b(master'?s?|m\.?\s?s\.?c?|m\.?\s?tech|m\.?\s?e\b|mba|mca|postgraduate)\b", re.IGNORECASE)),
+    (1, re.compile(r"\b(bachelor'?s?|b\.?\s?s\.?c?|b\.?\s?tech|b\.?\s?e\b|bca|undergraduate|degree)\b", re.IGNORECASE)),
+)
+
+# (check name, penalty, issue text, suggestion text) for the local ATS checks
+ATS_CHECKS = (
+    ('experience_heading', 15, "No Experience section heading found",
+     "Add a clearly titled Experience section so ATS parsers can find your roles"),
+    ('skills_heading', 15, "No Skills section heading found",
+     "Add a Skills section listing your technical skills by name"),
+    ('education_heading', 10, "No Education section heading found",
+     "Add an Education section with your degree and institution"),
+    ('email', 10, "No email address found", "Put your email address in the resume header"),
+    ('phone', 5, "No phone number found", "Put a phone number in the resume header"),
+    ('bullets', 10, "No bullet points found; dense paragraphs are hard to scan",
+     "Describe each role as short bullet points"),
+    ('length', 15, "Very little text could be extracted; the PDF may be image-based or use complex layouts",
+     "Export the resume as a text-based PDF with a simple single-column layout"),
+    ('garbled', 15, "Extracted text contains many unreadable characters",
+     "Avoid unusual fonts, icons and tables that do not survive text extraction"),
+    ('quantified', 5, "No quantified achievements found",
+     "Quantify your impact with numbers, percentages or scale"),
+)
+
+
+def tokenize(text):
+    return [token.rstrip('.') for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def tfidf_matrix(documents):
+    """Rows of L2-normalized TF-IDF weights (sublinear tf, smoothed idf) over the documents' shared vocabulary.
+
+    Returns (matrix, vocabulary). Built with a single np.add.at scatter, so
+    scoring many resumes against one job description is one call.
+    """
+    tokens = [tokenize(doc) for doc in documents]
+    flat = [token for doc in tokens for token in doc]
+    if not flat:
+        return np.zeros((len(documents), 0)), np.array([], dtype=str)
+    vocabulary, columns = np.unique(np.array(flat), return_inverse=True)
+    rows = np.repeat(np.arange(len(documents)), [len(doc) for doc in tokens])
+
+    counts = np.zeros((len(documents), len(vocabulary)))
+    np.add.at(counts, (rows, columns), 1)
+    tf = np.zeros_like(counts)
+    np.log1p(counts, out=tf, where=counts > 0)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(documents)) / (1 + df)) + 1
+    weights = tf * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0), vocabulary
+
+
+def keyword_scores(resume_text, job_description):
+    """(cosine similarity, share of the job description's keyword weight the resume covers), both 0-1"""
+    matrix, _ = tfidf_matrix([resume_text, job_description])
+    if not matrix.shape[1]:
+        return 0.0, 0.0
+    resume, job = matrix
+    similarity = float(resume @ job)
+    job_weight = job.sum()
+    coverage = float(job[resume > 0].sum() / job_weight) if job_weight else 0.0
+    return similarity, coverage
+
+
+def degree_level(text):
+    for level, pattern in DEGREE_PATTERNS:
+        if pattern.search(text):
+            return level
+    return 0
+
+
+def education_score(resume_text, job_description, has_education_section):
+    required = degree_level(job_description)
+    held = degree_level(resume_text)
+    if not required:
+        return 100 if held or has_education_section else 60
+    if held >= required:
+        return 100
+    return 50 if held else 20
+
+
+def ats_review(resume_text, sections):
+    """(score, issues, suggestions) from structural checks on the extracted text"""
+    found = {name for name, _, _ in sections}
+    words = len(resume_text.split())
+    unreadable = sum(ch == '\ufffd' or not (ch.isprintable() or ch.isspace()) for ch in resume_text)
+    passed = {
+        'experience_heading': 'experience' in found,
+        'skills_heading': 'skills' in found,
+        'education_heading': 'education' in found,
+        'email': bool(EMAIL_RE.search(resume_text)),
+        'phone': bool(PHONE_RE.search(resume_text)),
+        'bullets': any(line.startswith('- ') for _, _, lines in sections for line in lines),
+        'length': words >= 150,
+        'garbled': unreadable <= 0.05 * len(resume_text),
+        'quantified': bool(QUANTIFIED_RE.search(resume_text)),
+    }
+    score = 100
+    issues = []
+    suggestions = []
+    for name, penalty, issue, suggestion in ATS_CHECKS:
+        if not passed[name]:
+            score -= penalty
+            issues.append(issue)
+            category = 'content' if name in ('quantified', 'length') else 'formatting'
+            suggestions.append({'category': category, 'suggestion': suggestion, 'priority': 'medium'})
+    return max(score, 0), issues, suggestions
+
+
+def fast_analysis(resume_text, job_description, resume_skills=None):
+    """Score a resume against a job description locally, in the /analyze-resume response schema.
+
+    resume_skills can pass in skills already extracted for this resume.
+    """
+    cleaned = strip_page_furniture(normalize_text(resume_text))
+    sections = split_sections(cleaned)
+    resume_skills = set(extract_skills(cleaned) if resume_skills is None else resume_skills)
+    job_skills = extract_skills(job_description)
+
+    matching = [skill for skill in job_skills if skill in resume_skills]
+    missing = [skill for skill in job_skills if skill not in resume_skills]
+    similarity, coverage = keyword_scores(cleaned, job_description)
+
+    breakdown = {
+        'skillsMatch': round(100 * len(matching) / len(job_skills)) if job_skills else round(100 * coverage),
+        'experienceMatch': round(100 * coverage),
+        'educationMatch': education_score(cleaned, job_description, any(s == 'education' for s, _, _ in sections)),
+    }
+    job_match = (
+        MATCH_WEIGHTS['skillsMatch'] * breakdown['skillsMatch']
+        + MATCH_WEIGHTS['experienceMatch'] * breakdown['experienceMatch']
+        + MATCH_WEIGHTS['educationMatch'] * breakdown['educationMatch']
+        + MATCH_WEIGHTS['keywords'] * 100 * similarity
+    )
+    ats_score, ats_issues, ats_suggestions = ats_review(cleaned, sections)
+
+    suggestions = [
+        {
+            'category': 'skills',
+            'suggestion': f"The job asks for {skill}; if you have used it, list it and show where you applied it",
+            'priority': 'high'
+        }
+        for skill in missing[:5]
+    ]
+    return {
+        'atsScore': ats_score,
+        'jobMatchScore': round(job_match),
+        'scoreBreakdown': breakdown,
+        'matchingSkills': matching,
+        'missingSkills': missing,
+        'atsIssues': ats_issues,
+        'suggestions': suggestions + ats_suggestions
+    }
@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+
+
+def load_taxonomy(path=None):
+    """Load the skill taxonomy as a list of (canonical name, aliases) pairs"""
+    path = path or os.getenv('SKILL_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH)
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return [(entry['name'], list(entry.get('aliases', []))) for entry in entries]
+
+
+def _normalize_term(term):
+    return re.sub(r'\s+', ' ', term.strip()).lower()
+
+
+def _trie_to_regex(node):
+    """Emit a regex for a character trie so shared prefixes are only tried once"""
+    terminal = '' in node
+    branches = []
+    for char in sorted(k for k in node if k):
+        token = r'\s+' if char == ' ' else re.escape(char)
+        branches.append(token + _trie_to_regex(node[char]))
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if terminal else group
+
+
+class SkillMatcher:
+    """Finds every taxonomy skill in a text with a single compiled pattern"""
+
+    def __init__(self, taxonomy):
+        self.names = []
+        self.lookup = {}
+        for canonical, aliases in taxonomy:
+            if _normalize_term(canonical) in self.lookup:
+                continue
+            index = len(self.names)
+            self.names.append(canonical)
+            for term in [canonical] + aliases:
+                self.lookup.setdefault(_normalize_term(term), index)
+
+        trie = {}
+        for term in self.lookup:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        # Skills are delimited by anything that is not a word character so
+        # that symbols such as "C++" and "C#" still match at their edges.
+        self.pattern = re.compile(
+            r'(?<!\w)' + (_trie_to_regex(trie) or r'(?!)') + r'(?!\w)',
+            re.IGNORECASE
+        )
+
+    def match(self, text):
+        """Return canonical skill names found in text, in taxonomy order"""
+        found = set()
+        for m in self.pattern.finditer(text or ''):
+            index = self.lookup.get(_normalize_term(m.group(0)))
+            if index is not None:
+                found.add(index)
+        return [self.names[i] for i in sorted(found)]
+
+    def canonicalize(self, skill):
+        """Map a skill name or alias to its canonical name, or None if unknown"""
+        index = self.lookup.get(_normalize_term(skill or ''))
+        return self.names[index] if index is not None else None
+
+
+default_matcher = SkillMatcher(load_taxonomy())
@@ -0,0 +1,68 @@
+from pymongo import DESCENDING, UpdateOne
+from skill_matcher import default_matcher
+
+
+def canonical_skill(name):
+    """The taxonomy's canonical name for a skill or alias; unknown names are only trimmed"""
+    return default_matcher.canonicalize(name) or ' '.join(str(name).split())
+
+
+def normalize_skills(skills):
+    """Canonical names for a skill list, deduplicated, first occurrence kept"""
+    seen = []
+    for skill in skills or []:
+        canonical = canonical_skill(skill)
+        if canonical and canonical not in seen:
+            seen.append(canonical)
+    return seen
+
+
+def ensure_skill_indexes(db):
+    db.skill_counts.create_index([('count', DESCENDING)])
+
+
+def apply_skill_change(db, old_skills, new_skills):
+    """Adjust the materialized skill_counts for one user's skills changing from old to new"""
+    old, new = set(old_skills or []), set(new_skills or [])
+    ops = [UpdateOne({'_id': skill}, {'$inc': {'count': 1}}, upsert=True) for skill in new - old]
+    ops += [UpdateOne({'_id': skill}, {'$inc': {'count': -1}}) for skill in old - new]
+    if ops:
+        db.skill_counts.bulk_write(ops, ordered=False)
+
+
+def top_skills(db, limit):
+    return [
+        {'skill': doc['_id'], 'count': doc['count']}
+        for doc in db.skill_counts.find({'count': {'$gt': 0}}).sort('count', DESCENDING).limit(limit)
+    ]
+
+
+def skill_count(db, skill):
+    doc = db.skill_counts.find_one({'_id': skill})
+    return max(doc['count'], 0) if doc else 0
+
+
+def rebuild_skill_counts(db):
+    """Recount skill_counts from users; $out swaps the collection in atomically and keeps its indexes"""
+    db.users.aggregate([
+        {'$unwind': '$skills'},
+        {'$group': {'_id': '$skills', 'count': {'$sum': 1}}},
+        {'$out': 'skill_counts'}
+    ])
+    ensure_skill_indexes(db)
+
+
+def normalize_user_skills(db, batch_size=500):
+    """Rewrite stored skills as canonical names; returns how many users changed"""
+    changed = 0
+    ops = []
+    for user in db.users.find({'skills.0': {'$exists': True}}, {'skills': 1}).batch_size(batch_size):
+        normalized = normalize_skills(user['skills'])
+        if normalized != user['skills']:
+            ops.append(UpdateOne({'_id': user['_id'], 'skills': user['skills']}, {'$set': {'skills': normalized}}))
+        if len(ops) >= batch_size:
+            changed += db.users.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        changed += db.users.bulk_write(ops, ordered=False).modified_count
+    return changed
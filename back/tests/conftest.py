@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# The backend modules are flat files in back/, imported by name as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_app(monkeypatch):
+    """Builds Flask apps on the fake LLM backend that share one in-memory Mongo, like the workers of a deployment"""
+    mongomock = pytest.importorskip('mongomock')
+    import flask_pymongo
+    from app import create_app
+
+    store = mongomock.MongoClient()
+    # mongomock takes no driver options such as event_listeners
+    monkeypatch.setattr(flask_pymongo, 'MongoClient', lambda *a, **kw: store)
+    return lambda: create_app({
+        'MONGO_URI': 'mongodb://localhost:27017/skillmatrix_test',
+        'JWT_SECRET_KEY': 'test-jwt-secret-key-of-at-least-32-bytes',
+        'LLM_BACKEND': 'fake',
+        'BCRYPT_ROUNDS': 4
+    })
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    """A test client signed in as a regular user"""
+    client = app.test_client()
+    client.post('/signup', json={'name': 'A', 'email': 'user@example.com', 'password': 'pw'})
+    token = client.post('/login', json={'email': 'user@example.com', 'password': 'pw'}).get_json()['access_token']
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
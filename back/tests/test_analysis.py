@@ -0,0 +1,24 @@
+import io
+
+import pytest
+
+PDF = b'%PDF-1.4 not really a pdf'
+
+
+@pytest.mark.parametrize('upload, fields, error', [
+    (None, {'jobDescription': 'Python developer'}, 'No resume file uploaded'),
+    ((b'hi', 'resume.txt'), {'jobDescription': 'Python developer'},
+     'Invalid file type. Please upload a PDF or Word document'),
+    ((PDF, 'resume.pdf'), {}, 'Job description is required'),
+    ((PDF, 'resume.pdf'), {'jobDescription': 'Python developer', 'mode': 'slow'},
+     'mode must be one of: fast, llm, hybrid'),
+])
+@pytest.mark.parametrize('path', ['/analyze-resume', '/analyze-resume/jobs'])
+def test_sync_and_queued_analysis_validate_alike(client, path, upload, fields, error):
+    data = dict(fields)
+    if upload:
+        data['resume'] = (io.BytesIO(upload[0]), upload[1])
+    response = client.post(path, data=data)
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
@@ -0,0 +1,51 @@
+import threading
+
+import app as app_module
+
+
+def failing_ensure_indexes(calls):
+    def ensure_indexes(db):
+        calls.append(db)
+        raise RuntimeError('server selection timeout')
+    return ensure_indexes
+
+
+def test_index_failure_is_not_retried_on_every_request(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, 'ensure_indexes', failing_ensure_indexes(calls))
+    client = app.test_client()
+
+    assert client.get('/').status_code == 200
+    assert client.get('/').status_code == 200
+    assert len(calls) == 1
+
+    app.extensions['skillmatrix'].index_retry_at = 0
+    client.get('/')
+    assert len(calls) == 2
+
+
+def test_requests_skip_indexes_while_another_request_creates_them(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module, 'ensure_indexes', failing_ensure_indexes(calls))
+    services = app.extensions['skillmatrix']
+
+    services.index_lock.acquire()
+    try:
+        served = []
+        request = threading.Thread(target=lambda: served.append(app.test_client().get('/').status_code))
+        request.start()
+        request.join(timeout=5)
+        assert served == [200]
+        assert calls == []
+    finally:
+        services.index_lock.release()
+
+
+def test_indexes_are_created_once(app):
+    client = app.test_client()
+    client.get('/')
+    client.get('/')
+
+    assert app.extensions['skillmatrix'].indexed
+    with app.app_context():
+        assert 'email_unique' in app.extensions['skillmatrix'].mongo.db.users.index_information()
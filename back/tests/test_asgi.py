@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+import pytest
+
+asgi = pytest.importorskip('asgi')
+
+
+def request_with(content_length):
+    headers = {} if content_length is None else {'content-length': content_length}
+    return SimpleNamespace(headers=headers)
+
+
+@pytest.mark.parametrize('content_length, expected', [(None, False), ('1024', False), (str(64 * 1024 * 1024), True)])
+def test_too_large_reads_content_length(content_length, expected):
+    assert asgi.too_large(request_with(content_length)) is expected
+
+
+@pytest.mark.parametrize('content_length', ['abc', '-1', '1e9', ''])
+def test_malformed_content_length_is_a_bad_request(content_length):
+    with pytest.raises(asgi.RequestError) as error:
+        asgi.too_large(request_with(content_length))
+
+    body, status, _ = asgi.analysis_error_reply(error.value)
+    assert (status, body) == (400, {'error': 'Invalid Content-Length header'})
@@ -0,0 +1,36 @@
+import time
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+from auth import UserChangeList
+
+
+def test_profile_change_rejects_old_tokens_on_every_worker(make_app, client):
+    other_worker = make_app().test_client()
+    old_token = client.environ_base['HTTP_AUTHORIZATION']
+    assert other_worker.get('/dashboard', headers={'Authorization': old_token}).status_code == 200
+
+    # Tokens carry whole-second iat, so the change has to land in a later second than the login
+    time.sleep(1)
+    response = client.put('/update-profile', json={'name': 'Renamed'})
+    new_token = f"Bearer {response.get_json()['access_token']}"
+
+    assert other_worker.get('/dashboard', headers={'Authorization': old_token}).status_code == 401
+    assert other_worker.get('/dashboard', headers={'Authorization': new_token}).status_code == 200
+
+
+class Unreachable:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ServerSelectionTimeoutError('no servers')
+        return fail
+
+
+def test_falls_back_to_this_workers_changes_without_mongo():
+    changes = UserChangeList(Unreachable(), 3600)
+    changes.mark_changed('u1')
+    changed_at = int(time.time())
+
+    assert changes.is_stale({'sub': 'u1', 'iat': changed_at - 1})
+    assert not changes.is_stale({'sub': 'u1', 'iat': changed_at})
+    assert not changes.is_stale({'sub': 'u2', 'iat': changed_at - 1})
@@ -0,0 +1,16 @@
+def test_build_question_bank_fills_every_combination(app):
+    result = app.test_cli_runner().invoke(args=['build-question-bank', '--skills', 'Python', '--target', '3'])
+
+    assert result.exception is None, result.output
+    assert '27/27 combinations complete, 81 questions added' in result.output
+    with app.app_context():
+        bank = app.extensions['skillmatrix'].question_bank
+        assert bank.count('Python', 'medium', 'mid', 'technical') == 3
+
+
+def test_build_question_bank_is_safe_to_rerun(app):
+    runner = app.test_cli_runner()
+    runner.invoke(args=['build-question-bank', '--skills', 'Python', '--target', '3'])
+    result = runner.invoke(args=['build-question-bank', '--skills', 'Python', '--target', '3'])
+
+    assert '27/27 combinations complete, 0 questions added' in result.output
@@ -0,0 +1,15 @@
+def history(app):
+    with app.app_context():
+        return list(app.extensions['skillmatrix'].mongo.db.answer_history.find({}, {'_id': 0, 'timestamp': 0, 'user_id': 0}))
+
+
+def test_batch_and_single_grades_share_their_shape(app, client):
+    item = {'question': 'What is a closure?', 'userAnswer': 'A function with its scope', 'skill': 'Python'}
+    single = client.post('/grade-answer', json=item).get_json()
+    batch = client.post('/grade-answers', json={'items': [item, {'question': 'q'}]}).get_json()
+
+    graded, failed = batch['results']
+    assert graded == dict(single, index=0)
+    assert failed == {'index': 1, 'success': False, 'error': 'Missing required fields'}
+    first, second = history(app)
+    assert first == second
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import llm_resilience
+from llm_resilience import CircuitBreaker, LLMUnavailableError, ResilientCaller
+
+
+class FakeClock:
+    """Stands in for the time module in llm_resilience; sleeping just moves the clock on"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_resilience, 'time', clock)
+    return clock
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+class Rejected(Exception):
+    code = 400
+
+
+class Backend:
+    """A model call that fails while down is set and counts how often it is reached"""
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.down:
+            raise Unavailable('upstream down')
+        return 'ok'
+
+
+def test_breaker_opens_then_half_opens_then_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock.advance(10)
+    assert breaker.is_open()
+    assert breaker.retry_after() == 20
+
+    clock.advance(20)
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(30)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.retry_after() == 30
+
+
+def test_open_circuit_fails_fast_until_a_probe_succeeds(clock):
+    caller = ResilientCaller(retries=0, failure_threshold=2, reset_seconds=30)
+    backend = Backend()
+    backend.down = True
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            caller.call('grade', backend)
+    assert backend.calls == 2
+
+    with pytest.raises(LLMUnavailableError, match="circuit for 'grade' is open") as error:
+        caller.call('grade', backend)
+    assert backend.calls == 2
+    assert error.value.retry_after == 30
+
+    clock.advance(30)
+    backend.down = False
+    assert caller.call('grade', backend) == 'ok'
+    assert caller.breaker('grade').state == 'closed'
+
+
+def test_transient_errors_are_retried(clock):
+    caller = ResilientCaller(retries=2, backoff_base=0.5)
+    outcomes = [Unavailable('busy'), Unavailable('busy'), 'ok']
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert caller.call('grade', flaky) == 'ok'
+    assert outcomes == []
+
+
+def test_request_errors_are_raised_without_retrying_or_tripping_the_breaker(clock):
+    caller = ResilientCaller(retries=2, failure_threshold=1)
+    calls = []
+
+    def rejected():
+        calls.append(1)
+        raise Rejected('bad prompt')
+
+    with pytest.raises(Rejected):
+        caller.call('grade', rejected)
+    assert len(calls) == 1
+    assert caller.breaker('grade').state == 'closed'
+
+
+def test_deadline_bounds_a_call_that_never_answers():
+    caller = ResilientCaller(deadlines={'default': 0.1}, retries=0)
+    release = threading.Event()
+    start = time.monotonic()
+    try:
+        with pytest.raises(LLMUnavailableError, match='no response within'):
+            caller.call('grade', lambda: release.wait(5))
+    finally:
+        release.set()
+    assert time.monotonic() - start < 1
+
+
+def hedging_caller(gate=None):
+    caller = ResilientCaller(deadlines={'default': 5}, retries=0, hedge_percentile=95)
+    caller.hedge_gate = gate
+    # Enough history for a 20ms p95, after which a still-running attempt is hedged
+    for _ in range(20):
+        caller._latency_window('grade').add(0.02)
+    return caller
+
+
+def test_hedge_answers_when_the_first_request_stalls():
+    caller = hedging_caller()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return 'slow'
+        return 'hedged'
+
+    try:
+        start = time.monotonic()
+        assert caller.call('grade', call) == 'hedged'
+        assert time.monotonic() - start < 1
+    finally:
+        release.set()
+
+
+def test_hedge_cancels_the_slower_async_request():
+    caller = hedging_caller()
+    cancelled = []
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return 'slow'
+        return 'hedged'
+
+    async def run():
+        text = await caller.call_async('grade', call)
+        # Let the cancelled request run its handler
+        await asyncio.sleep(0)
+        return text
+
+    assert asyncio.run(run()) == 'hedged'
+    assert cancelled == [1]
+
+
+def test_closed_hedge_gate_sends_no_hedge():
+    caller = hedging_caller(gate=lambda: False)
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'only'
+
+    assert caller.call('grade', call) == 'only'
+    assert len(calls) == 1
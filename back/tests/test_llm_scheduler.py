@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import AdmissionRejectedError, AdmissionScheduler, parse_priorities
+
+
+class FakeClock:
+    """Stands in for the time module in llm_scheduler, so the buckets only refill when a test says so"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_scheduler, 'time', clock)
+    return clock
+
+
+def advance(scheduler, clock, seconds):
+    """Move the clock on and wake the waiters, as a refill would after real time passed"""
+    clock.now += seconds
+    with scheduler._cond:
+        scheduler._cond.notify_all()
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_bulk_leaves_a_reserve_for_interactive_calls(clock):
+    scheduler = AdmissionScheduler(rpm=60, bulk_reserve=0.2)
+    for _ in range(48):
+        scheduler.acquire('generate', 'prompt')
+
+    with pytest.raises(AdmissionRejectedError):
+        scheduler.acquire('generate', 'prompt', max_wait=0)
+    scheduler.acquire('grade', 'prompt', max_wait=0)
+
+    assert scheduler.stats()['admitted'] == 49
+    assert scheduler.stats()['rejected'] == 1
+
+
+def test_bulk_yields_to_interactive_under_a_quota_limit(clock):
+    scheduler = AdmissionScheduler(rpm=60, max_wait=60, bulk_reserve=0.2)
+    scheduler.throttle()
+    admitted = []
+
+    def call(site):
+        scheduler.acquire(site, 'prompt')
+        admitted.append(site)
+
+    bulk = threading.Thread(target=call, args=('generate',))
+    bulk.start()
+    wait_until(lambda: scheduler.queue_depth()['bulk'] == 1)
+    interactive = threading.Thread(target=call, args=('grade',))
+    interactive.start()
+    wait_until(lambda: scheduler.queue_depth()['interactive'] == 1)
+
+    # One request refilled: the interactive call goes first although the bulk call queued earlier
+    advance(scheduler, clock, 1)
+    interactive.join(timeout=5)
+    assert admitted == ['grade']
+    assert scheduler.queue_depth() == {'interactive': 0, 'bulk': 1}
+
+    # Bulk only goes once the bucket holds its reserve of 12 on top of the call
+    advance(scheduler, clock, 12)
+    time.sleep(0.05)
+    assert admitted == ['grade']
+    advance(scheduler, clock, 1)
+    bulk.join(timeout=5)
+    assert admitted == ['grade', 'generate']
+
+
+def test_waiting_call_is_rejected_after_max_wait(clock):
+    # One request every ten seconds, so nothing refills within the five second wait
+    scheduler = AdmissionScheduler(rpm=6, max_wait=5)
+    scheduler.throttle()
+    errors = []
+
+    def call():
+        try:
+            scheduler.acquire('grade', 'prompt')
+        except AdmissionRejectedError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    wait_until(lambda: scheduler.queue_depth()['interactive'] == 1)
+    advance(scheduler, clock, 5)
+    waiter.join(timeout=5)
+
+    assert len(errors) == 1
+    assert errors[0].retry_after == pytest.approx(5)
+    assert scheduler.queue_depth() == {'interactive': 0, 'bulk': 0}
+
+
+def test_tokens_are_reserved_up_front_and_settled_after(clock):
+    scheduler = AdmissionScheduler(tpm=1000, output_tokens=100)
+    prompt = 'x' * 400
+
+    charged = scheduler.acquire('grade', prompt)
+    assert charged == 200
+    assert scheduler.tokens.level == 800
+
+    scheduler.settle(charged, prompt, 'y' * 40)
+    assert scheduler.tokens.level == 890
+
+    scheduler.settle(scheduler.acquire('grade', prompt), prompt, 'y' * 800)
+    assert scheduler.tokens.level == 890 - 300
+
+
+def test_token_budget_holds_calls_until_it_refills(clock):
+    scheduler = AdmissionScheduler(tpm=600, max_wait=0, output_tokens=500)
+    scheduler.acquire('grade', 'prompt')
+
+    with pytest.raises(AdmissionRejectedError) as error:
+        scheduler.acquire('grade', 'prompt')
+    # 99 tokens left, 501 needed at 10 a second
+    assert error.value.retry_after == pytest.approx(40.2)
+
+    clock.now += 40.2
+    scheduler.acquire('grade', 'prompt')
+
+
+def test_async_waiter_is_admitted_once_quota_refills(clock):
+    scheduler = AdmissionScheduler(rpm=60, max_wait=60)
+    scheduler.throttle()
+
+    async def run():
+        waiter = asyncio.ensure_future(scheduler.acquire_async('grade', 'prompt'))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+        assert not scheduler.idle()
+        clock.now += 1
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(run()) > 0
+    assert scheduler.idle()
+
+
+def test_unlimited_scheduler_admits_without_waiting():
+    scheduler = AdmissionScheduler()
+    for _ in range(1000):
+        scheduler.acquire('generate', 'prompt', max_wait=0)
+    assert scheduler.stats()['admitted'] == 0
+
+
+def test_parse_priorities():
+    assert parse_priorities('generate=interactive, grade = bulk')['generate'] == 'interactive'
+    assert parse_priorities('')['grade'] == 'interactive'
+    with pytest.raises(ValueError):
+        parse_priorities('grade=urgent')
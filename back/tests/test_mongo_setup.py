@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from mongo_setup import QueryTimer, explain_slow_queries
+
+IXSCAN = {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'skills_1__id_1'}}}}
+PUSHED_DOWN = {'stages': [{'$cursor': IXSCAN}, {'$sample': {'size': 3}}]}
+
+
+class ExplainRecorder:
+    """Stands in for a Database, recording the explain commands it is given"""
+
+    def __init__(self):
+        self.explained = []
+
+    def command(self, name, command, verbosity=None):
+        assert name == 'explain' and verbosity == 'queryPlanner'
+        self.explained.append(command)
+        return PUSHED_DOWN if 'aggregate' in command else IXSCAN
+
+
+def run_slow(timer, request_id, command_name, command):
+    command = dict(command, lsid={'id': 'session'}, **{'$db': 'skillmatrix'})
+    timer.started(SimpleNamespace(request_id=request_id, command_name=command_name, command=command))
+    timer.succeeded(SimpleNamespace(request_id=request_id, duration_micros=250000))
+
+
+def test_explains_each_slow_command_as_it_ran():
+    timer = QueryTimer(threshold_ms=100)
+    run_slow(timer, 1, 'find', {'find': 'users', 'filter': {'skills': 'Python'}, 'sort': {'_id': 1}, 'limit': 50})
+    run_slow(timer, 2, 'aggregate', {'aggregate': 'question_bank', 'pipeline': [{'$match': {'skill': 'Go'}}], 'cursor': {}})
+    run_slow(timer, 3, 'update', {'update': 'users', 'updates': [{'q': {'_id': 1}, 'u': {'$set': {'a': 1}}}, {'q': {}, 'u': {}}]})
+    run_slow(timer, 4, 'insert', {'insert': 'answer_history', 'documents': [{'question': 'q'}]})
+    db = ExplainRecorder()
+
+    report = explain_slow_queries(db, timer)
+
+    assert db.explained == [
+        {'find': 'users', 'filter': {'skills': 'Python'}, 'sort': {'_id': 1}, 'limit': 50},
+        {'aggregate': 'question_bank', 'pipeline': [{'$match': {'skill': 'Go'}}], 'cursor': {}},
+        {'update': 'users', 'updates': [{'q': {'_id': 1}, 'u': {'$set': {'a': 1}}}]},
+    ]
+    assert [(r['collection'], r['command'], r['plan']) for r in report] == [
+        ('users', 'find', 'FETCH <- IXSCAN(skills_1__id_1)'),
+        ('question_bank', 'aggregate', 'FETCH <- IXSCAN(skills_1__id_1)'),
+        ('users', 'update', 'FETCH <- IXSCAN(skills_1__id_1)'),
+    ]
+
+
+def test_fast_commands_are_not_sampled():
+    timer = QueryTimer(threshold_ms=1000)
+    run_slow(timer, 1, 'find', {'find': 'users', 'filter': {}})
+
+    assert explain_slow_queries(ExplainRecorder(), timer) == []
@@ -0,0 +1,81 @@
+import pytest
+
+from question_bank import QuestionBank, build_question_bank
+
+mongomock = pytest.importorskip('mongomock')
+
+COMBOS_PER_SKILL = 27
+
+
+def generate(skill, difficulty, level, question_type):
+    return [
+        {'skill': skill, 'type': question_type, 'question': f'{difficulty} {level} {question_type} question {i} on {skill}?'}
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def bank():
+    db = mongomock.MongoClient().db
+    return QuestionBank(db.question_bank, db.seen_questions)
+
+
+def test_fills_every_combination_to_target(bank):
+    summary = build_question_bank(bank, generate, skills=['Python'], target=3, workers=2)
+
+    assert summary == {'combinations': COMBOS_PER_SKILL, 'added': 81, 'complete': COMBOS_PER_SKILL, 'incomplete': []}
+    assert bank.count('Python', 'hard', 'senior', 'behavioral') == 3
+
+
+def test_failed_generation_is_retried_in_a_later_round(bank):
+    calls = {}
+
+    def flaky(*combo):
+        calls[combo] = calls.get(combo, 0) + 1
+        if calls[combo] == 1:
+            raise RuntimeError('model overloaded')
+        return generate(*combo)
+
+    summary = build_question_bank(bank, flaky, skills=['Python'], target=3, workers=2)
+
+    assert summary['complete'] == COMBOS_PER_SKILL
+    assert set(calls.values()) == {2}
+
+
+class CountFailsOnce:
+    """A bank whose count raises once per combination, as on a Mongo blip"""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.failed = set()
+
+    def count(self, *combo):
+        if combo not in self.failed:
+            self.failed.add(combo)
+            raise RuntimeError('server selection timeout')
+        return self.bank.count(*combo)
+
+    def add(self, questions):
+        return self.bank.add(questions)
+
+
+def test_count_errors_are_retried_per_combination(bank):
+    summary = build_question_bank(CountFailsOnce(bank), generate, skills=['Python'], target=3, workers=2)
+
+    assert summary['complete'] == COMBOS_PER_SKILL
+
+
+class Unreachable:
+    def count(self, *combo):
+        raise RuntimeError('server selection timeout')
+
+    def add(self, questions):
+        raise AssertionError('nothing should be added')
+
+
+def test_unreachable_bank_reports_incomplete_instead_of_aborting():
+    summary = build_question_bank(Unreachable(), generate, skills=['Python'], target=3, workers=2)
+
+    assert summary['complete'] == 0
+    assert len(summary['incomplete']) == COMBOS_PER_SKILL
+    assert 'Python/easy/entry/technical' in summary['incomplete']
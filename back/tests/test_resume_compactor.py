@@ -0,0 +1,75 @@
+from resume_compactor import compact_resume, strip_page_furniture
+
+PAGES = [
+    [
+        "Jane Roe - Resume",
+        "jane@example.com | +1 555 123 4567",
+        "Summary",
+        "Backend engineer with eight years of Python.",
+        "Experience",
+        "Senior Engineer, Acme Corp",
+        "2019",
+        "- Built Django APIs serving 2M users",
+        "Page 1 of 3",
+    ],
+    [
+        "Jane Roe - Resume",
+        "Experience",
+        "Engineer, Initech",
+        "2016 - 2019",
+        "- Cut p95 latency 40% with Redis caching",
+        "- Moved batch jobs to Celery",
+        "Page 2 of 3",
+    ],
+    [
+        "Jane Roe - Resume",
+        "Education",
+        "B.Tech Computer Science",
+        "2016",
+        "Skills",
+        "Python, Django, Redis, Docker, AWS",
+        "3",
+    ],
+]
+
+
+def resume_text(pages):
+    return '\f'.join('\n'.join(lines) for lines in pages)
+
+
+def test_strips_running_headers_and_page_numbers():
+    stripped = strip_page_furniture(resume_text(PAGES)).split('\n')
+    assert "Jane Roe - Resume" not in stripped
+    assert not any(line.startswith("Page ") for line in stripped)
+    assert "3" not in stripped
+
+
+def test_keeps_years_and_repeated_headings():
+    stripped = strip_page_furniture(resume_text(PAGES)).split('\n')
+    assert stripped.count("Experience") == 2
+    assert "2019" in stripped
+    assert "2016" in stripped
+    assert "Python, Django, Redis, Docker, AWS" in stripped
+
+
+def test_lines_differing_by_numbers_are_not_furniture():
+    pages = [
+        [f"Candidate 7 - page {page + 1}", "Experience"]
+        + [f"Used Python in production ({page}.{line})." for line in range(55)]
+        for page in range(10)
+    ]
+    compacted = compact_resume(resume_text(pages))
+    assert compacted.count("Used Python in production") == 550
+    assert "Candidate 7 - page 1" not in compacted
+
+
+def test_falls_back_when_stripping_removes_most_text():
+    pages = [["Python developer", "Django and Redis", "Docker"] for _ in range(4)]
+    stripped = strip_page_furniture(resume_text(pages))
+    assert stripped.count("Python developer") == 4
+
+
+def test_compacted_resume_is_never_empty():
+    compacted = compact_resume(resume_text(PAGES), max_tokens=2500)
+    assert "Built Django APIs" in compacted
+    assert "Experience" in compacted
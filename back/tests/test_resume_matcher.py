@@ -0,0 +1,106 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from resume_matcher import education_score, fast_analysis, keyword_scores, tfidf_matrix, tokenize  # noqa: E402
+
+RESUME = """Jane Roe
+jane@example.com | +1 555 123 4567
+Summary
+Backend engineer building Python services.
+Experience
+Senior Engineer, Acme Corp
+- Built Django REST APIs serving 2M users
+- Cut p95 latency 40% with Redis caching
+- Deployed services on AWS with Docker
+Skills
+Python, Django, Redis, Docker, AWS, PostgreSQL
+Education
+B.Tech Computer Science
+"""
+
+ROLE = """Backend Python developer. You will build Django APIs on PostgreSQL, deploy with Docker and Kubernetes,
+and own services on AWS. Bachelor's degree in computer science."""
+
+
+def test_fast_analysis_scores_a_fixed_resume_and_role():
+    analysis = fast_analysis(RESUME, ROLE)
+
+    assert analysis['matchingSkills'] == ['Python', 'Django', 'PostgreSQL', 'AWS', 'Docker']
+    assert analysis['missingSkills'] == ['Kubernetes']
+    assert analysis['scoreBreakdown']['skillsMatch'] == 83
+    assert analysis['scoreBreakdown']['educationMatch'] == 100
+    assert 0 < analysis['scoreBreakdown']['experienceMatch'] < 100
+    assert analysis['jobMatchScore'] == 73
+    # Headings, contact details, bullets and numbers are all there; the sample is just short
+    assert analysis['atsIssues'] == [
+        "Very little text could be extracted; the PDF may be image-based or use complex layouts"
+    ]
+    assert analysis['atsScore'] == 85
+    assert analysis['suggestions'][0] == {
+        'category': 'skills',
+        'suggestion': "The job asks for Kubernetes; if you have used it, list it and show where you applied it",
+        'priority': 'high'
+    }
+
+
+def test_fast_analysis_uses_skills_passed_in():
+    analysis = fast_analysis(RESUME, ROLE, resume_skills=['Kubernetes'])
+
+    assert analysis['matchingSkills'] == ['Kubernetes']
+    assert analysis['scoreBreakdown']['skillsMatch'] == 17
+
+
+def test_unrelated_resume_scores_low():
+    analysis = fast_analysis("Pastry chef\nExperience\n- Baked bread for 300 guests daily", ROLE)
+
+    assert analysis['matchingSkills'] == []
+    assert analysis['jobMatchScore'] < 20
+
+
+def test_tokenize_keeps_language_names_and_drops_stopwords():
+    assert tokenize("Experience with Node.js, C++ and C# for the team.") == ['node.js', 'c++', 'c#']
+
+
+def test_tfidf_rows_are_unit_length():
+    matrix, vocabulary = tfidf_matrix(["python django python", "python redis", "go"])
+
+    assert list(vocabulary) == ['django', 'go', 'python', 'redis']
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1)
+    # Within one document, a term shared with another document weighs less than one unique to it
+    assert matrix[1, 3] > matrix[1, 2] > 0
+
+
+def test_tfidf_of_empty_documents():
+    matrix, vocabulary = tfidf_matrix(["", "the and of"])
+
+    assert matrix.shape == (2, 0)
+    assert len(vocabulary) == 0
+
+
+@pytest.mark.parametrize('resume, job, similarity, coverage', [
+    ("python django", "python django", 1.0, 1.0),
+    ("python django", "kotlin swift", 0.0, 0.0),
+    ("", "python", 0.0, 0.0),
+])
+def test_keyword_scores(resume, job, similarity, coverage):
+    assert keyword_scores(resume, job) == pytest.approx((similarity, coverage))
+
+
+def test_keyword_coverage_is_the_share_of_job_weight_covered():
+    similarity, coverage = keyword_scores("python", "python kafka")
+
+    assert 0 < similarity < 1
+    # The term the resume lacks is the rarer one, so it carries more than half the weight
+    assert 0 < coverage < 0.5
+
+
+@pytest.mark.parametrize('resume, job, has_section, score', [
+    ("B.Tech Computer Science", "Master's degree required", True, 50),
+    ("MSc Data Science", "Master's degree required", True, 100),
+    ("No formal schooling listed", "PhD preferred", False, 20),
+    ("", "Python developer", True, 100),
+    ("", "Python developer", False, 60),
+])
+def test_education_score(resume, job, has_section, score):
+    assert education_score(resume, job, has_section) == score
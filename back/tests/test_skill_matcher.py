@@ -0,0 +1,56 @@
+import pytest
+
+from skill_matcher import SkillMatcher, default_matcher
+
+# The shipped taxonomy has no plain "C", so the symbol cases use a small one of their own
+matcher = SkillMatcher([
+    ('C', []),
+    ('C++', ['CPP']),
+    ('C#', ['C Sharp']),
+    ('Java', []),
+    ('JavaScript', ['JS']),
+    ('Machine Learning', ['ML']),
+    ('Spring', ['Spring Boot']),
+])
+
+
+@pytest.mark.parametrize('text, skills', [
+    ("Java", ['Java']),
+    ("JavaScript", ['JavaScript']),
+    ("Java and JavaScript", ['Java', 'JavaScript']),
+    ("Java/JS", ['Java', 'JavaScript']),
+    ("Java8", []),
+    ("C", ['C']),
+    ("C++", ['C++']),
+    ("C#", ['C#']),
+    ("C, C++ and C#.", ['C', 'C++', 'C#']),
+    ("C#/.NET and CPP", ['C++', 'C#']),
+    ("CSS", []),
+    ("C Sharp", ['C#']),
+    ("machine learning", ['Machine Learning']),
+    ("Spring Boot", ['Spring']),
+    ("Machine   Learning", ['Machine Learning']),
+    ("Machine\nLearning", ['Machine Learning']),
+    ("Machine\fLearning", ['Machine Learning']),
+    ("Machine \n\f Learning", ['Machine Learning']),
+    ("", []),
+    (None, []),
+])
+def test_match(text, skills):
+    assert matcher.match(text) == skills
+
+
+def test_default_taxonomy_matches_aliases_across_a_page_break():
+    text = "Built on Amazon\n\fWeb Services, shipped REST\nAPIs and ran k8s."
+    assert default_matcher.match(text) == ['AWS', 'Kubernetes', 'REST API']
+
+
+@pytest.mark.parametrize('skill, canonical', [
+    ("c sharp", 'C#'),
+    ("  Machine \n Learning ", 'Machine Learning'),
+    ("JS", 'JavaScript'),
+    ("Cobol", None),
+    (None, None),
+])
+def test_canonicalize(skill, canonical):
+    assert matcher.canonicalize(skill) == canonical
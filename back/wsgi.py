@@ -0,0 +1,12 @@
+"""Production WSGI entrypoint.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app creates its Mongo indexes, including the unique users.email index
+that duplicate-signup protection relies on, on its first request in each
+worker. With MONGO_ENSURE_INDEXES=false, run `flask --app wsgi ensure-indexes`
+before serving traffic instead.
+"""
+from app import create_app
+
+app = create_app()
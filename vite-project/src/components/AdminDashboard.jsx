@@ -9,11 +9,15 @@ const AdminDashboard = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
   const [userName, setUserName] = useState("Admin");
+  const [nextCursor, setNextCursor] = useState(null);
+  const [topSkills, setTopSkills] = useState([]);
+  const [skillFilter, setSkillFilter] = useState(null);
   const navigate = useNavigate();
 
   useEffect(() => {
     fetchUserData();
     fetchAllUsers();
+    fetchTopSkills();
   }, []);
 
   const fetchUserData = async () => {
@@ -32,13 +36,20 @@ const AdminDashboard = () => {
     }
   };
 
-  const fetchAllUsers = async () => {
+  const fetchAllUsers = async (cursor = null, skill = skillFilter) => {
     try {
       const token = localStorage.getItem('access_token');
       const response = await axios.get('http://localhost:5000/admin/users', {
-        headers: { Authorization: `Bearer ${token}` }
+        headers: { Authorization: `Bearer ${token}` },
+        params: {
+          fields: 'skills,saved_question_count',
+          limit: 50,
+          ...(cursor ? { cursor } : {}),
+          ...(skill ? { skill } : {})
+        }
       });
-      setUsers(response.data.users);
+      setUsers(prev => cursor ? [...prev, ...response.data.users] : response.data.users);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching users:', error);
       setError('Failed to fetch users');
@@ -47,6 +58,25 @@ const AdminDashboard = () => {
     }
   };
 
+  const fetchTopSkills = async () => {
+    try {
+      const token = localStorage.getItem('access_token');
+      const response = await axios.get('http://localhost:5000/admin/skills', {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { limit: 20 }
+      });
+      setTopSkills(response.data.skills);
+    } catch (error) {
+      console.error('Error fetching skill counts:', error);
+    }
+  };
+
+  const toggleSkillFilter = (skill) => {
+    const next = skillFilter === skill ? null : skill;
+    setSkillFilter(next);
+    fetchAllUsers(null, next);
+  };
+
   const handleLogout = () => {
     localStorage.removeItem("access_token");
     navigate("/login");
@@ -77,6 +107,25 @@ const AdminDashboard = () => {
               </div>
             )}
 
+            {topSkills.length > 0 && (
+              <div className="mb-6">
+                <h2 className="text-sm font-medium text-gray-500 uppercase tracking-wider mb-2">Top Skills</h2>
+                <div className="flex flex-wrap gap-2">
+                  {topSkills.map(({ skill, count }) => (
+                    <button
+                      key={skill}
+                      onClick={() => toggleSkillFilter(skill)}
+                      className={`px-3 py-1 text-xs rounded-full cursor-pointer ${
+                        skillFilter === skill ? 'bg-purple-600 text-white' : 'bg-blue-100 text-blue-800 hover:bg-blue-200'
+                      }`}
+                    >
+                      {skill} ({count})
+                    </button>
+                  ))}
+                </div>
+              </div>
+            )}
+
             <div className="overflow-x-auto">
               <table className="min-w-full divide-y divide-gray-200">
                 <thead className="bg-gray-50">
@@ -132,7 +181,7 @@ const AdminDashboard = () => {
                       </td>
                       <td className="px-3 sm:px-6 py-4">
                         <div className="text-sm text-gray-500">
-                          {user.saved_questions ? user.saved_questions.length : 0} questions
+                          {user.saved_question_count || 0} questions
                         </div>
                       </td>
                     </tr>
@@ -140,6 +189,15 @@ const AdminDashboard = () => {
                 </tbody>
               </table>
             </div>
+
+            {nextCursor && (
+              <button
+                onClick={() => fetchAllUsers(nextCursor)}
+                className="mt-4 w-full py-2 text-sm text-purple-600 hover:text-purple-700 cursor-pointer"
+              >
+                Load more users
+              </button>
+            )}
           </div>
         </div>
       </div>
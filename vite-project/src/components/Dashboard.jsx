@@ -532,6 +532,10 @@ const ProfileSection = () => {
       const response = await axios.put('http://localhost:5000/update-profile', formData, {
         headers: { Authorization: `Bearer ${token}` }
       });
+      // The old token carries the previous profile and is no longer accepted
+      if (response.data.access_token) {
+        localStorage.setItem('access_token', response.data.access_token);
+      }
       setSuccess('Profile updated successfully');
       setIsEditing(false);
       setUserData(response.data.user);
@@ -655,27 +659,32 @@ const ProfileSection = () => {
 };
 
 const HistorySection = () => {
-  const [userData, setUserData] = useState(null);
+  const [savedQuestions, setSavedQuestions] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [error, setError] = useState('');
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
-    fetchUserData();
+    fetchSavedQuestions();
   }, []);
 
-  const fetchUserData = async () => {
+  const fetchSavedQuestions = async (cursor = null) => {
     try {
+      if (cursor) setIsLoadingMore(true);
       const token = localStorage.getItem('access_token');
-      const response = await axios.get('http://localhost:5000/dashboard', {
-        headers: { Authorization: `Bearer ${token}` }
+      const response = await axios.get('http://localhost:5000/get-saved-questions', {
+        headers: { Authorization: `Bearer ${token}` },
+        params: cursor ? { cursor } : {}
       });
-      console.log('History data:', response.data); // Debug log
-      setUserData(response.data);
+      setSavedQuestions(prev => cursor ? [...prev, ...response.data.saved_questions] : response.data.saved_questions);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error fetching history:', error); // Debug log
-      setError('Failed to fetch user data');
+      setError('Failed to fetch saved questions');
     } finally {
       setIsLoading(false);
+      setIsLoadingMore(false);
     }
   };
 
@@ -695,10 +704,10 @@ const HistorySection = () => {
     <div className="bg-white p-4 sm:p-6 rounded-lg shadow-md mt-6 sm:mt-8">
       <h2 className="text-xl sm:text-2xl font-bold text-purple-600 mb-4 sm:mb-6">Question History</h2>
       
-      {userData.saved_questions && userData.saved_questions.length > 0 ? (
+      {savedQuestions.length > 0 ? (
         <div className="space-y-4">
-          {userData.saved_questions.map((question, index) => (
-            <div key={index} className="bg-gray-50 p-4 rounded-lg">
+          {savedQuestions.map((question) => (
+            <div key={question._id} className="bg-gray-50 p-4 rounded-lg">
               <div className="flex flex-wrap gap-2 mb-2">
                 <span className="px-2 sm:px-3 py-1 bg-purple-100 text-purple-700 rounded-full text-xs sm:text-sm">
                   {question.skill}
@@ -710,10 +719,19 @@ const HistorySection = () => {
               <p className="text-gray-700 mb-2 text-sm sm:text-base">{question.question}</p>
               <div className="text-xs sm:text-sm text-gray-600">
                 <p><strong>Type:</strong> {question.type}</p>
-                <p><strong>Saved on:</strong> {new Date(question.saved_at).toLocaleDateString()}</p>
+                <p><strong>Saved on:</strong> {new Date(question.saved_at?.$date ?? question.saved_at).toLocaleDateString()}</p>
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <button
+              onClick={() => fetchSavedQuestions(nextCursor)}
+              disabled={isLoadingMore}
+              className="w-full py-2 text-sm text-purple-600 hover:text-purple-700 cursor-pointer"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          )}
         </div>
       ) : (
         <p className="text-gray-500 text-center text-sm sm:text-base">No saved questions yet. Generate and save questions to see them here.</p>
@@ -3,6 +3,7 @@ import axios from "axios";
 
 const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, questionTypes }) => {
   const [difficulty, setDifficulty] = useState("medium");
+  const [freshQuestions, setFreshQuestions] = useState(false);
   const [questions, setQuestions] = useState([]);
   const [userAnswers, setUserAnswers] = useState({});
   const [gradingResults, setGradingResults] = useState({});
@@ -19,6 +20,7 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
   const [recognition, setRecognition] = useState(null);
   const [savedQuestions, setSavedQuestions] = useState({});
   const [isSaving, setIsSaving] = useState({});
+  const [isSubmittingAll, setIsSubmittingAll] = useState(false);
 
   useEffect(() => {
     // Initialize speech recognition
@@ -77,7 +79,8 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
         jobDescription,
         experienceLevel,
         questionTypes,
-        difficulty
+        difficulty,
+        fresh: freshQuestions
       }, {
         headers: { Authorization: `Bearer ${token}` }
       });
@@ -88,6 +91,9 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
       }));
 
       setQuestions(updated);
+      if (res.data.failedSkills?.length) {
+        setError(`Could not generate questions for: ${res.data.failedSkills.join(", ")}. Try again to retry them.`);
+      }
       setUserAnswers({});
       setGradingResults({});
       setCorrectAnswers({});
@@ -135,6 +141,54 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
     }
   };
 
+  const pendingAnswerIds = questions
+    .filter((q) => userAnswers[q.id]?.trim() && !submittedAnswers[q.id])
+    .map((q) => q.id);
+
+  const submitAllAnswers = async () => {
+    const pending = questions.filter((q) => pendingAnswerIds.includes(q.id));
+    if (pending.length === 0) return;
+    const token = localStorage.getItem("access_token");
+
+    try {
+      setIsSubmittingAll(true);
+      const res = await axios.post("http://localhost:5000/grade-answers", {
+        items: pending.map((q) => ({
+          question: q.question,
+          userAnswer: userAnswers[q.id],
+          skill: q.skill
+        }))
+      }, {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+
+      res.data.results.forEach((result) => {
+        const id = pending[result.index].id;
+        if (!result.success) return;
+        setGradingResults((prev) => ({
+          ...prev,
+          [id]: {
+            grade: result.grade,
+            strengths: result.strengths,
+            weaknesses: result.weaknesses,
+            suggestions: result.suggestions
+          }
+        }));
+        setCorrectAnswers((prev) => ({ ...prev, [id]: result.correctAnswer }));
+        setSubmittedAnswers((prev) => ({ ...prev, [id]: true }));
+      });
+
+      if (res.data.results.some((result) => !result.success)) {
+        setError("Some answers could not be graded. Please try submitting them again.");
+      }
+    } catch (err) {
+      console.error("Batch grading error:", err);
+      setError(err.response?.data?.error || "Failed to grade answers. Please try again.");
+    } finally {
+      setIsSubmittingAll(false);
+    }
+  };
+
   const toggleAnswerBox = (id) =>
     setShowAnswerBox((prev) => ({ ...prev, [id]: !prev[id] }));
 
@@ -145,17 +199,46 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
     try {
       setIsLoadingAnswer(prev => ({ ...prev, [id]: true }));
       const token = localStorage.getItem("access_token");
-      const res = await axios.post("http://localhost:5000/get-answer", {
-        question,
-        skill,
-        difficulty
-      }, {
-        headers: { Authorization: `Bearer ${token}` }
+      const res = await fetch("http://localhost:5000/get-answer/stream", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${token}`
+        },
+        body: JSON.stringify({ question, skill, difficulty })
       });
+      if (!res.ok || !res.body) {
+        throw new Error(`Request failed with status ${res.status}`);
+      }
 
-      setModelAnswers(prev => ({ ...prev, [id]: res.data.answer }));
+      // Render the answer as server-sent events arrive
+      setModelAnswers(prev => ({ ...prev, [id]: "" }));
       setShowModelAnswer(prev => ({ ...prev, [id]: true }));
       setShowAnswerBox(prev => ({ ...prev, [id]: false }));
+
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const event of events) {
+          const lines = event.split("\n");
+          const type = lines.find(line => line.startsWith("event: "))?.slice(7);
+          const data = lines.find(line => line.startsWith("data: "));
+          if (!data) continue;
+          const payload = JSON.parse(data.slice(6));
+          if (type === "error") {
+            throw new Error(payload.error);
+          }
+          if (payload.text) {
+            setModelAnswers(prev => ({ ...prev, [id]: (prev[id] || "") + payload.text }));
+          }
+        }
+      }
     } catch (err) {
       console.error("Error fetching model answer:", err);
       setError("Failed to fetch model answer. Please try again.");
@@ -221,6 +304,15 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
                 <option value="hard">Hard</option>
               </select>
             </div>
+            <label className="flex items-center gap-2 text-gray-700 font-medium">
+              <input
+                type="checkbox"
+                checked={freshQuestions}
+                onChange={(e) => setFreshQuestions(e.target.checked)}
+                className="accent-purple-600"
+              />
+              Fresh questions
+            </label>
           </div>
           <button
             onClick={fetchQuestions}
@@ -272,6 +364,22 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
         )}
       </div>
 
+      {questions.length > 0 && (
+        <div className="flex justify-end mb-4">
+          <button
+            onClick={submitAllAnswers}
+            disabled={pendingAnswerIds.length === 0 || isSubmittingAll}
+            className={`px-4 py-2 rounded-lg text-white transition ${
+              pendingAnswerIds.length === 0 || isSubmittingAll
+                ? "bg-gray-400 cursor-not-allowed"
+                : "bg-green-600 hover:bg-green-700 cursor-pointer"
+            }`}
+          >
+            {isSubmittingAll ? "Grading..." : `Submit All Answers (${pendingAnswerIds.length})`}
+          </button>
+        </div>
+      )}
+
       {questions.length > 0 ? (
         <ul className="space-y-6">
           {questions.map((q) => (
@@ -476,7 +584,7 @@ const QuestionsSection = ({ selectedSkills, jobDescription, experienceLevel, que
                   <div className="bg-green-50 border border-green-200 p-4 rounded-lg">
                     <h4 className="font-semibold text-green-600 mb-2">Model Answer:</h4>
                     <div className="text-gray-700">
-                      {modelAnswers[q.id].split('\n').map((line, index) => {
+                      {(modelAnswers[q.id] || '').split('\n').map((line, index) => {
                         const trimmedLine = line.trim();
                         // Check if the line is a heading (ends with colon and is not empty)
                         if (trimmedLine.endsWith(':') && trimmedLine.length > 1) {
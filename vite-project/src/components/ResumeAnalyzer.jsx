@@ -37,6 +37,7 @@ const ResumeAnalyzer = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState('');
   const [isDragging, setIsDragging] = useState(false);
+  const [mode, setMode] = useState('hybrid');
 
   const handleFileChange = (e) => {
     const file = e.target.files[0];
@@ -89,22 +90,58 @@ const ResumeAnalyzer = () => {
 
     try {
       const token = localStorage.getItem('access_token');
-      const response = await axios.post('http://localhost:5000/analyze-resume', formData, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'multipart/form-data'
+      const headers = { 'Authorization': `Bearer ${token}` };
+
+      // Poll a queued job until the worker finishes it
+      const waitForJob = async (job) => {
+        const jobUrl = `http://localhost:5000/analyze-resume/jobs/${job.jobId}`;
+        while (job.status === 'queued' || job.status === 'running') {
+          await new Promise((resolve) => setTimeout(resolve, 1500));
+          job = (await axios.get(jobUrl, { headers })).data;
         }
-      });
-      
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'Analysis failed');
+        }
+        return job.result;
+      };
+
+      let result;
+      if (mode === 'llm') {
+        const submitted = await axios.post('http://localhost:5000/analyze-resume/jobs', formData, {
+          headers: { ...headers, 'Content-Type': 'multipart/form-data' }
+        });
+        result = await waitForJob(submitted.data);
+      } else {
+        // Fast and hybrid scores come back straight away, computed on the server without the LLM
+        formData.append('mode', mode);
+        result = (await axios.post('http://localhost:5000/analyze-resume', formData, {
+          headers: { ...headers, 'Content-Type': 'multipart/form-data' }
+        })).data;
+      }
+
       // Validate response data
-      if (!response.data || typeof response.data !== 'object') {
+      if (!result || typeof result !== 'object') {
         throw new Error('Invalid response format from server');
       }
       
-      setAnalysis(response.data);
+      setAnalysis(result);
+
+      // Hybrid mode adds the LLM's suggestions once they are ready
+      if (result.suggestionsJobId) {
+        waitForJob({ jobId: result.suggestionsJobId, status: 'queued' })
+          .then((extra) => {
+            if (extra?.suggestions?.length) {
+              setAnalysis((current) => current && {
+                ...current,
+                suggestions: [...extra.suggestions, ...(current.suggestions || [])]
+              });
+            }
+          })
+          .catch((suggestionError) => console.error('Suggestions error:', suggestionError));
+      }
     } catch (error) {
       console.error('Analysis error:', error);
-      setError(error.response?.data?.error || 'Failed to analyze resume. Please try again.');
+      setError(error.response?.data?.error || error.message || 'Failed to analyze resume. Please try again.');
       setAnalysis(null);
     } finally {
       setIsLoading(false);
@@ -194,6 +231,22 @@ const ResumeAnalyzer = () => {
           />
         </div>
 
+        {/* Analysis Mode */}
+        <div className="mb-6">
+          <label className="block text-sm font-medium text-gray-700 mb-2">
+            Analysis Mode
+          </label>
+          <select
+            value={mode}
+            onChange={(e) => setMode(e.target.value)}
+            className="w-full p-3 border border-gray-300 rounded-lg focus:ring-purple-500 focus:border-purple-500 transition-all duration-300"
+          >
+            <option value="hybrid">Hybrid: instant scores, AI suggestions follow</option>
+            <option value="fast">Fast: instant scores only</option>
+            <option value="llm">Full AI analysis</option>
+          </select>
+        </div>
+
         {error && (
           <div className="mb-4 p-4 bg-red-50 border border-red-200 text-red-600 rounded-lg flex items-center gap-2">
             <svg className="w-5 h-5 text-red-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">